@@ -0,0 +1,166 @@
+"""
+Benchmark do tempo de inicialização: análise do DAG pelo agendador do
+Airflow e invocações do CLI que não processam dados (ex.: `--help`).
+
+Cada alvo é executado várias vezes, cada uma em um processo Python novo
+(sem módulos já importados), e o tempo reportado é a mediana. Além do tempo,
+cada execução informa quais dependências pesadas (Pandas, NumPy,
+SQLAlchemy) foram de fato carregadas: nenhum alvo deve carregá-las, pois os
+módulos de `src` as importam de forma preguiçosa (ver `src.lazy`).
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 150 --repeat 10
+
+O processo termina com código 1 se algum alvo carregar uma dependência
+pesada ou ultrapassar o orçamento de tempo.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import re
+import runpy
+import statistics
+import subprocess
+import sys
+import time
+
+# Alvos medidos
+TARGETS = ['cli_help', 'dag_parse']
+
+# Dependências que não devem ser carregadas na inicialização
+HEAVY_MODULES = ['numpy', 'pandas', 'sqlalchemy']
+
+# Orçamento padrão de cada alvo (mediana, sem a inicialização do interpretador)
+DEFAULT_BUDGET_MS = 150
+
+DEFAULT_REPEAT = 5
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DAG_DIR = os.path.join(_ROOT, 'dags')
+_DAG_FILE = os.path.join(_DAG_DIR, 'main_data_pipeline.py')
+
+
+def loaded_heavy_modules():
+    """
+    Lista as dependências pesadas carregadas no processo atual.
+
+    Módulos registrados por `src.lazy.lazy_import` e ainda não usados não
+    contam como carregados.
+
+    Returns:
+        list[str]: Nomes dos módulos carregados.
+    """
+    return [
+        name for name in HEAVY_MODULES
+        if name in sys.modules and type(sys.modules[name]).__name__ != '_LazyModule'
+    ]
+
+
+def _parse_dag():
+    """
+    Importa o arquivo do DAG como o agendador do Airflow o analisa.
+
+    Sem o Airflow instalado, importa apenas os módulos de tarefas que o
+    arquivo do DAG importa (o restante do arquivo depende do Airflow).
+    """
+    sys.path.insert(0, _DAG_DIR)
+    try:
+        importlib.import_module('airflow')
+    except ImportError:
+        with open(_DAG_FILE) as f:
+            modules = re.findall(r'^from (tasks\.\w+) import', f.read(), re.M)
+        for module in modules:
+            importlib.import_module(module)
+    else:
+        runpy.run_path(_DAG_FILE)
+
+
+def _run_target(target):
+    """
+    Executa um alvo no processo atual.
+
+    Returns:
+        float: Duração, em segundos.
+    """
+    start = time.perf_counter()
+    if target == 'cli_help':
+        sys.argv = ['src.main', '--help']
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.suppress(SystemExit):
+            runpy.run_module('src.main', run_name='__main__', alter_sys=True)
+    elif target == 'dag_parse':
+        _parse_dag()
+    else:
+        raise ValueError(f"Alvo desconhecido: {target}")
+    return time.perf_counter() - start
+
+
+def measure_target(target, repeat=DEFAULT_REPEAT):
+    """
+    Mede um alvo em processos Python novos.
+
+    Args:
+        target (str): Nome do alvo (ver `TARGETS`).
+        repeat (int): Quantidade de execuções.
+
+    Returns:
+        dict: Mediana da duração do alvo ('ms'), mediana da duração do
+        processo inteiro ('process_ms') e dependências pesadas carregadas
+        ('heavy_modules').
+    """
+    durations, process_durations, heavy = [], [], set()
+    for _ in range(repeat):
+        command = [sys.executable, '-m', 'benchmarks.bench_startup', '--target', target]
+        start = time.perf_counter()
+        completed = subprocess.run(
+            command, capture_output=True, text=True, check=True, cwd=_ROOT
+        )
+        process_durations.append(time.perf_counter() - start)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        durations.append(result['seconds'])
+        heavy.update(result['heavy_modules'])
+    return {
+        'ms': 1000 * statistics.median(durations),
+        'process_ms': 1000 * statistics.median(process_durations),
+        'heavy_modules': sorted(heavy),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--targets", nargs='+', default=TARGETS, choices=TARGETS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    # Modo interno: executa um único alvo (usado por `measure_target`)
+    parser.add_argument("--target", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.target:
+        seconds = _run_target(args.target)
+        print(json.dumps({'seconds': seconds, 'heavy_modules': loaded_heavy_modules()}))
+        return 0
+
+    failures = []
+    for target in args.targets:
+        result = measure_target(target, args.repeat)
+        print(
+            f"{target:<10} {result['ms']:8.1f} ms  (processo: {result['process_ms']:.1f} ms)  "
+            f"dependências pesadas: {', '.join(result['heavy_modules']) or 'nenhuma'}"
+        )
+        if result['heavy_modules']:
+            failures.append(f"{target} carregou {', '.join(result['heavy_modules'])}")
+        if result['ms'] > args.budget_ms:
+            failures.append(
+                f"{target}: {result['ms']:.1f} ms acima do orçamento de {args.budget_ms:g} ms"
+            )
+
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Suíte de benchmarks do pipeline com dados sintéticos (ver `src.synthetic`).
+
+Para cada tamanho de entrada, gera um CSV determinístico (reaproveitado entre
+execuções) e mede cada etapa em um processo separado, reportando a vazão
+(linhas/s) e o pico de memória residente (RSS) do processo. Etapas em memória
+(`clean_data`, `compute_table1`, `compute_table2`) carregam a entrada antes da
+medição, então o pico de RSS inclui o DataFrame de entrada.
+
+Uso:
+    python -m benchmarks.run_benchmarks --rows 1000000 10000000 100000000
+    python -m benchmarks.run_benchmarks --rows 1000000 --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --rows 1000000 --baseline benchmarks/baseline.json
+
+Com `--baseline`, o processo termina com código 1 se alguma etapa ficar mais
+lenta ou usar mais memória que o baseline além da tolerância.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from src.instrumentation import peak_rss_mb
+
+# Etapas medidas, na ordem de execução (as tarefas do DAG dependem das
+# saídas das anteriores)
+STAGES = [
+    'load_data',
+    'clean_data',
+    'compute_table1',
+    'compute_table2',
+    'data_shard',
+    'data_merge',
+    'fused',
+    'pipelined',
+]
+
+DEFAULT_ROWS = [1_000_000, 10_000_000, 100_000_000]
+
+# Shards das tarefas do DAG principal, processados um após o outro em
+# 'data_shard'
+DAG_SHARDS = 8
+
+# Variação aceita em relação ao baseline antes de acusar regressão
+DEFAULT_TOLERANCE = 0.2
+
+
+def _run_stage(stage, input_path, work_dir):
+    """
+    Executa uma etapa no processo atual e mede apenas a própria etapa.
+
+    Returns:
+        float: Duração da etapa, em segundos.
+    """
+    from src.main import (
+        clean_data,
+        compute_table1,
+        compute_table2,
+        load_data,
+    )
+
+    cleaned_dir = os.path.join(work_dir, 'cleaned_data')
+    shard_dir = os.path.join(work_dir, 'shards')
+    table1_path = os.path.join(work_dir, 'table1')
+    table2_path = os.path.join(work_dir, 'table2')
+
+    if stage == 'load_data':
+        start = time.perf_counter()
+        load_data(input_path)
+        return time.perf_counter() - start
+
+    if stage in ('clean_data', 'compute_table1', 'compute_table2'):
+        df = load_data(input_path)
+        if stage != 'clean_data':
+            df = clean_data(df)
+        func = {
+            'clean_data': clean_data,
+            'compute_table1': compute_table1,
+            'compute_table2': compute_table2,
+        }[stage]
+        start = time.perf_counter()
+        func(df)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if stage == 'data_shard':
+        from dags.tasks.data_shard import data_shard
+        from dags.tasks.data_split import data_split
+
+        for shard in data_split(input_path, DAG_SHARDS, shard_dir):
+            data_shard(**shard)
+    elif stage == 'data_merge':
+        from dags.tasks.data_merge import data_merge
+
+        shard_paths = sorted(
+            os.path.join(shard_dir, name) for name in os.listdir(shard_dir)
+        )
+        data_merge(shard_paths, cleaned_dir, table1_path, table2_path)
+    elif stage == 'fused':
+        from src.fused import run_fused
+
+        run_fused(input_path)
+    elif stage == 'pipelined':
+        from src.pipelined import run_pipelined
+
+        run_pipelined(input_path, os.path.join(work_dir, 'pipelined_data'))
+    else:
+        raise ValueError(f"Etapa desconhecida: {stage}")
+    return time.perf_counter() - start
+
+
+def measure_stage(stage, input_path, work_dir, rows):
+    """
+    Mede uma etapa em um processo Python novo, isolando o pico de memória.
+
+    Args:
+        stage (str): Nome da etapa (ver `STAGES`).
+        input_path (str): CSV de entrada.
+        work_dir (str): Diretório das saídas intermediárias.
+        rows (int): Linhas da entrada, usadas no cálculo da vazão.
+
+    Returns:
+        dict: 'seconds', 'rows_per_s' e 'peak_rss_mb'.
+    """
+    command = [
+        sys.executable, '-m', 'benchmarks.run_benchmarks',
+        '--stage', stage, '--input', input_path, '--work-dir', work_dir,
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['rows_per_s'] = rows / result['seconds']
+    return result
+
+
+def input_for(rows, data_dir, regions, addresses, invalid_ratio):
+    """
+    Retorna o CSV sintético para os parâmetros, gerando-o se necessário.
+
+    Returns:
+        str: Caminho do CSV.
+    """
+    from src.synthetic import write_transactions
+
+    name = f"synthetic_{rows}_{regions}_{addresses}_{invalid_ratio}.csv"
+    path = os.path.join(data_dir, name)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Gerando {path}...", file=sys.stderr)
+        write_transactions(
+            f"{path}.tmp", rows,
+            regions=regions, addresses=addresses, invalid_ratio=invalid_ratio,
+        )
+        os.replace(f"{path}.tmp", path)
+    return path
+
+
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compara os resultados com o baseline.
+
+    Args:
+        results (dict): Resultados por tamanho e etapa, como os de `main`.
+        baseline (dict): Resultados de referência, no mesmo formato.
+        tolerance (float): Variação relativa aceita.
+
+    Returns:
+        list[str]: Descrição de cada regressão encontrada.
+    """
+    regressions = []
+    for rows, stages in results.items():
+        for stage, result in stages.items():
+            reference = baseline.get(rows, {}).get(stage)
+            if reference is None:
+                continue
+            if result['rows_per_s'] < reference['rows_per_s'] * (1 - tolerance):
+                regressions.append(
+                    f"{stage} ({rows} linhas): {result['rows_per_s']:,.0f} linhas/s "
+                    f"contra {reference['rows_per_s']:,.0f} no baseline"
+                )
+            if result['peak_rss_mb'] > reference['peak_rss_mb'] * (1 + tolerance):
+                regressions.append(
+                    f"{stage} ({rows} linhas): pico de {result['peak_rss_mb']:,.0f} MiB "
+                    f"contra {reference['peak_rss_mb']:,.0f} MiB no baseline"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument("--stages", nargs='+', default=STAGES, choices=STAGES)
+    parser.add_argument("--regions", type=int, default=5)
+    parser.add_argument("--addresses", type=int, default=1_000_000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.1)
+    parser.add_argument("--data-dir", default="data/benchmarks")
+    parser.add_argument("--output", help="Grava os resultados em JSON")
+    parser.add_argument("--baseline", help="Falha se houver regressão contra este JSON")
+    parser.add_argument("--save-baseline", help="Grava os resultados como baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    # Modo interno: executa uma única etapa (usado por `measure_stage`)
+    parser.add_argument("--stage", help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.stage:
+        seconds = _run_stage(args.stage, args.input, args.work_dir)
+        print(json.dumps({'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}))
+        return 0
+
+    results = {}
+    for rows in args.rows:
+        input_path = input_for(
+            rows, args.data_dir, args.regions, args.addresses, args.invalid_ratio
+        )
+        work_dir = os.path.join(args.data_dir, f"work_{rows}")
+        os.makedirs(work_dir, exist_ok=True)
+        results[str(rows)] = {}
+        for stage in args.stages:
+            result = measure_stage(stage, input_path, work_dir, rows)
+            results[str(rows)][stage] = result
+            print(
+                f"{rows:>12,} linhas  {stage:<15} {result['seconds']:8.2f}s "
+                f"{result['rows_per_s']:>14,.0f} linhas/s "
+                f"{result['peak_rss_mb']:>9,.0f} MiB"
+            )
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
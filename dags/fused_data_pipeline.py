@@ -0,0 +1,33 @@
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime
+from tasks.data_fused import data_fused
+from tasks.data_report import data_report
+
+# Linhas lidas por bloco; limita o pico de memória da tarefa
+FUSED_CHUNKSIZE = 100_000
+
+# Definição do DAG em passagem única
+with DAG(
+    "fused_data_pipeline",
+    description="Pipeline que limpa, avalia e processa os dados em uma única leitura",
+    schedule_interval=None,
+    start_date=datetime(2023, 12, 1),
+    catchup=False,
+) as dag:
+    # Equivalente a `main_data_pipeline`, mas limpeza, processamento e
+    # qualidade rodam juntos: cada bloco da entrada é lido uma única vez e os
+    # dados limpos não são gravados em disco.
+
+    task_fused = PythonOperator(
+        task_id="data_fused",
+        python_callable=data_fused,
+        op_kwargs={"chunksize": FUSED_CHUNKSIZE},
+    )
+
+    task_report = PythonOperator(
+        task_id="data_report",
+        python_callable=data_report,
+    )
+
+    task_fused >> task_report
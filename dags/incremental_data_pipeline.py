@@ -0,0 +1,28 @@
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from datetime import datetime
+from tasks.data_incremental import data_incremental
+from tasks.data_report import data_report
+
+# Definição do DAG incremental
+with DAG(
+    "incremental_data_pipeline",
+    description="Pipeline que processa apenas as linhas novas da entrada",
+    schedule_interval=None,
+    start_date=datetime(2023, 12, 1),
+    catchup=False,
+) as dag:
+    # A entrada só cresce por anexação: cada execução lê apenas o trecho após a
+    # marca d'água salva em `data/state` e atualiza os agregados persistidos.
+
+    task_incremental = PythonOperator(
+        task_id="data_incremental",
+        python_callable=data_incremental,
+    )
+
+    task_report = PythonOperator(
+        task_id="data_report",
+        python_callable=data_report,
+    )
+
+    task_incremental >> task_report
@@ -1,10 +1,45 @@
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime
-from tasks.data_cleanning import data_cleanning
-from tasks.data_processing import data_processing
-from tasks.data_quality import data_quality
+from tasks.data_merge import data_merge
 from tasks.data_report import data_report
+from tasks.data_shard import data_shard
+from tasks.data_sink import data_sink
+from tasks.data_split import data_split
+
+# Quantidade de shards da entrada; cada shard vira uma instância mapeada de
+# `data_shard`, distribuída entre os slots de worker do Airflow
+SHARDS = 8
+
+# Linhas lidas por bloco dentro de cada shard; limita o pico de memória
+SHARD_CHUNKSIZE = 100_000
+
+# Se True, os shards também mantêm sketches por região (quantis e endereços
+# distintos aproximados), combinados por `data_merge` na tabela 'region_stats'
+REGION_SKETCHES = False
+
+# Largura e passo das janelas da série de risco por região (ex.: "1D" e "1h"
+# para janelas de um dia a cada hora); None desativa a série, e sem passo as
+# janelas são fixas. Combinada por `data_merge` na tabela 'risk_windows'
+RISK_WINDOW = None
+RISK_SLIDE = None
+
+# Motor de cálculo da limpeza dos shards ("pandas" ou "numpy"; ver
+# `src.engines`); os resultados são os mesmos com ambos
+ENGINE = "pandas"
+
+# Se True, os shards gravam as linhas rejeitadas e as regras violadas,
+# concatenadas por `data_merge` em 'data/quarantine.csv'
+QUARANTINE = False
+
+# Diretório do índice das transações já ingeridas (ver `src.dedup`): reentregas
+# são descartadas pelos shards e por `data_merge`, que grava o índice; None
+# desativa a deduplicação
+DEDUP_DIR = None
+
+# Tabela limpa particionada por data, gravada por `data_merge` e carregada no
+# banco por `data_sink` junto com as Tabelas 1 e 2
+CLEANED_PATH = "data/cleaned_data"
 
 # Definição do DAG
 with DAG(
@@ -17,59 +52,75 @@ with DAG(
     # '''
     # Definição do DAG principal do pipeline de dados.
 
-    # Este DAG executa uma série de tarefas para limpar, processar, avaliar a qualidade e gerar relatórios a partir de dados.
+    # Este DAG divide a entrada em shards e processa cada shard em uma tarefa mapeada
+    # (dynamic task mapping), combinando os resultados em uma tarefa de redução.
 
     # O fluxo de tarefas é o seguinte:
-    # 1. **Data Cleaning**: Limpeza dos dados de entrada, incluindo a remoção de valores ausentes ou inválidos.
-    # 2. **Data Processing**: Processamento dos dados limpos, incluindo transformações e agrupamentos.
-    # 3. **Data Quality**: Avaliação da qualidade dos dados processados, verificando a conformidade e valores ausentes.
-    # 4. **Data Report**: Geração de relatórios sobre os dados processados e limpos.
+    # 1. **Data Split**: Divisão da entrada em `SHARDS` intervalos de bytes alinhados às linhas.
+    # 2. **Data Shard** (mapeada): Limpeza de cada shard, gravação das suas linhas limpas e
+    #    cálculo dos agregados parciais (contadores de qualidade, soma e contagem por região
+    #    e última venda por endereço).
+    # 3. **Data Merge**: Combinação dos parciais nas Tabelas 1 e 2 e nas métricas de qualidade,
+    #    e das linhas limpas dos shards na tabela limpa particionada por data.
+    # 4. **Data Report**: Geração de relatórios sobre os dados processados.
+    # 5. **Data Sink**: Carga das Tabelas 1 e 2 no banco configurado em `PIPELINE_DATABASE_URL`,
+    #    em paralelo com o relatório.
 
-    # O DAG é configurado para ser executado manualmente (`schedule_interval=None`), com início em 1º de dezembro de 2023. 
+    # O DAG é configurado para ser executado manualmente (`schedule_interval=None`), com início em 1º de dezembro de 2023.
     # O parâmetro `catchup=False` garante que o DAG não será executado retroativamente.
 
     # '''
 
-    task_cleaning = PythonOperator(
-        task_id="data_cleanning",
-        python_callable=data_cleanning,
-        
-        # Tarefa para limpar os dados de entrada.
+    task_split = PythonOperator(
+        task_id="data_split",
+        python_callable=data_split,
+        op_kwargs={
+            "n_shards": SHARDS,
+            "chunksize": SHARD_CHUNKSIZE,
+            "sketches": REGION_SKETCHES,
+            "risk_window": RISK_WINDOW,
+            "risk_slide": RISK_SLIDE,
+            "engine": ENGINE,
+            "quarantine": QUARANTINE,
+            "dedup_dir": DEDUP_DIR,
+        },
+        # Tarefa para dividir a entrada em shards.
 
-        # A função `data_cleanning` realiza a limpeza dos dados, removendo registros com valores ausentes
-        # e corrigindo ou transformando dados inválidos.
+        # A função `data_split` retorna os argumentos de cada shard, usados para
+        # expandir a tarefa `data_shard`.
 
         # Dependências:
         # - Nenhuma. Esta tarefa é executada primeiro no pipeline.
-        
     )
 
-    task_processing = PythonOperator(
-        task_id="data_processing",
-        python_callable=data_processing,
-        # '''
-        # Tarefa para processar os dados limpos.
+    task_shards = PythonOperator.partial(
+        task_id="data_shard",
+        python_callable=data_shard,
+    ).expand(op_kwargs=task_split.output)
+    # Tarefa mapeada: uma instância por shard, executadas em paralelo.
 
-        # A função `data_processing` transforma e processa os dados limpos para gerar as tabelas ou 
-        # resultados desejados, como agregações e transformações.
-        
-        # Dependências:
-        # - `data_cleaning` (task_cleaning)
-        # '''
-    )
+    # A função `data_shard` limpa o shard e grava suas linhas limpas e seus
+    # agregados parciais; o caminho do shard é enviado ao XCom.
+
+    # Dependências:
+    # - `data_split` (task_split)
+
+    task_merge = PythonOperator(
+        task_id="data_merge",
+        python_callable=data_merge,
+        op_kwargs={
+            "shard_paths": task_shards.output,
+            "cleaned_path": CLEANED_PATH,
+            "dedup_dir": DEDUP_DIR,
+        },
+        # Tarefa de redução dos shards.
 
-    task_quality = PythonOperator(
-        task_id="data_quality",
-        python_callable=data_quality,
-        # '''
-        # Tarefa para avaliar a qualidade dos dados.
+        # A função `data_merge` recebe a lista de parciais de todas as instâncias
+        # de `data_shard` e gera as tabelas, as métricas de qualidade e a tabela
+        # limpa (`CLEANED_PATH`).
 
-        # A função `data_quality` calcula métricas de qualidade dos dados, como a taxa de conformidade 
-        # e a quantidade de valores ausentes.
-        
         # Dependências:
-        # - `data_processing` (task_processing)
-        # '''
+        # - `data_shard` (task_shards)
     )
 
     task_report = PythonOperator(
@@ -78,20 +129,34 @@ with DAG(
     #     '''
     #     Tarefa para gerar relatórios a partir dos dados processados.
 
-    #     A função `data_report` gera relatórios detalhados sobre os dados processados, podendo incluir 
+    #     A função `data_report` gera relatórios detalhados sobre os dados processados, podendo incluir
     #     informações agregadas e insights relevantes.
-        
+
     #     Dependências:
-    #     - `data_quality` (task_quality)
+    #     - `data_merge` (task_merge)
     #    '''
     )
 
+    task_sink = PythonOperator(
+        task_id="data_sink",
+        python_callable=data_sink,
+        op_kwargs={"cleaned_path": CLEANED_PATH},
+        # Tarefa para gravar as tabelas no banco relacional.
+
+        # A função `data_sink` carrega as Tabelas 1 e 2 e a tabela limpa em lotes,
+        # substituindo as linhas da mesma execução do DAG (`run_id`), o que torna a
+        # tarefa idempotente.
+
+        # Dependências:
+        # - `data_merge` (task_merge)
+    )
+
     # Definindo dependências
-    task_cleaning >> task_processing >> task_quality >> task_report
+    task_split >> task_shards >> task_merge >> [task_report, task_sink]
     '''
     Definição da ordem das tarefas no pipeline:
-    1. `task_cleaning` é executado primeiro.
-    2. `task_processing` depende da conclusão de `task_cleaning`.
-    3. `task_quality` depende da conclusão de `task_processing`.
-    4. `task_report` depende da conclusão de `task_quality`.
+    1. `task_split` é executado primeiro.
+    2. `task_shards` tem uma instância por shard e depende de `task_split`.
+    3. `task_merge` depende da conclusão de todas as instâncias de `task_shards`.
+    4. `task_report` e `task_sink` dependem da conclusão de `task_merge` e rodam em paralelo.
     '''
@@ -0,0 +1,78 @@
+import logging
+import os
+
+from src.columnar import write_table
+from src.fused import run_fused
+from src.instrumentation import instrument_stage
+from src.report_service import publish_run
+from src.main import DEFAULT_CHUNKSIZE
+
+
+def data_fused(
+    input_path="data/input.csv",
+    table1_path="data/table1",
+    table2_path="data/table2",
+    chunksize=DEFAULT_CHUNKSIZE,
+    run_id=None,
+    ti=None,
+):
+    """Limpa, avalia a qualidade e gera as Tabelas 1 e 2 em uma única leitura da entrada.
+
+    Este processo realiza as seguintes operações:
+    1. Lê o arquivo CSV em blocos de `chunksize` linhas.
+    2. Aplica a cada bloco as regras de `src.main.clean_data`, obtendo a máscara de linhas válidas.
+    3. Com a mesma máscara, atualiza os contadores de qualidade, a soma e a contagem de
+       'risk_score' por região e a última venda por endereço.
+    4. Salva ambas as tabelas em formato colunar e em CSV.
+    5. Publica o marcador da execução ao lado das tabelas, invalidando o cache do
+       serviço de consulta (ver `src.report_service`).
+
+    Limpeza, métricas de qualidade e tabelas saem de uma única tarefa: os dados
+    limpos não são gravados nem relidos (ver `src.fused.run_fused`).
+
+    Logs são gerados para informar as métricas de limpeza e de qualidade.
+
+    Example:
+        data_fused(chunksize=50_000)
+
+    Args:
+        input_path (str): Caminho do arquivo CSV de entrada.
+        table1_path (str): Diretório da tabela colunar da Tabela 1; o CSV é
+            gravado no mesmo caminho com a extensão '.csv'.
+        table2_path (str): Diretório da tabela colunar da Tabela 2; o CSV é
+            gravado no mesmo caminho com a extensão '.csv'.
+        chunksize (int): Quantidade máxima de linhas lidas por bloco.
+        run_id (str, optional): Identificador da execução; no Airflow, recebe o
+            `run_id` da execução do DAG.
+        ti (TaskInstance, optional): Instância da tarefa, usada para enviar as
+            métricas da etapa ao XCom (ver `src.instrumentation`).
+
+    Returns:
+        None
+
+    Raises:
+        FileNotFoundError: Se o arquivo CSV de entrada não for encontrado.
+        ValueError: Se a entrada não contiver nenhum registro válido.
+    """
+    with instrument_stage("data_fused", ti=ti) as metrics:
+        logging.info(f"Iniciando pipeline em passagem única, em blocos de {chunksize} linhas.")
+
+        table1, table2, counts, quality = run_fused(input_path, chunksize)
+        metrics["rows_in"] = counts['total_records']
+        metrics["rows_out"] = len(table1) + len(table2)
+
+        write_table(table1, table1_path)
+        write_table(table2, table2_path)
+        table1.to_csv(f"{table1_path}.csv", index=False)
+        table2.to_csv(f"{table2_path}.csv", index=False)
+
+        logging.info(
+            f"Limpeza concluída. Registros lidos: {counts['total_records']}. "
+            f"Registros restantes: {counts['valid_records']}"
+        )
+        logging.info(f"Registros rejeitados por regra: {counts['rejections']}")
+        logging.info(f"Total de registros: {quality['total_records']}")
+        logging.info(f"Valores ausentes: {quality['missing_values']}")
+        logging.info(f"Taxa de conformidade: {quality['compliance_rate']:.2f}%")
+
+        publish_run(os.path.dirname(table1_path), {**counts, "quality": quality}, run_id)
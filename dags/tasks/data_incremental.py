@@ -0,0 +1,71 @@
+import logging
+import os
+
+from src.columnar import write_table
+from src.incremental import update_incremental
+from src.instrumentation import instrument_stage
+from src.main import DEFAULT_CHUNKSIZE, metrics_from_counts
+from src.report_service import publish_run
+
+
+def data_incremental(
+    input_path="data/input.csv",
+    state_dir="data/state",
+    table1_path="data/table1",
+    table2_path="data/table2",
+    chunksize=DEFAULT_CHUNKSIZE,
+    run_id=None,
+    ti=None,
+):
+    """Atualiza as Tabelas 1 e 2 processando apenas as linhas novas da entrada.
+
+    Este processo realiza as seguintes operações:
+    1. Lê a marca d'água (posição em bytes já processada) e os agregados do estado.
+    2. Lê e limpa em blocos apenas as linhas anexadas desde a última execução.
+    3. Combina os agregados das linhas novas com o estado e persiste o resultado.
+    4. Salva ambas as tabelas em formato colunar e em CSV.
+    5. Publica o marcador da execução ao lado das tabelas, invalidando o cache do
+       serviço de consulta (ver `src.report_service`).
+
+    Logs são gerados para informar o início e a conclusão do processamento, além
+    da quantidade de registros novos.
+
+    Example:
+        data_incremental()
+
+    Args:
+        input_path (str): Caminho do arquivo CSV de entrada, que só cresce por anexação.
+        state_dir (str): Diretório do estado incremental.
+        table1_path (str): Diretório da tabela colunar da Tabela 1.
+        table2_path (str): Diretório da tabela colunar da Tabela 2.
+        chunksize (int): Quantidade máxima de linhas lidas por bloco.
+        run_id (str, optional): Identificador da execução; no Airflow, recebe o
+            `run_id` da execução do DAG.
+        ti (TaskInstance, optional): Instância da tarefa, usada para enviar as
+            métricas da etapa ao XCom (ver `src.instrumentation`).
+
+    Returns:
+        None
+
+    Raises:
+        FileNotFoundError: Se o arquivo de entrada não for encontrado.
+        ValueError: Se a entrada não contiver nenhum registro válido.
+    """
+    with instrument_stage("data_incremental", ti=ti) as metrics:
+        logging.info("Iniciando processamento incremental.")
+
+        table1, table2, stats = update_incremental(input_path, state_dir, chunksize)
+        metrics["rows_in"] = stats['new_records']
+        metrics["rows_out"] = len(table1) + len(table2)
+
+        write_table(table1, table1_path)
+        write_table(table2, table2_path)
+        table1.to_csv(f"{table1_path}.csv", index=False)
+        table2.to_csv(f"{table2_path}.csv", index=False)
+        logging.info(
+            f"Processamento incremental concluído. Registros novos: "
+            f"{stats['new_records']}. Total de registros: {stats['total_records']}"
+        )
+
+        run_metrics = metrics_from_counts(stats['total_records'], stats['valid_records'])
+        publish_run(os.path.dirname(table1_path), run_metrics, run_id)
@@ -0,0 +1,139 @@
+import logging
+import os
+
+from src.columnar import write_table
+from src.dedup import DedupIndex
+from src.instrumentation import instrument_stage
+from src.report_service import publish_run
+from src.sharding import (
+    dedup_shards,
+    merge_cleaned,
+    merge_quarantine,
+    merge_risk_windows,
+    merge_shards,
+    merge_sketches,
+)
+
+
+def data_merge(
+    shard_paths,
+    cleaned_path="data/cleaned_data",
+    table1_path="data/table1",
+    table2_path="data/table2",
+    region_stats_path="data/region_stats",
+    risk_windows_path="data/risk_windows",
+    quarantine_path="data/quarantine.csv",
+    dedup_dir=None,
+    run_id=None,
+    ti=None,
+):
+    """Combina os agregados parciais dos shards nas Tabelas 1 e 2 e nas métricas de qualidade.
+
+    Este processo realiza as seguintes operações:
+    1. Com `dedup_dir`, descarta as transações repetidas entre shards, na ordem da
+       entrada: as linhas com chaves já aceitas por um shard anterior são removidas
+       das saídas gravadas pelo shard, cujo parcial é recalculado sem reler a
+       entrada (ver `src.sharding.dedup_shards`).
+    2. Carrega os agregados parciais gravados pelas instâncias de `data_shard`.
+    3. Soma os contadores e combina as somas e contagens por região e as últimas
+       vendas por endereço.
+    4. Gera a Tabela 1 (média de 'risk_score' por região) e a Tabela 2 (3 maiores
+       vendas recentes) e as salva em formato colunar e em CSV.
+    5. Combina as saídas limpas dos shards, na ordem da entrada, na tabela limpa
+       particionada por data em `cleaned_path`, movendo as partes gravadas pelos
+       shards sem regravá-las (ver `src.sharding.merge_cleaned`).
+    6. Se os shards gravaram sketches por região, combina-os na tabela de
+       estatísticas de risco por região (quantis de 'risk_score' e 'amount' e
+       endereços distintos aproximados; ver `src.sketches`), também salva em
+       formato colunar e em CSV.
+    7. Se os shards gravaram a série de risco por janela, combina-a na tabela de
+       contagem, média e máximo de 'risk_score' por região e janela de tempo (ver
+       `src.windows`), também salva em formato colunar e em CSV.
+    8. Se os shards gravaram a quarentena, concatena-a, na ordem da entrada, no
+       CSV `quarantine_path` (ver `src.sharding.merge_quarantine`).
+    9. Com `dedup_dir`, grava o índice com as transações aceitas, apenas depois
+       das saídas: uma falha antes deste ponto não as marca como ingeridas.
+    10. Exibe no log as métricas de limpeza e de qualidade.
+    11. Publica o marcador da execução ao lado das tabelas, invalidando o cache do
+        serviço de consulta (ver `src.report_service`).
+
+    Example:
+        data_merge(["data/shards/shard-00000", "data/shards/shard-00001"])
+
+    Args:
+        shard_paths (list[str]): Diretórios dos agregados parciais (saída mapeada
+            de `data_shard`).
+        cleaned_path (str): Diretório raiz da tabela limpa, particionada por data
+            (substituída a cada execução).
+        table1_path (str): Diretório da tabela colunar da Tabela 1; o CSV é
+            gravado no mesmo caminho com a extensão '.csv'.
+        table2_path (str): Diretório da tabela colunar da Tabela 2; o CSV é
+            gravado no mesmo caminho com a extensão '.csv'.
+        region_stats_path (str): Diretório da tabela colunar de estatísticas por
+            região (apenas com sketches); o CSV é gravado com a extensão '.csv'.
+        risk_windows_path (str): Diretório da tabela colunar da série de risco por
+            janela (apenas com `risk_window`); o CSV é gravado com a extensão '.csv'.
+        quarantine_path (str): Arquivo CSV com as linhas rejeitadas e as regras
+            violadas (apenas com `quarantine`).
+        dedup_dir (str, optional): Diretório do índice das transações já
+            ingeridas, o mesmo passado a `data_split` (ver `src.dedup`).
+        run_id (str, optional): Identificador da execução; no Airflow, recebe o
+            `run_id` da execução do DAG.
+        ti (TaskInstance, optional): Instância da tarefa, usada para enviar as
+            métricas da etapa ao XCom (ver `src.instrumentation`).
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: Se nenhum shard contiver registros válidos.
+    """
+    with instrument_stage("data_merge", ti=ti) as metrics:
+        shard_paths = list(shard_paths)
+        dedup = None
+        if dedup_dir is not None:
+            dedup = DedupIndex.open(dedup_dir)
+            dropped = dedup_shards(shard_paths, dedup)
+            logging.info(f"Linhas descartadas por transações repetidas entre shards: {dropped}")
+        table1, table2, counts, quality = merge_shards(shard_paths)
+        metrics["rows_in"] = len(shard_paths)
+        metrics["rows_out"] = len(table1) + len(table2)
+
+        write_table(table1, table1_path)
+        write_table(table2, table2_path)
+        table1.to_csv(f"{table1_path}.csv", index=False)
+        table2.to_csv(f"{table2_path}.csv", index=False)
+
+        partitions = merge_cleaned(shard_paths, cleaned_path)
+        logging.info(f"Dados limpos combinados em {len(partitions)} partições.")
+
+        sketches = merge_sketches(shard_paths)
+        if sketches is not None:
+            region_stats = sketches.table()
+            write_table(region_stats, region_stats_path)
+            region_stats.to_csv(f"{region_stats_path}.csv", index=False)
+            logging.info(f"Estatísticas por região (sketches): {len(region_stats)} regiões.")
+
+        risk_windows = merge_risk_windows(shard_paths)
+        if risk_windows is not None:
+            series = risk_windows.table()
+            write_table(series, risk_windows_path)
+            series.to_csv(f"{risk_windows_path}.csv", index=False)
+            logging.info(f"Série de risco por janela: {len(series)} linhas.")
+
+        if merge_quarantine(shard_paths, quarantine_path):
+            logging.info(f"Linhas rejeitadas gravadas em {quarantine_path}.")
+
+        if dedup is not None:
+            dedup.save()
+
+        logging.info(
+            f"Shards combinados. Registros lidos: {counts['total_records']}. "
+            f"Registros restantes: {counts['valid_records']}"
+        )
+        logging.info(f"Registros rejeitados por regra: {counts['rejections']}")
+        logging.info(f"Total de registros: {quality['total_records']}")
+        logging.info(f"Valores ausentes: {quality['missing_values']}")
+        logging.info(f"Taxa de conformidade: {quality['compliance_rate']:.2f}%")
+
+        publish_run(os.path.dirname(table1_path), {**counts, "quality": quality}, run_id)
@@ -1,33 +1,58 @@
-import pandas as pd
 import logging
 
-def data_report():
+from src.instrumentation import instrument_stage
+from src.report_service import get_service
+
+# Linhas de cada tabela exibidas no relatório
+DEFAULT_TOP_N = 20
+
+
+def data_report(results_dir="data", top_n=DEFAULT_TOP_N, ti=None):
     """Gera e exibe o relatório final com duas tabelas de dados.
 
     Este processo realiza as seguintes operações:
-    1. Carrega as Tabelas 1 e 2 a partir dos arquivos CSV 'data/table1.csv' e 'data/table2.csv'.
-    2. Exibe a Tabela 1, que contém a média de 'risk_score' por 'location_region'.
-    3. Exibe a Tabela 2, que contém as 3 maiores transações do tipo 'sale'.
+    1. Consulta as Tabelas 1 e 2 e as métricas da última execução no serviço de
+       consulta (ver `src.report_service`).
+    2. Exibe as primeiras `top_n` linhas da Tabela 1, que contém a média de
+       'risk_score' por 'location_region'.
+    3. Exibe as primeiras `top_n` linhas da Tabela 2, que contém as 3 maiores
+       transações do tipo 'sale'.
     4. Exibe as tabelas no console.
 
+    O serviço mantém os resultados em memória e só os relê do disco quando uma
+    nova execução publica seu marcador, de modo que relatórios repetidos no mesmo
+    processo não interpretam as tabelas novamente.
+
     Logs são gerados para informar o início do processo de geração do relatório.
 
     Example:
         data_report()
 
+    Args:
+        results_dir (str): Diretório com as tabelas 'table1' e 'table2' e o marcador
+            da execução.
+        top_n (int): Linhas exibidas de cada tabela.
+        ti (TaskInstance, optional): Instância da tarefa, usada para enviar as
+            métricas da etapa ao XCom (ver `src.instrumentation`).
+
     Returns:
         None
 
     Raises:
-        FileNotFoundError: Se os arquivos 'data/table1.csv' ou 'data/table2.csv' não forem encontrados.
-        pd.errors.EmptyDataError: Se algum dos arquivos CSV estiver vazio ou não contiver dados válidos.
+        FileNotFoundError: Se nenhuma execução tiver sido publicada em `results_dir`
+            ou se as tabelas não forem encontradas.
     """
-    logging.info("Gerando relatório final.")
-    table1 = pd.read_csv("data/table1.csv")
-    table2 = pd.read_csv("data/table2.csv")
+    with instrument_stage("data_report", ti=ti) as metrics:
+        logging.info("Gerando relatório final.")
+        service = get_service(results_dir)
+        table1 = service.table("table1", limit=top_n)
+        table2 = service.table("table2", limit=top_n)
+        metrics["rows_in"] = len(table1) + len(table2)
+
+        logging.info(f"Execução: {service.run()['run_id']}")
 
-    print("Tabela 1: Média de 'risk_score' por 'location_region'")
-    print(table1)
+        print("Tabela 1: Média de 'risk_score' por 'location_region'")
+        print(table1)
 
-    print("\nTabela 2: Top 3 transações 'sale'")
-    print(table2)
+        print("\nTabela 2: Top 3 transações 'sale'")
+        print(table2)
@@ -0,0 +1,101 @@
+import logging
+
+from src.dedup import DedupIndex
+from src.engines import DEFAULT_ENGINE
+from src.instrumentation import instrument_stage
+from src.main import DEFAULT_CHUNKSIZE
+from src.sharding import process_shard
+
+
+def data_shard(
+    input_path,
+    start,
+    end,
+    output_path,
+    chunksize=DEFAULT_CHUNKSIZE,
+    sketches=False,
+    risk_window=None,
+    risk_slide=None,
+    engine=DEFAULT_ENGINE,
+    quarantine=False,
+    dedup_dir=None,
+    offset=0,
+    ti=None,
+):
+    """Limpa um shard da entrada e grava suas linhas limpas e seus agregados parciais.
+
+    Este processo realiza as seguintes operações:
+    1. Lê em blocos apenas as linhas do intervalo de bytes [start, end) da entrada, ou o
+       arquivo inteiro se `end` for None (arquivos comprimidos).
+    2. Aplica a cada bloco as regras de `src.main.clean_data`.
+    3. Anexa as linhas válidas de cada bloco à saída limpa do shard, particionada
+       por data (`output_path`/cleaned_data; ver `src.partitioned`).
+    4. Acumula os contadores de qualidade, a soma e a contagem de 'risk_score' por
+       região e a última venda por endereço (ver `src.fused.add_chunk`).
+    5. Grava o agregado parcial em `output_path`, para a tarefa `data_merge`.
+    6. Com `sketches`, atualiza bloco a bloco e grava os sketches por região
+       (quantis de 'risk_score' e 'amount' e endereços distintos; ver `src.sketches`).
+    7. Com `risk_window`, acumula e grava a soma, a contagem e o máximo de
+       'risk_score' por região e intervalo de tempo (ver `src.windows`).
+    8. Com `quarantine`, grava as linhas rejeitadas de cada bloco e as regras que
+       elas violaram (`output_path`/quarantine.csv; ver `src.quality.quarantine_rows`).
+    9. Com `dedup_dir`, descarta as transações já presentes no índice gravado ou
+       repetidas no shard e grava as chaves das aceitas, para que `data_merge`
+       descarte as repetidas entre shards (ver `src.sharding.dedup_shards`).
+
+    Cada shard é uma instância mapeada desta tarefa, de modo que os shards são
+    processados em paralelo nos slots de worker disponíveis.
+
+    Example:
+        data_shard("data/input.csv", 95, 25334, "data/shards/shard-00000")
+
+    Args:
+        input_path (str): Caminho do arquivo CSV do shard (comprimido apenas com
+            `end` None).
+        start (int): Início do shard, em bytes.
+        end (int | None): Fim do shard, em bytes; None lê o arquivo inteiro.
+        output_path (str): Diretório do agregado parcial e da saída limpa do shard.
+        chunksize (int): Quantidade máxima de linhas lidas por bloco.
+        sketches (bool): Se True, grava também os sketches por região do shard.
+        risk_window (str, optional): Largura das janelas da série de risco por
+            região (ex.: '1h', '1D').
+        risk_slide (str, optional): Passo das janelas deslizantes.
+        engine (str): Motor de cálculo que seleciona as linhas limpas ("pandas" ou
+            "numpy", ver `src.engines`); a saída é a mesma com ambos.
+        quarantine (bool): Se True, grava também as linhas rejeitadas do shard.
+        dedup_dir (str, optional): Diretório do índice das transações já
+            ingeridas (ver `src.dedup`); apenas lido, pois o índice é gravado
+            por `data_merge`.
+        offset (int): Posição da primeira linha do arquivo na entrada, calculada
+            por `data_split` (ver `src.sharding.plan_shards`).
+        ti (TaskInstance, optional): Instância da tarefa, usada para enviar as
+            métricas da etapa ao XCom (ver `src.instrumentation`).
+
+    Returns:
+        str: Diretório do agregado parcial (enviado ao XCom).
+
+    Raises:
+        FileNotFoundError: Se o arquivo CSV de entrada não for encontrado.
+    """
+    with instrument_stage("data_shard", ti=ti) as metrics:
+        counts = process_shard(
+            input_path,
+            start,
+            end,
+            output_path,
+            chunksize,
+            sketches,
+            risk_window,
+            risk_slide,
+            engine,
+            quarantine,
+            None if dedup_dir is None else DedupIndex.open(dedup_dir),
+            offset,
+        )
+        metrics["rows_in"] = counts["total_records"]
+        metrics["rows_out"] = counts["valid_records"]
+        logging.info(
+            f"Shard {start}-{end} processado. Registros lidos: "
+            f"{counts['total_records']}. Registros válidos: {counts['valid_records']}"
+        )
+        return output_path
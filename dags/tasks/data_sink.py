@@ -0,0 +1,70 @@
+import logging
+import os
+
+from src.instrumentation import instrument_stage
+from src.sink import DATABASE_URL_ENV, sink_tables
+
+
+def data_sink(
+    table1_path="data/table1",
+    table2_path="data/table2",
+    cleaned_path=None,
+    database_url=None,
+    run_id=None,
+    ti=None,
+):
+    """Grava as Tabelas 1 e 2 e, opcionalmente, os dados limpos em um banco relacional.
+
+    Este processo realiza as seguintes operações:
+    1. Abre (ou reaproveita) o engine do banco, com pool de conexões.
+    2. Para cada tabela, remove as linhas já gravadas pela mesma execução (`run_id`).
+    3. Envia as linhas em lotes: COPY no PostgreSQL e executemany nos demais bancos.
+
+    Cada tabela é gravada em uma única transação, de modo que repetir a tarefa
+    (ex.: após uma falha) não duplica linhas. Os dados limpos são lidos da tabela
+    particionada parte a parte, sem carregá-la inteira na memória.
+
+    Sem URL de banco configurada, a tarefa apenas registra no log que o sink está
+    desativado, para que o DAG funcione sem banco de destino.
+
+    Logs são gerados com a quantidade de linhas gravadas em cada tabela.
+
+    Example:
+        data_sink(database_url="sqlite:///data/pipeline.db", run_id="manual")
+
+    Args:
+        table1_path (str): Diretório da tabela colunar da Tabela 1.
+        table2_path (str): Diretório da tabela colunar da Tabela 2.
+        cleaned_path (str, optional): Diretório da tabela com os dados limpos,
+            particionada por data ou não (no DAG principal, a tabela gravada por
+            `data_merge`); se omitido, apenas as Tabelas 1 e 2 são gravadas.
+        database_url (str, optional): URL do banco no formato do SQLAlchemy. Usa a
+            variável de ambiente `PIPELINE_DATABASE_URL`.
+        run_id (str, optional): Identificador da execução; no Airflow, recebe o
+            `run_id` da execução do DAG.
+        ti (TaskInstance, optional): Instância da tarefa, usada para enviar as
+            métricas da etapa ao XCom (ver `src.instrumentation`).
+
+    Returns:
+        None
+
+    Raises:
+        FileNotFoundError: Se alguma das tabelas não for encontrada.
+    """
+    database_url = database_url or os.environ.get(DATABASE_URL_ENV)
+    if not database_url:
+        logging.info(f"Sink desativado: defina {DATABASE_URL_ENV} para gravar no banco.")
+        return
+
+    with instrument_stage("data_sink", ti=ti) as metrics:
+        tables = {"table1": table1_path, "table2": table2_path}
+        if cleaned_path is not None:
+            tables["cleaned_data"] = cleaned_path
+        run_id = run_id or "manual"
+
+        logging.info(f"Gravando {list(tables)} no banco (execução {run_id}).")
+        rows = sink_tables(tables, run_id, database_url)
+        metrics["rows_in"] = metrics["rows_out"] = sum(rows.values())
+
+        for name, count in rows.items():
+            logging.info(f"Tabela '{name}': {count} linhas gravadas.")
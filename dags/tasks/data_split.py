@@ -0,0 +1,86 @@
+import logging
+import os
+import shutil
+
+from src.engines import DEFAULT_ENGINE
+from src.instrumentation import instrument_stage
+from src.main import DEFAULT_CHUNKSIZE
+from src.sharding import plan_shards
+
+
+def data_split(
+    input_path="data/input.csv",
+    n_shards=8,
+    shard_dir="data/shards",
+    chunksize=DEFAULT_CHUNKSIZE,
+    sketches=False,
+    risk_window=None,
+    risk_slide=None,
+    engine=DEFAULT_ENGINE,
+    quarantine=False,
+    dedup_dir=None,
+    ti=None,
+):
+    """Divide o arquivo de entrada em shards para o mapeamento dinâmico de tarefas.
+
+    Este processo realiza as seguintes operações:
+    1. Expande o padrão glob de `input_path` e divide as linhas de dados de cada CSV sem
+       compressão em intervalos de bytes de tamanho parecido, cada um começando no início
+       de uma linha (sem ler o arquivo inteiro), com os `n_shards` distribuídos entre os
+       arquivos pelo tamanho. Cada arquivo comprimido é um shard, lido inteiro.
+    2. Limpa os parciais de execuções anteriores em `shard_dir`.
+    3. Retorna os argumentos de `data_shard` para cada shard; o Airflow cria uma
+       instância mapeada da tarefa por item (`PythonOperator.partial().expand()`).
+
+    Example:
+        data_split(n_shards=16)
+
+    Args:
+        input_path (str): Caminho do arquivo CSV de entrada ou padrão glob (ex.:
+            'data/input/*.csv.gz'); arquivos comprimidos (.gz, .xz, .bz2, .zst, .zip)
+            são aceitos.
+        n_shards (int): Quantidade desejada de shards.
+        shard_dir (str): Diretório dos agregados parciais de cada shard.
+        chunksize (int): Quantidade máxima de linhas lidas por bloco em cada shard.
+        sketches (bool): Se True, cada shard grava também os sketches por região
+            (quantis e contagens de distintos; ver `src.sketches`).
+        risk_window (str, optional): Largura das janelas da série de risco por
+            região calculada em cada shard (ex.: '1h'; ver `src.windows`).
+        risk_slide (str, optional): Passo das janelas deslizantes.
+        engine (str): Motor de cálculo usado pelos shards na limpeza (ver
+            `src.engines`).
+        quarantine (bool): Se True, cada shard grava também as linhas rejeitadas
+            e as regras violadas (ver `src.quality.quarantine_rows`).
+        dedup_dir (str, optional): Diretório do índice das transações já
+            ingeridas, consultado pelos shards (ver `src.dedup`).
+        ti (TaskInstance, optional): Instância da tarefa, usada para enviar as
+            métricas da etapa ao XCom (ver `src.instrumentation`).
+
+    Returns:
+        list[dict]: Argumentos (`op_kwargs`) de cada instância de `data_shard`.
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo de entrada for encontrado.
+    """
+    with instrument_stage("data_split", ti=ti) as metrics:
+        shards = plan_shards(input_path, n_shards)
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        metrics["rows_out"] = len(shards)
+        logging.info(f"Entrada dividida em {len(shards)} shards.")
+        return [
+            {
+                "input_path": shard["path"],
+                "start": shard["start"],
+                "end": shard["end"],
+                "offset": shard["offset"],
+                "output_path": os.path.join(shard_dir, f"shard-{shard['shard']:05d}"),
+                "chunksize": chunksize,
+                "sketches": sketches,
+                "risk_window": risk_window,
+                "risk_slide": risk_slide,
+                "engine": engine,
+                "quarantine": quarantine,
+                "dedup_dir": dedup_dir,
+            }
+            for shard in shards
+        ]
@@ -0,0 +1,143 @@
+from src.lazy import lazy_import
+from src.topk import latest_per_key, top_k_positions
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Colunas do estado parcial de "última venda por endereço"
+LATEST_SALES_COLUMNS = ['receiving_address', 'timestamp', 'amount', 'seq']
+
+
+def region_partial(df):
+    """
+    Calcula a soma e a contagem de 'risk_score' por 'location_region'.
+
+    O resultado é um agregado parcial: parciais de blocos, execuções ou
+    partições diferentes podem ser combinados com `merge_region_partials`.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpo.
+
+    Returns:
+        pd.DataFrame: Colunas 'location_region', 'risk_sum' e 'risk_count'.
+    """
+    risk = df['risk_score'].astype('float64')
+    grouped = risk.groupby(df['location_region'], observed=True)
+    partial = pd.DataFrame({'risk_sum': grouped.sum(), 'risk_count': grouped.count()})
+    partial.index = partial.index.astype(object)
+    partial.index.name = 'location_region'
+    return partial.reset_index()
+
+
+def merge_region_partials(partials):
+    """
+    Combina agregados parciais de região somando somas e contagens.
+
+    Args:
+        partials (list[pd.DataFrame]): Parciais como os de `region_partial`.
+
+    Returns:
+        pd.DataFrame: Parcial combinado, no mesmo formato.
+    """
+    combined = pd.concat(partials, ignore_index=True)
+    return (
+        combined.groupby('location_region', sort=False)[['risk_sum', 'risk_count']]
+        .sum()
+        .reset_index()
+    )
+
+
+def table1_from_regions(regions):
+    """
+    Gera a Tabela 1 (média de 'risk_score' por região) a partir do parcial.
+
+    Args:
+        regions (pd.DataFrame): Parcial como o de `region_partial`.
+
+    Returns:
+        pd.DataFrame: Colunas 'location_region' e 'risk_score', em ordem
+        decrescente de média.
+    """
+    mean = regions['risk_sum'] / regions['risk_count']
+    table1 = pd.DataFrame(
+        {'location_region': regions['location_region'], 'risk_score': mean}
+    )
+    table1 = table1.sort_values('risk_score', ascending=False).reset_index(drop=True)
+    return table1.astype({'location_region': object})
+
+
+def latest_sales_partial(df, seq=None):
+    """
+    Seleciona a venda mais recente de cada 'receiving_address'.
+
+    Empates de 'timestamp' são resolvidos por `seq`, a posição global da
+    linha na entrada: vence a linha que aparece por último.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpo.
+        seq (np.ndarray, optional): Posição global de cada linha. Se omitido,
+            usa a posição da linha em `df`.
+
+    Returns:
+        pd.DataFrame: Colunas de `LATEST_SALES_COLUMNS`, uma linha por endereço.
+    """
+    if seq is None:
+        seq = np.arange(len(df), dtype=np.int64)
+    is_sale = (df['transaction_type'] == 'sale').to_numpy()
+    sales = pd.DataFrame(
+        {
+            'receiving_address': df['receiving_address'].array[is_sale],
+            'timestamp': df['timestamp'].to_numpy()[is_sale],
+            'amount': df['amount'].to_numpy(dtype='float64')[is_sale],
+            'seq': np.asarray(seq, dtype=np.int64)[is_sale],
+        }
+    )
+    return _keep_latest(sales)
+
+
+def merge_latest_sales(partials):
+    """
+    Combina parciais de última venda, mantendo a mais recente por endereço.
+
+    Args:
+        partials (list[pd.DataFrame]): Parciais como os de `latest_sales_partial`.
+
+    Returns:
+        pd.DataFrame: Parcial combinado, no mesmo formato.
+    """
+    return _keep_latest(pd.concat(partials, ignore_index=True))
+
+
+def _keep_latest(sales):
+    """
+    Mantém, para cada endereço, a linha com maior ('timestamp', 'seq').
+
+    Args:
+        sales (pd.DataFrame): Linhas com as colunas de `LATEST_SALES_COLUMNS`.
+
+    Returns:
+        pd.DataFrame: Uma linha por endereço.
+    """
+    latest = latest_per_key(
+        sales['receiving_address'],
+        sales['timestamp'].to_numpy(),
+        sales['seq'].to_numpy(),
+    )
+    return sales.iloc[latest].reset_index(drop=True)
+
+
+def table2_from_latest(latest, k=3):
+    """
+    Gera a Tabela 2 (maiores vendas recentes) a partir do parcial.
+
+    Args:
+        latest (pd.DataFrame): Parcial como o de `latest_sales_partial`.
+        k (int): Quantidade de transações na tabela.
+
+    Returns:
+        pd.DataFrame: Colunas 'receiving_address', 'amount' e 'timestamp'.
+    """
+    top = top_k_positions(latest['amount'].to_numpy(), k, latest['receiving_address'])
+    columns = ['receiving_address', 'amount', 'timestamp']
+    table2 = latest[columns].iloc[top].reset_index(drop=True)
+    return table2.astype({'receiving_address': object})
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+
+from src.columnar import read_table, write_table
+
+# Tamanho máximo padrão do diretório de cache
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+# Tamanho de cada amostra (início, meio e fim) usada no hash rápido de arquivos
+_SAMPLE_BYTES = 1 << 20
+
+# Arquivo que descreve uma entrada do cache; seu mtime marca o último acesso
+ENTRY_FILE = "_entry.json"
+
+# Diretório com o código do pipeline, usado como versão das etapas
+_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Diretórios cujos fontes compõem a versão do código: o pipeline e as tarefas
+# do DAG, que também montam etapas memorizadas
+_VERSIONED_DIRS = (
+    _SOURCE_DIR,
+    os.path.join(os.path.dirname(_SOURCE_DIR), "dags", "tasks"),
+)
+
+
+def file_fingerprint(path):
+    """
+    Calcula a impressão digital de um arquivo ou diretório.
+
+    Combina tamanho, data de modificação e um hash de amostras do início, do
+    meio e do fim de cada arquivo, sem ler o arquivo inteiro. Diretórios
+    (como as tabelas colunares) combinam as impressões de todos os arquivos.
+
+    Args:
+        path (str): Caminho do arquivo ou diretório.
+
+    Returns:
+        str: Impressão digital em hexadecimal.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+    digest = hashlib.blake2b(digest_size=16)
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                digest.update(os.path.relpath(file_path, path).encode())
+                digest.update(file_fingerprint(file_path).encode())
+        return digest.hexdigest()
+
+    stat = os.stat(path)
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, 'rb') as f:
+        for offset in (0, stat.st_size // 2, stat.st_size - _SAMPLE_BYTES):
+            f.seek(max(0, offset))
+            digest.update(f.read(_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def code_version():
+    """
+    Calcula a versão do código do pipeline a partir dos fontes de `src/` e
+    de `dags/tasks/`.
+
+    Qualquer mudança no código das etapas (ou nas funções que elas usam)
+    muda a versão e, portanto, as chaves do cache.
+
+    Returns:
+        str: Hash hexadecimal dos arquivos .py dos dois diretórios.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    root = os.path.dirname(_SOURCE_DIR)
+    for directory in _VERSIONED_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".py"):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def stage_key(stage, inputs, params=None):
+    """
+    Calcula a chave de cache de uma etapa.
+
+    Args:
+        stage (str): Nome da etapa (ex.: "cleaning").
+        inputs (list[str]): Arquivos ou diretórios lidos pela etapa.
+        params (dict, optional): Parâmetros que influenciam o resultado.
+
+    Returns:
+        str: Chave hexadecimal que identifica a saída da etapa.
+    """
+    description = {
+        'stage': stage,
+        'inputs': [file_fingerprint(path) for path in inputs],
+        'params': params or {},
+        'code': code_version(),
+    }
+    encoded = json.dumps(description, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def lookup_entry(cache_dir, key):
+    """
+    Procura uma entrada do cache e marca o acesso (usado no LRU).
+
+    Args:
+        cache_dir (str): Diretório do cache.
+        key (str): Chave calculada por `stage_key`.
+
+    Returns:
+        dict | None: Descrição da entrada ('tables' e 'metadata'), ou None se
+        a chave não estiver no cache.
+    """
+    entry_path = os.path.join(cache_dir, key, ENTRY_FILE)
+    if not os.path.exists(entry_path):
+        return None
+    with open(entry_path) as f:
+        entry = json.load(f)
+    os.utime(entry_path)
+    return entry
+
+
+def load_cached(cache_dir, key, restore=None):
+    """
+    Carrega as tabelas de uma entrada do cache, se existir.
+
+    Args:
+        cache_dir (str): Diretório do cache.
+        key (str): Chave calculada por `stage_key`.
+        restore (dict, optional): Caminho de destino das tabelas que são
+            copiadas (ver `restore_table`) em vez de carregadas, por nome; o
+            resultado traz o caminho no lugar do DataFrame.
+
+    Returns:
+        tuple[dict, dict] | None: Tabelas por nome e metadados da entrada, ou
+        None se a chave não estiver no cache.
+    """
+    entry = lookup_entry(cache_dir, key)
+    if entry is None:
+        return None
+    restore = restore or {}
+    tables = {}
+    for name in entry['tables']:
+        if name in restore:
+            restore_table(cache_dir, key, name, restore[name])
+            tables[name] = restore[name]
+        else:
+            tables[name] = read_table(os.path.join(cache_dir, key, name))
+    return tables, entry['metadata']
+
+
+def restore_table(cache_dir, key, name, path):
+    """
+    Copia uma tabela colunar do cache para `path`, substituindo o conteúdo.
+
+    A cópia preserva as datas de modificação dos arquivos, de modo que a
+    impressão digital da tabela restaurada é a mesma da tabela original e as
+    etapas seguintes também encontram suas entradas no cache.
+
+    Args:
+        cache_dir (str): Diretório do cache.
+        key (str): Chave calculada por `stage_key`.
+        name (str): Nome da tabela na entrada.
+        path (str): Diretório de destino.
+    """
+    shutil.rmtree(path, ignore_errors=True)
+    shutil.copytree(os.path.join(cache_dir, key, name), path)
+
+
+def store_cached(cache_dir, key, tables, metadata=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Grava as tabelas de uma etapa no cache e aplica o limite de tamanho.
+
+    A entrada é montada em um diretório temporário e renomeada no final, de
+    modo que leitores nunca veem uma entrada incompleta.
+
+    Args:
+        cache_dir (str): Diretório do cache.
+        key (str): Chave calculada por `stage_key`.
+        tables (dict): Tabelas por nome: DataFrames ou diretórios de tabelas
+            colunares já gravadas (copiados para o cache).
+        metadata (dict, optional): Informações adicionais serializáveis em JSON.
+        max_bytes (int): Tamanho máximo do diretório de cache.
+    """
+    entry_dir = os.path.join(cache_dir, key)
+    tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, table in tables.items():
+        if isinstance(table, str):
+            shutil.copytree(table, os.path.join(tmp_dir, name))
+        else:
+            write_table(table, os.path.join(tmp_dir, name))
+    with open(os.path.join(tmp_dir, ENTRY_FILE), 'w') as f:
+        json.dump({'tables': list(tables), 'metadata': metadata or {}}, f)
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+    evict_lru(cache_dir, max_bytes)
+
+
+def _directory_size(path):
+    """Soma o tamanho de todos os arquivos de um diretório."""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+def evict_lru(cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Remove as entradas acessadas há mais tempo até o cache caber no limite.
+
+    Args:
+        cache_dir (str): Diretório do cache.
+        max_bytes (int): Tamanho máximo do diretório de cache.
+
+    Returns:
+        list[str]: Chaves das entradas removidas.
+    """
+    entries = []
+    for key in os.listdir(cache_dir):
+        entry_path = os.path.join(cache_dir, key, ENTRY_FILE)
+        if os.path.exists(entry_path):
+            last_access = os.path.getmtime(entry_path)
+            entries.append((last_access, key, _directory_size(os.path.join(cache_dir, key))))
+
+    total = sum(size for _, _, size in entries)
+    evicted = []
+    for _, key, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(os.path.join(cache_dir, key), ignore_errors=True)
+        total -= size
+        evicted.append(key)
+    if evicted:
+        logging.info(f"Cache: {len(evicted)} entradas removidas para caber em {max_bytes} bytes.")
+    return evicted
+
+
+def run_cached(
+    cache_dir, stage, inputs, params, func, max_bytes=DEFAULT_MAX_BYTES, restore=None
+):
+    """
+    Executa uma etapa reaproveitando a saída em cache quando possível.
+
+    Args:
+        cache_dir (str | None): Diretório do cache. Se None, apenas executa.
+        stage (str): Nome da etapa.
+        inputs (list[str]): Arquivos ou diretórios lidos pela etapa.
+        params (dict): Parâmetros que influenciam o resultado.
+        func (callable): Função sem argumentos que executa a etapa e retorna
+            `(tabelas, metadados)`.
+        max_bytes (int): Tamanho máximo do diretório de cache.
+        restore (dict, optional): Tabelas gravadas pela etapa como diretórios
+            (ex.: tabelas particionadas), por nome e caminho. Do cache, são
+            copiadas para o caminho em vez de carregadas (ver `load_cached`).
+
+    Returns:
+        tuple[dict, dict]: Tabelas por nome e metadados da etapa.
+    """
+    if cache_dir is None:
+        return func()
+    os.makedirs(cache_dir, exist_ok=True)
+    key = stage_key(stage, inputs, params)
+    started = time.perf_counter()
+    cached = load_cached(cache_dir, key, restore)
+    if cached is not None:
+        logging.info(
+            f"Cache: etapa '{stage}' reaproveitada "
+            f"({time.perf_counter() - started:.3f}s)."
+        )
+        return cached
+    tables, metadata = func()
+    store_cached(cache_dir, key, tables, metadata, max_bytes)
+    return tables, metadata
@@ -0,0 +1,339 @@
+import json
+import os
+import shutil
+
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# Arquivo com a descrição das colunas e das partes de uma tabela colunar
+MANIFEST_FILE = "_manifest.json"
+
+
+def _column_files(part_dir, name):
+    """
+    Retorna os caminhos dos arquivos de uma coluna dentro de uma parte.
+
+    Args:
+        part_dir (str): Diretório da parte.
+        name (str): Nome da coluna.
+
+    Returns:
+        tuple[str, str, str]: Caminhos dos valores, códigos e categorias.
+    """
+    base = os.path.join(part_dir, name)
+    return f"{base}.npy", f"{base}.codes.npy", f"{base}.categories.npy"
+
+
+def _describe_column(series):
+    """
+    Define como uma coluna é armazenada: numérica ou categórica.
+
+    Colunas de texto (object/string) são sempre gravadas como categóricas,
+    pois arrays NumPy de objetos não podem ser mapeados em memória.
+
+    Args:
+        series (pd.Series): Coluna a ser descrita.
+
+    Returns:
+        dict: Tipo de armazenamento ("numeric" ou "categorical") e dtype.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or not (
+        pd.api.types.is_numeric_dtype(dtype)
+        or pd.api.types.is_bool_dtype(dtype)
+        or pd.api.types.is_datetime64_dtype(dtype)
+    ):
+        return {"kind": "categorical", "dtype": "category"}
+    return {"kind": "numeric", "dtype": str(dtype)}
+
+
+def _write_part(df, part_dir, columns):
+    """
+    Grava um DataFrame como uma parte da tabela, um arquivo .npy por coluna.
+
+    Args:
+        df (pd.DataFrame): Dados da parte.
+        part_dir (str): Diretório da parte (criado aqui).
+        columns (dict): Descrição das colunas, como em `_describe_column`.
+    """
+    os.makedirs(part_dir)
+    for name, spec in columns.items():
+        values_path, codes_path, categories_path = _column_files(part_dir, name)
+        series = df[name]
+        if spec["kind"] == "numeric":
+            values = series.to_numpy()
+            if values.dtype == object:
+                raise ValueError(
+                    f"Coluna '{name}' é numérica na tabela, mas o bloco "
+                    f"contém valores do tipo {series.dtype}"
+                )
+            # Cada parte guarda o próprio dtype (ex.: int64 que virou float64
+            # por conter NaN); a concatenação na leitura unifica os tipos
+            np.save(values_path, values)
+            continue
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            categories = series.cat.categories
+        else:
+            codes, categories = pd.factorize(series)
+        np.save(codes_path, codes.astype(np.int32, copy=False))
+        np.save(categories_path, np.asarray(categories, dtype=str))
+
+
+def _read_manifest(path):
+    """
+    Lê o manifesto de uma tabela colunar.
+
+    Args:
+        path (str): Diretório da tabela.
+
+    Returns:
+        dict: Manifesto com as colunas e a lista de partes.
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"Tabela colunar não encontrada: {path}")
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def _write_manifest(path, manifest):
+    """
+    Grava o manifesto de forma atômica (arquivo temporário + rename).
+
+    Args:
+        path (str): Diretório da tabela.
+        manifest (dict): Manifesto a ser gravado.
+    """
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+def write_table(df, path):
+    """
+    Grava um DataFrame como tabela colunar, substituindo a existente.
+
+    Args:
+        df (pd.DataFrame): Dados a serem gravados.
+        path (str): Diretório de destino da tabela.
+    """
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    columns = {name: _describe_column(df[name]) for name in df.columns}
+    _write_part(df, os.path.join(tmp_path, "part-00000"), columns)
+    _write_manifest(tmp_path, {"columns": columns, "parts": ["part-00000"]})
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def append_table(df, path):
+    """
+    Acrescenta um DataFrame como nova parte de uma tabela colunar.
+
+    A tabela é criada se ainda não existir. Permite gravar a saída de um
+    processamento em blocos sem manter todos os blocos na memória.
+
+    Args:
+        df (pd.DataFrame): Dados a serem acrescentados.
+        path (str): Diretório da tabela.
+
+    Raises:
+        ValueError: Se as colunas do DataFrame forem diferentes das da tabela.
+    """
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        manifest = _read_manifest(path)
+        if list(manifest["columns"]) != list(df.columns):
+            raise ValueError(
+                f"Colunas {list(df.columns)} diferentes das da tabela "
+                f"{list(manifest['columns'])}"
+            )
+    else:
+        os.makedirs(path, exist_ok=True)
+        columns = {name: _describe_column(df[name]) for name in df.columns}
+        manifest = {"columns": columns, "parts": []}
+
+    part = f"part-{len(manifest['parts']):05d}"
+    part_dir = os.path.join(path, part)
+    shutil.rmtree(part_dir, ignore_errors=True)
+    _write_part(df, part_dir, manifest["columns"])
+    manifest["parts"].append(part)
+    _write_manifest(path, manifest)
+
+
+def move_parts(source, path):
+    """
+    Transfere as partes de uma tabela colunar para o fim de outra.
+
+    As partes são renomeadas, sem regravar os dados, e passam a ser as
+    últimas partes da tabela de destino, na ordem em que estavam na origem.
+    A tabela de destino é criada se ainda não existir; a de origem é
+    removida.
+
+    Args:
+        source (str): Diretório da tabela de origem.
+        path (str): Diretório da tabela de destino (no mesmo sistema de
+            arquivos).
+
+    Raises:
+        ValueError: Se as colunas das tabelas forem diferentes.
+    """
+    moved = _read_manifest(source)
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        manifest = _read_manifest(path)
+        if list(manifest["columns"]) != list(moved["columns"]):
+            raise ValueError(
+                f"Colunas {list(moved['columns'])} diferentes das da tabela "
+                f"{list(manifest['columns'])}"
+            )
+    else:
+        os.makedirs(path, exist_ok=True)
+        manifest = {"columns": moved["columns"], "parts": []}
+
+    for part in moved["parts"]:
+        name = f"part-{len(manifest['parts']):05d}"
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+        os.replace(os.path.join(source, part), os.path.join(path, name))
+        manifest["parts"].append(name)
+    _write_manifest(path, manifest)
+    shutil.rmtree(source)
+
+
+def table_columns(path):
+    """
+    Lista as colunas de uma tabela colunar sem ler os dados.
+
+    Args:
+        path (str): Diretório da tabela.
+
+    Returns:
+        list[str]: Nomes das colunas, na ordem de gravação.
+    """
+    return list(_read_manifest(path)["columns"])
+
+
+def _read_column(part_dir, name, spec, mmap):
+    """
+    Lê uma coluna de uma parte da tabela.
+
+    Args:
+        part_dir (str): Diretório da parte.
+        name (str): Nome da coluna.
+        spec (dict): Descrição da coluna.
+        mmap (bool): Se True, mapeia o arquivo em memória em vez de lê-lo.
+
+    Returns:
+        np.ndarray | pd.Categorical: Valores da coluna.
+    """
+    mmap_mode = "c" if mmap else None
+    values_path, codes_path, categories_path = _column_files(part_dir, name)
+    if spec["kind"] == "numeric":
+        return np.load(values_path, mmap_mode=mmap_mode, allow_pickle=False)
+    codes = np.load(codes_path, mmap_mode=mmap_mode, allow_pickle=False)
+    categories = np.load(categories_path, allow_pickle=False)
+    # dtype fixo para que partes com categorias vazias possam ser unidas
+    categories = pd.Index(categories, dtype=object)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _concat_column(values):
+    """
+    Concatena os valores de uma coluna lidos de várias partes.
+
+    Args:
+        values (list): Valores de cada parte, como em `_read_column`.
+
+    Returns:
+        np.ndarray | pd.Categorical: Valores concatenados.
+    """
+    if len(values) == 1:
+        return values[0]
+    if isinstance(values[0], pd.Categorical):
+        merged = pd.api.types.union_categoricals(values)
+        # A união pode inferir outro dtype para as categorias (texto no
+        # Pandas 3); mantém o de `_read_column`, comum a todas as partes
+        categories = pd.Index(merged.categories, dtype=object)
+        return pd.Categorical.from_codes(merged.codes, categories=categories)
+    return np.concatenate(values)
+
+
+def read_table(path, columns=None, mmap=True):
+    """
+    Lê uma tabela colunar, carregando apenas as colunas pedidas.
+
+    Os tipos gravados são preservados (colunas de texto voltam como
+    categóricas) e nenhum texto é interpretado durante a leitura.
+
+    Args:
+        path (str): Diretório da tabela.
+        columns (list[str], optional): Colunas a carregar. Todas, se omitido.
+        mmap (bool): Se True, mapeia os arquivos em memória (cópia sob escrita).
+
+    Returns:
+        pd.DataFrame: DataFrame com as colunas pedidas.
+
+    Raises:
+        FileNotFoundError: Se a tabela não existir.
+        KeyError: Se alguma coluna pedida não existir na tabela.
+    """
+    manifest = _read_manifest(path)
+    if columns is None:
+        columns = list(manifest["columns"])
+    missing = [name for name in columns if name not in manifest["columns"]]
+    if missing:
+        raise KeyError(f"Colunas inexistentes em {path}: {missing}")
+
+    data = {}
+    for name in columns:
+        spec = manifest["columns"][name]
+        values = [
+            _read_column(os.path.join(path, part), name, spec, mmap)
+            for part in manifest["parts"]
+        ]
+        if not values:
+            dtype = "category" if spec["kind"] == "categorical" else spec["dtype"]
+            data[name] = pd.Series([], dtype=dtype)
+            continue
+        data[name] = _concat_column(values)
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+
+def iter_table_parts(path, columns=None, mmap=True):
+    """
+    Percorre uma tabela colunar parte a parte, sem concatenar as partes.
+
+    Útil para processar tabelas grandes gravadas em blocos (ver
+    `append_table`) com memória limitada ao tamanho de uma parte.
+
+    Args:
+        path (str): Diretório da tabela.
+        columns (list[str], optional): Colunas a carregar. Todas, se omitido.
+        mmap (bool): Se True, mapeia os arquivos em memória (cópia sob escrita).
+
+    Yields:
+        pd.DataFrame: Dados de uma parte, com as colunas pedidas.
+
+    Raises:
+        FileNotFoundError: Se a tabela não existir.
+        KeyError: Se alguma coluna pedida não existir na tabela.
+    """
+    manifest = _read_manifest(path)
+    if columns is None:
+        columns = list(manifest["columns"])
+    missing = [name for name in columns if name not in manifest["columns"]]
+    if missing:
+        raise KeyError(f"Colunas inexistentes em {path}: {missing}")
+
+    for part in manifest["parts"]:
+        part_dir = os.path.join(path, part)
+        data = {
+            name: _read_column(part_dir, name, manifest["columns"][name], mmap)
+            for name in columns
+        }
+        yield pd.DataFrame(data, columns=columns, copy=False)
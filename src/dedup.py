@@ -0,0 +1,322 @@
+import json
+import math
+import os
+import shutil
+
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# Colunas que identificam uma transação: reentregas da mesma transação têm os
+# mesmos valores nessas colunas
+IDENTITY_COLUMNS = [
+    'timestamp',
+    'sending_address',
+    'receiving_address',
+    'amount',
+    'transaction_type',
+]
+
+# Chaves previstas no primeiro dimensionamento do filtro de Bloom; ao
+# ultrapassá-las, o filtro é reconstruído com o dobro da capacidade
+DEFAULT_CAPACITY = 1_000_000
+
+# Taxa de falsos positivos do filtro de Bloom: apenas essa fração das chaves
+# novas precisa de busca binária no índice ordenado
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+_KEYS_FILE = "keys.npy"
+_BLOOM_FILE = "bloom.npy"
+
+# Descrição do índice e versão vigente: os arquivos de cada gravação ficam em
+# um diretório de versão ('v0/', 'v1/', ...), tornado vigente ao substituir
+# este arquivo
+_META_FILE = "_dedup.json"
+
+
+def identity_hashes(df, columns=IDENTITY_COLUMNS):
+    """
+    Calcula um hash de 64 bits da identidade de cada linha.
+
+    O hash depende apenas dos valores (colunas categóricas são comparadas pelo
+    texto, não pelos códigos), de modo que é o mesmo entre blocos, arquivos e
+    execuções. Colunas ausentes no DataFrame são ignoradas.
+
+    Args:
+        df (pd.DataFrame): Linhas com os tipos de `src.schema`.
+        columns (list[str]): Colunas de identidade.
+
+    Returns:
+        np.ndarray: Hashes (uint64), um por linha.
+
+    Raises:
+        KeyError: Se nenhuma coluna de identidade estiver presente.
+    """
+    present = [name for name in columns if name in df.columns]
+    if not present:
+        raise KeyError(f"Nenhuma coluna de identidade encontrada: {columns}")
+    return pd.util.hash_pandas_object(df[present], index=False).to_numpy()
+
+
+def _bloom_size(capacity, false_positive_rate):
+    """Calcula os bits e a quantidade de funções de hash do filtro de Bloom."""
+    bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class DedupIndex:
+    """
+    Índice persistente das transações já ingeridas.
+
+    As chaves são os hashes de `identity_hashes`, guardadas em um array
+    ordenado de uint64 (8 bytes por transação, mapeado em memória ao abrir) e
+    precedidas por um filtro de Bloom (cerca de 10 bits por transação,
+    empacotados em bytes no disco e na memória; os bits são marcados e
+    consultados com deslocamentos e máscaras). Cada bloco é verificado de
+    forma vetorizada: o filtro descarta a maioria das chaves novas e apenas
+    as suspeitas são confirmadas por busca binária.
+
+    As chaves de uma execução só são gravadas por `save`, chamado depois que
+    a saída da execução foi gravada: se a execução falhar, as linhas serão
+    aceitas de novo na próxima, e cada transação entra na saída uma única vez.
+
+    Example:
+        index = DedupIndex.open("data/dedup")
+        for chunk in chunks:
+            chunk = chunk[index.add_new(identity_hashes(chunk))]
+        index.save()
+
+    Args:
+        path (str, optional): Diretório do índice, usado por `save`.
+        capacity (int): Chaves previstas para o filtro de Bloom.
+        false_positive_rate (float): Taxa de falsos positivos do filtro.
+    """
+
+    def __init__(
+        self,
+        path=None,
+        capacity=DEFAULT_CAPACITY,
+        false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE,
+    ):
+        self.path = path
+        self.false_positive_rate = false_positive_rate
+        self.keys = np.empty(0, dtype=np.uint64)
+        self._pending = []
+        self._pending_count = 0
+        self._reset_bloom(capacity)
+
+    @classmethod
+    def open(
+        cls,
+        path,
+        capacity=DEFAULT_CAPACITY,
+        false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE,
+    ):
+        """
+        Abre o índice gravado em `path`, ou cria um vazio se ele não existir.
+
+        Args:
+            path (str): Diretório do índice.
+            capacity (int): Chaves previstas (apenas para um índice novo).
+            false_positive_rate (float): Taxa de falsos positivos (apenas para
+                um índice novo).
+
+        Returns:
+            DedupIndex: Índice aberto.
+        """
+        meta_path = os.path.join(path, _META_FILE)
+        if not os.path.exists(meta_path):
+            return cls(path, capacity, false_positive_rate)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        index = cls(path, meta['capacity'], meta['false_positive_rate'])
+        version_dir = os.path.join(path, f"v{meta['version']}")
+        index.keys = np.load(
+            os.path.join(version_dir, _KEYS_FILE), mmap_mode='r', allow_pickle=False
+        )
+        index._bloom = np.load(os.path.join(version_dir, _BLOOM_FILE), allow_pickle=False)
+        return index
+
+    def __len__(self):
+        return len(self.keys) + self._pending_count
+
+    def _reset_bloom(self, capacity):
+        """Cria um filtro de Bloom vazio para `capacity` chaves."""
+        self.capacity = capacity
+        self._bloom_bits, self._bloom_hashes = _bloom_size(capacity, self.false_positive_rate)
+        # Bit i no byte i // 8, do mais significativo ao menos (`np.packbits`)
+        self._bloom = np.zeros(self._bloom_bits // 8, dtype=np.uint8)
+
+    def _bloom_positions(self, hashes):
+        """Posições dos bits de cada chave (hash duplo: h1 + i * h2)."""
+        # Metades de 32 bits em int64: as somas não transbordam e as posições
+        # já têm o tipo dos índices
+        h1 = (hashes & np.uint64(0xFFFFFFFF)).astype(np.int64)
+        h2 = ((hashes >> np.uint64(32)) | np.uint64(1)).astype(np.int64)
+        steps = np.arange(self._bloom_hashes, dtype=np.int64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % self._bloom_bits
+
+    @staticmethod
+    def _bit_masks(positions):
+        """Máscara de cada posição dentro do seu byte."""
+        return np.uint8(0x80) >> (positions & 7).astype(np.uint8)
+
+    def _bloom_add(self, hashes):
+        """Marca as chaves no filtro de Bloom."""
+        positions = self._bloom_positions(hashes).ravel()
+        # `.at`: posições do mesmo byte acumulam os bits em vez de se sobrescrever
+        np.bitwise_or.at(self._bloom, positions >> 3, self._bit_masks(positions))
+
+    def _bloom_contains(self, hashes):
+        """Indica as chaves que podem estar no índice (sem falsos negativos)."""
+        positions = self._bloom_positions(hashes)
+        return (self._bloom[positions >> 3] & self._bit_masks(positions)).all(axis=1)
+
+    @staticmethod
+    def _sorted_contains(keys, hashes):
+        """Indica as chaves presentes em um array ordenado (busca binária)."""
+        positions = np.searchsorted(keys, hashes)
+        found = np.zeros(len(hashes), dtype=bool)
+        inside = positions < len(keys)
+        found[inside] = keys[positions[inside]] == hashes[inside]
+        return found
+
+    def contains(self, hashes):
+        """
+        Indica as chaves já presentes no índice.
+
+        Args:
+            hashes (np.ndarray): Chaves (uint64).
+
+        Returns:
+            np.ndarray: Máscara booleana, True para chaves já vistas.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.zeros(len(hashes), dtype=bool)
+        suspects = np.flatnonzero(self._bloom_contains(hashes))
+        if len(suspects) == 0:
+            return found
+        candidates = hashes[suspects]
+        hit = self._sorted_contains(self.keys, candidates)
+        for pending in self._pending:
+            hit |= self._sorted_contains(pending, candidates)
+        found[suspects] = hit
+        return found
+
+    def add_new(self, hashes):
+        """
+        Seleciona as linhas ainda não vistas e as acrescenta ao índice.
+
+        Repetições dentro de `hashes` também são descartadas: apenas a
+        primeira ocorrência de cada chave é considerada nova.
+
+        Args:
+            hashes (np.ndarray): Chaves das linhas de um bloco (uint64).
+
+        Returns:
+            np.ndarray: Máscara booleana das linhas novas.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        unique, first = np.unique(hashes, return_index=True)
+        seen = self.contains(unique)
+        new_keys = unique[~seen]
+
+        if len(self) + len(new_keys) > self.capacity:
+            self._grow(len(self) + len(new_keys))
+        self._bloom_add(new_keys)
+        if len(new_keys):
+            self._add_pending(new_keys)
+
+        new = np.zeros(len(hashes), dtype=bool)
+        new[first[~seen]] = True
+        return new
+
+    def _add_pending(self, keys):
+        """
+        Acrescenta um array ordenado de chaves novas às séries pendentes.
+
+        As séries ficam em ordem decrescente de tamanho: uma série nova é
+        combinada com a anterior enquanto esta não for maior que o dobro dela,
+        como em uma árvore LSM. Há no máximo cerca de log2(n) séries para as
+        buscas de `contains`, e cada chave é copiada em O(log n) combinações,
+        em vez de reordenar todas as pendentes a cada lote.
+        """
+        self._pending_count += len(keys)
+        while self._pending and len(self._pending[-1]) <= 2 * len(keys):
+            # Séries ordenadas e disjuntas: a ordenação estável (timsort)
+            # apenas intercala as duas
+            keys = np.sort(np.concatenate([self._pending.pop(), keys]), kind='stable')
+        self._pending.append(keys)
+
+    def _grow(self, needed):
+        """Reconstrói o filtro de Bloom com capacidade para `needed` chaves."""
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        self._reset_bloom(capacity)
+        self._bloom_add(np.asarray(self.keys))
+        for pending in self._pending:
+            self._bloom_add(pending)
+
+    def _merged_keys(self):
+        """Combina as chaves gravadas e as novas em um único array ordenado."""
+        if not self._pending:
+            return np.asarray(self.keys)
+        pending = np.sort(np.concatenate(self._pending), kind='stable')
+        # Inserção ordenada: cópia linear das chaves gravadas, sem reordená-las
+        return np.insert(np.asarray(self.keys), np.searchsorted(self.keys, pending), pending)
+
+    def save(self, path=None):
+        """
+        Grava o índice com as chaves acrescentadas, de forma atômica.
+
+        Os arquivos são gravados em um diretório de versão novo e a descrição
+        do índice, que aponta para a versão vigente, é substituída de forma
+        atômica; só então a versão anterior é removida. Uma falha no meio da
+        gravação mantém o índice anterior intacto.
+
+        Args:
+            path (str, optional): Diretório do índice. Usa o de `open`, se omitido.
+
+        Raises:
+            ValueError: Se nenhum diretório for informado.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("Diretório do índice de deduplicação não informado")
+        meta_path = os.path.join(path, _META_FILE)
+        previous = None
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                previous = json.load(f)['version']
+        version = 0 if previous is None else previous + 1
+        version_dir = os.path.join(path, f"v{version}")
+        keys = self._merged_keys()
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.makedirs(version_dir)
+        np.save(os.path.join(version_dir, _KEYS_FILE), keys)
+        np.save(os.path.join(version_dir, _BLOOM_FILE), self._bloom)
+        with open(f"{meta_path}.tmp", 'w') as f:
+            json.dump(
+                {
+                    'version': version,
+                    'keys': len(keys),
+                    'capacity': self.capacity,
+                    'false_positive_rate': self.false_positive_rate,
+                },
+                f,
+            )
+        os.replace(f"{meta_path}.tmp", meta_path)
+        if previous is not None:
+            shutil.rmtree(os.path.join(path, f"v{previous}"), ignore_errors=True)
+
+        self.path = path
+        self.keys = np.load(
+            os.path.join(version_dir, _KEYS_FILE), mmap_mode='r', allow_pickle=False
+        )
+        self._pending = []
+        self._pending_count = 0
@@ -0,0 +1,263 @@
+"""
+Motores de cálculo da limpeza e das Tabelas 1 e 2.
+
+Um motor implementa as operações do pipeline sobre um DataFrame já carregado:
+a seleção das linhas válidas (`select_rows`, usada por `clean`) e as Tabelas
+1 e 2. Os motores produzem exatamente os mesmos resultados (ver
+`tests/test_engines.py`) e são escolhidos por execução pelo nome (ver
+`get_engine`):
+
+- "pandas" (padrão): operações de DataFrame do Pandas (`groupby`, seleção
+  por máscara, `astype`).
+- "numpy": opera diretamente sobre os arrays das colunas (códigos das
+  categóricas, `np.bincount`, `take`), sem alinhar índices nem criar
+  DataFrames intermediários.
+"""
+import math
+
+from src.lazy import lazy_import
+from src.quality import evaluate_rules
+from src.schema import TIMESTAMP_COLUMN, apply_schema, finalize_timestamp
+from src.topk import latest_top_k
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+DEFAULT_ENGINE = "pandas"
+
+
+class Engine:
+    """
+    Interface dos motores de cálculo.
+
+    As subclasses implementam `select_rows`, `table1` e `table2`; `clean` é
+    comum a todos os motores.
+    """
+
+    name = None
+
+    def clean(self, df):
+        """
+        Limpa os dados: converte as colunas para os tipos de `src.schema` e
+        mantém apenas as linhas que passam nas regras de `src.quality`.
+
+        Args:
+            df (pd.DataFrame): DataFrame original (modificado pela conversão).
+
+        Returns:
+            pd.DataFrame: DataFrame limpo.
+        """
+        df = apply_schema(df)
+        valid, _, _ = evaluate_rules(df)
+        return self.select_rows(df, valid)
+
+    def select_rows(self, df, mask):
+        """
+        Seleciona as linhas válidas de um DataFrame com os tipos do esquema,
+        com 'timestamp' convertido para int64 (ver
+        `src.schema.finalize_timestamp`).
+
+        Args:
+            df (pd.DataFrame): Dados com os tipos do esquema.
+            mask (np.ndarray): Máscara booleana das linhas mantidas.
+
+        Returns:
+            pd.DataFrame: Linhas selecionadas, com os rótulos originais.
+        """
+        raise NotImplementedError
+
+    def table1(self, df):
+        """
+        Calcula a média de 'risk_score' por 'location_region', em ordem decrescente.
+
+        Args:
+            df (pd.DataFrame): DataFrame limpo.
+
+        Returns:
+            pd.DataFrame: Colunas 'location_region' e 'risk_score'.
+        """
+        raise NotImplementedError
+
+    def table2(self, df, k=3):
+        """
+        Seleciona as `k` vendas de maior 'amount' entre as mais recentes de
+        cada 'receiving_address' (em empate de 'timestamp', a que aparece por
+        último).
+
+        Args:
+            df (pd.DataFrame): DataFrame limpo.
+            k (int): Quantidade de transações na tabela.
+
+        Returns:
+            pd.DataFrame: Colunas 'receiving_address', 'amount' e 'timestamp'.
+        """
+        raise NotImplementedError
+
+
+class PandasEngine(Engine):
+    """Motor padrão, com as operações de DataFrame do Pandas."""
+
+    name = "pandas"
+
+    def select_rows(self, df, mask):
+        return finalize_timestamp(df[mask])
+
+    def table1(self, df):
+        # A soma é acumulada em float64 mesmo com 'risk_score' em float32
+        risk = df['risk_score'].astype('float64')
+        table1 = (
+            risk.groupby(df['location_region'], observed=True)
+            .mean()
+            .sort_values(ascending=False)
+            .reset_index()
+        )
+        return table1.astype({'location_region': object})
+
+    def table2(self, df, k=3):
+        sales = np.flatnonzero((df['transaction_type'] == 'sale').to_numpy())
+        # `.array` mantém a coluna categórica: a seleção copia só os códigos
+        top = latest_top_k(
+            df['receiving_address'].array[sales],
+            df['timestamp'].to_numpy()[sales],
+            df['amount'].to_numpy()[sales],
+            k,
+        )
+        table2 = (
+            df[['receiving_address', 'amount', 'timestamp']]
+            .iloc[sales[top]]
+            .reset_index(drop=True)
+        )
+        return table2.astype({'receiving_address': object})
+
+
+class NumpyEngine(Engine):
+    """
+    Motor sobre os arrays das colunas.
+
+    Cada coluna é selecionada uma única vez (sem a cópia extra da conversão
+    de 'timestamp' depois da seleção) e as agregações usam os códigos das
+    colunas categóricas, sem `groupby`.
+    """
+
+    name = "numpy"
+
+    def select_rows(self, df, mask):
+        positions = np.flatnonzero(mask)
+        columns = {}
+        for name in df.columns:
+            column = df[name]
+            if not isinstance(column.dtype, np.dtype):
+                # Categóricas: `take` copia só os códigos
+                columns[name] = column.array.take(positions)
+            elif name == TIMESTAMP_COLUMN:
+                columns[name] = column.to_numpy()[positions].astype(np.int64, copy=False)
+            else:
+                columns[name] = column.to_numpy()[positions]
+        return pd.DataFrame(columns, index=df.index.take(positions), copy=False)
+
+    def table1(self, df):
+        codes, regions = _codes(df['location_region'])
+        valid = codes >= 0
+        codes = codes[valid]
+        risk = df['risk_score'].to_numpy(dtype='float64')[valid]
+        counts = np.bincount(codes, minlength=len(regions))
+        observed = np.flatnonzero(counts)
+        mean = _group_sums(codes, risk, len(regions))[observed] / counts[observed]
+        # Média decrescente; empates na ordem dos grupos, como o `groupby`
+        ranking = np.lexsort((observed, -mean))
+        table1 = pd.DataFrame({
+            'location_region': np.asarray(regions, dtype=object)[observed][ranking],
+            'risk_score': mean[ranking],
+        })
+        return table1.astype({'location_region': object})
+
+    def table2(self, df, k=3):
+        codes, types = _codes(df['transaction_type'])
+        sale = np.flatnonzero(np.asarray(types, dtype=object) == 'sale')
+        sales = np.flatnonzero(codes == (sale[0] if len(sale) else -2))
+        addresses = df['receiving_address'].array
+        amount = df['amount'].to_numpy()
+        timestamp = df['timestamp'].to_numpy()
+        rows = sales[latest_top_k(addresses[sales], timestamp[sales], amount[sales], k)]
+        table2 = pd.DataFrame({
+            'receiving_address': addresses.take(rows),
+            'amount': amount[rows],
+            'timestamp': timestamp[rows],
+        })
+        return table2.astype({'receiving_address': object})
+
+
+def _group_sums(codes, values, groups):
+    """
+    Soma os valores por grupo com `np.bincount`, sem erro de arredondamento
+    acumulado.
+
+    Cada valor é dividido em uma parte alta, múltipla de uma potência de 2
+    grande o bastante para que as somas das partes altas sejam exatas, e no
+    resto (exato). As duas somas por grupo são combinadas com
+    `math.fsum`. Para 'risk_score' em float32, o resultado coincide com a
+    soma compensada do `groupby` do Pandas, enquanto uma única soma com
+    `np.bincount` diverge na última casa.
+
+    Args:
+        codes (np.ndarray): Grupo de cada valor (não negativo).
+        values (np.ndarray): Valores em float64.
+        groups (int): Quantidade de grupos.
+
+    Returns:
+        np.ndarray: Soma de cada grupo.
+    """
+    top = np.abs(values).max() if len(values) else 0.0
+    if not top:
+        return np.bincount(codes, weights=values, minlength=groups)
+    _, exponent = np.frexp(top)
+    # Toda soma parcial das partes altas é menor que `scale / 2`
+    scale = np.ldexp(1.0, int(exponent) + len(values).bit_length() + 1)
+    high = (values + scale) - scale
+    high_sums = np.bincount(codes, weights=high, minlength=groups)
+    low_sums = np.bincount(codes, weights=values - high, minlength=groups)
+    return np.array([math.fsum(pair) for pair in zip(high_sums, low_sums)])
+
+
+def _codes(column):
+    """
+    Retorna os códigos inteiros e os valores distintos de uma coluna.
+
+    Para colunas categóricas, usa os códigos e as categorias existentes; as
+    demais são fatoradas com os valores em ordem crescente, a ordem dos
+    grupos do `groupby`. Valores ausentes recebem o código -1.
+
+    Args:
+        column (pd.Series): Coluna de texto ou categórica.
+
+    Returns:
+        tuple[np.ndarray, pd.Index]: Código de cada linha e valores distintos.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.array.codes, column.array.categories
+    codes, uniques = pd.factorize(column.to_numpy(), sort=True)
+    return codes, pd.Index(uniques)
+
+
+ENGINES = {engine.name: engine for engine in (PandasEngine, NumpyEngine)}
+
+
+def get_engine(name=DEFAULT_ENGINE):
+    """
+    Retorna o motor de cálculo pelo nome.
+
+    Args:
+        name (str | Engine): "pandas" ou "numpy" (ver `ENGINES`); um motor
+            já criado é retornado como está.
+
+    Returns:
+        Engine: Motor de cálculo.
+
+    Raises:
+        ValueError: Se o motor não existir.
+    """
+    if isinstance(name, Engine):
+        return name
+    if name not in ENGINES:
+        raise ValueError(f"Motor de cálculo inválido: {name}")
+    return ENGINES[name]()
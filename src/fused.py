@@ -0,0 +1,360 @@
+from src.aggregates import (
+    LATEST_SALES_COLUMNS,
+    merge_latest_sales,
+    merge_region_partials,
+    table1_from_regions,
+    table2_from_latest,
+)
+from src.lazy import lazy_import
+from src.main import DEFAULT_CHUNKSIZE, load_data_in_chunks, metrics_from_counts
+from src.quality import add_counts, evaluate_rules
+from src.partitioned import window_mask
+from src.schema import PIPELINE_COLUMNS, apply_schema
+from src.sketches import SKETCH_COLUMNS
+from src.spill import DEFAULT_SPILL_DIR, ExternalLatestSales
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Parciais de bloco acumulados antes de combiná-los com o estado (ver
+# `add_chunk`): por quantidade de blocos ou de vendas pendentes
+MERGE_BATCH_CHUNKS = 16
+MERGE_BATCH_ROWS = 1_000_000
+
+
+def _chunk_regions(region, risk, valid):
+    """
+    Soma e conta 'risk_score' por região nas linhas válidas de um bloco.
+
+    Usa os códigos da coluna categórica com `np.bincount`, sem agrupar nem
+    copiar as linhas selecionadas.
+
+    Args:
+        region (pd.Series): Coluna categórica 'location_region'.
+        risk (pd.Series): Coluna 'risk_score'.
+        valid (np.ndarray): Máscara das linhas válidas.
+
+    Returns:
+        pd.DataFrame: Parcial como o de `src.aggregates.region_partial`.
+    """
+    codes = region.cat.codes.to_numpy()[valid]
+    n_categories = len(region.cat.categories)
+    sums = np.bincount(
+        codes, weights=risk.to_numpy(dtype='float64')[valid], minlength=n_categories
+    )
+    counts = np.bincount(codes, minlength=n_categories)
+    present = counts > 0
+    return pd.DataFrame(
+        {
+            'location_region': region.cat.categories[present].astype(object),
+            'risk_sum': sums[present],
+            'risk_count': counts[present],
+        }
+    )
+
+
+def _chunk_latest_sales(chunk, valid):
+    """
+    Seleciona as vendas válidas de um bloco com sua posição global.
+
+    Args:
+        chunk (pd.DataFrame): Bloco com os tipos do esquema; o índice é a
+            posição da linha no arquivo.
+        valid (np.ndarray): Máscara das linhas válidas.
+
+    Returns:
+        pd.DataFrame: Vendas com as colunas de `LATEST_SALES_COLUMNS`.
+    """
+    sales = valid & (chunk['transaction_type'] == 'sale').to_numpy()
+    return pd.DataFrame(
+        {
+            'receiving_address': chunk['receiving_address'].array[sales],
+            'timestamp': chunk['timestamp'].to_numpy()[sales].astype(np.int64),
+            'amount': chunk['amount'].to_numpy(dtype='float64')[sales],
+            'seq': chunk.index.to_numpy(dtype=np.int64)[sales],
+        },
+        columns=LATEST_SALES_COLUMNS,
+    )
+
+
+def aggregate_chunks(
+    chunks, latest_sales=None, window=None, sketches=None, columns=None, risk_windows=None
+):
+    """
+    Reduz blocos brutos da entrada a um agregado parcial, em uma passagem.
+
+    Cada bloco é convertido para o esquema e avaliado uma vez pelas regras de
+    limpeza (ver `src.quality`). A mesma máscara de linhas válidas alimenta,
+    sem gerar o DataFrame limpo, os contadores de qualidade, a soma e a
+    contagem de 'risk_score' por região e a última venda por endereço. Os agregados
+    ocupam memória proporcional às regiões e aos endereços, não à entrada.
+
+    Args:
+        chunks (iterable[pd.DataFrame]): Blocos brutos; o índice de cada bloco
+            é a posição global das linhas, usada nos desempates.
+        latest_sales (src.spill.ExternalLatestSales, optional): Recebe as
+            vendas de cada bloco em vez do parcial em memória; nesse caso,
+            'latest_sales' do resultado fica vazio.
+        window (tuple[int, int], optional): Janela [início, fim) de 'timestamp'
+            considerada nos agregados; os contadores de qualidade consideram
+            todas as linhas válidas.
+        sketches (src.sketches.RegionSketches, optional): Recebe as linhas
+            válidas (na janela) de cada bloco, para as estatísticas por região.
+        columns (list[str], optional): Colunas consideradas nos valores
+            ausentes. Todas as do bloco, se None.
+        risk_windows (src.windows.RegionWindows, optional): Recebe as linhas
+            válidas (na janela) de cada bloco, para a série de risco por
+            região e janela de tempo.
+
+    Returns:
+        dict: Contadores ('total_records', 'valid_records', 'missing_values'),
+        linhas rejeitadas por regra ('rejections'), agregados ('regions',
+        'latest_sales'; None sem linhas válidas) e os agregados de blocos
+        ainda não combinados ('pending', vazio ao final; ver `add_chunk`).
+    """
+    partial = {
+        'total_records': 0,
+        'valid_records': 0,
+        'missing_values': 0,
+        'rejections': {},
+        'regions': None,
+        'latest_sales': None,
+        'pending': [],
+    }
+    for chunk in chunks:
+        chunk = apply_schema(chunk)
+        valid, _, counts = evaluate_rules(chunk)
+        add_chunk(
+            partial, chunk, valid, counts, latest_sales, window, sketches, columns, risk_windows
+        )
+    flush_chunks(partial)
+    return partial
+
+
+def add_chunk(
+    partial,
+    chunk,
+    valid,
+    counts,
+    latest_sales=None,
+    window=None,
+    sketches=None,
+    columns=None,
+    risk_windows=None,
+):
+    """
+    Acrescenta um bloco já avaliado pelas regras de limpeza a um agregado
+    parcial de `aggregate_chunks`.
+
+    Os agregados do bloco ficam em 'pending' e são combinados com o estado
+    em lotes (ver `MERGE_BATCH_CHUNKS` e `MERGE_BATCH_ROWS`): combinar cada
+    bloco com toda a última venda por endereço já acumulada teria custo
+    quadrático no número de blocos. Chame `flush_chunks` antes de ler
+    'regions' e 'latest_sales'.
+
+    Args:
+        partial (dict): Agregado parcial (modificado).
+        chunk (pd.DataFrame): Bloco com os tipos do esquema; o índice é a
+            posição global das linhas.
+        valid (np.ndarray): Máscara das linhas válidas (ver
+            `src.quality.evaluate_rules`).
+        counts (dict): Linhas rejeitadas por regra no bloco.
+        latest_sales, window, sketches, columns, risk_windows: Como em
+            `aggregate_chunks`.
+    """
+    add_counts(partial['rejections'], counts)
+    partial['total_records'] += len(chunk)
+    partial['valid_records'] += int(valid.sum())
+    quality_columns = chunk.columns if columns is None else [
+        name for name in columns if name in chunk.columns
+    ]
+    for name in quality_columns:
+        partial['missing_values'] += int((chunk[name].isna().to_numpy() & valid).sum())
+
+    if window is not None:
+        valid = valid & window_mask(chunk['timestamp'].to_numpy(), *window)
+
+    if sketches is not None:
+        sketches.update(chunk, valid)
+    if risk_windows is not None:
+        risk_windows.update(chunk, valid)
+    chunk_latest = _chunk_latest_sales(chunk, valid)
+    if latest_sales is not None:
+        latest_sales.add(chunk_latest)
+        chunk_latest = chunk_latest.iloc[:0]
+    _add_pending(partial, {
+        'regions': _chunk_regions(chunk['location_region'], chunk['risk_score'], valid),
+        'latest_sales': chunk_latest,
+    })
+
+
+def _add_pending(partial, other):
+    """Acumula os agregados de `other`, combinando-os quando o lote enche."""
+    if other['regions'] is None:
+        return
+    pending = partial.setdefault('pending', [])
+    pending.append(other)
+    pending_rows = sum(len(item['latest_sales']) for item in pending)
+    if len(pending) >= MERGE_BATCH_CHUNKS or pending_rows >= MERGE_BATCH_ROWS:
+        flush_chunks(partial)
+
+
+def flush_chunks(partial):
+    """
+    Combina os agregados pendentes de `add_chunk` com os do parcial.
+
+    Args:
+        partial (dict): Agregado parcial (modificado); 'pending' fica vazio.
+    """
+    pending = partial.get('pending')
+    if pending:
+        _merge_aggregates(partial, pending)
+        pending.clear()
+
+
+def _merge_aggregates(target, others):
+    """Combina os agregados de `others` nos de `target` (modificado)."""
+    if target['regions'] is not None:
+        others = [target] + others
+    target['regions'] = merge_region_partials([other['regions'] for other in others])
+    target['latest_sales'] = merge_latest_sales([other['latest_sales'] for other in others])
+
+
+def aggregate_cleaned(parts, latest_sales=None):
+    """
+    Reduz as partes de uma tabela já limpa a um agregado parcial.
+
+    As partes são lidas uma a uma (ex.: de `src.partitioned.iter_partitioned`)
+    e todas as linhas contam como válidas. A posição da linha na sequência
+    das partes é usada nos desempates da Tabela 2: em `src.partitioned`, as
+    linhas de mesmo 'timestamp' ficam na mesma partição, na ordem da entrada.
+
+    Args:
+        parts (iterable[pd.DataFrame]): Partes limpas, com as colunas de
+            `src.main.TABLE_COLUMNS` e 'location_region' categórica.
+        latest_sales (src.spill.ExternalLatestSales, optional): Como em
+            `aggregate_chunks`.
+
+    Returns:
+        dict: Agregado parcial como o de `aggregate_chunks`, sem os
+        contadores de valores ausentes.
+    """
+    partial = aggregate_chunks([])
+    offset = 0
+    for part in parts:
+        part.index = pd.RangeIndex(offset, offset + len(part))
+        offset += len(part)
+        valid = np.ones(len(part), dtype=bool)
+        add_chunk(partial, part, valid, {}, latest_sales, columns=[])
+    flush_chunks(partial)
+    return partial
+
+
+def merge_partials(partials):
+    """
+    Combina agregados parciais de `aggregate_chunks` (ex.: de vários shards).
+
+    Args:
+        partials (iterable[dict]): Parciais a combinar.
+
+    Returns:
+        dict: Parcial combinado, no mesmo formato.
+    """
+    merged = aggregate_chunks([])
+    for partial in partials:
+        flush_chunks(partial)
+        for name in ('total_records', 'valid_records', 'missing_values'):
+            merged[name] += partial[name]
+        add_counts(merged['rejections'], partial['rejections'])
+        _add_pending(merged, partial)
+    flush_chunks(merged)
+    return merged
+
+
+def tables_from_partial(partial, k=3, source="entrada"):
+    """
+    Gera as tabelas e as métricas a partir de um agregado parcial completo.
+
+    Args:
+        partial (dict): Parcial como o de `aggregate_chunks`.
+        k (int): Quantidade de transações da Tabela 2.
+        source (str): Descrição da entrada, usada na mensagem de erro.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, dict, dict]: Tabela 1, Tabela 2,
+        métricas da limpeza (com as rejeições por regra) e métricas de
+        qualidade dos dados limpos ('total_records', 'missing_values',
+        'compliance_rate').
+    """
+    flush_chunks(partial)
+    valid_records = partial['valid_records']
+    if valid_records == 0:
+        raise ValueError(f"Nenhum registro válido em {source}")
+
+    metrics = metrics_from_counts(partial['total_records'], valid_records)
+    metrics['rejections'] = partial['rejections']
+    quality = {
+        'total_records': valid_records,
+        'missing_values': partial['missing_values'],
+        'compliance_rate': 100 * (valid_records - partial['missing_values']) / valid_records,
+    }
+    table1 = table1_from_regions(partial['regions'])
+    table2 = table2_from_latest(partial['latest_sales'], k)
+    return table1, table2, metrics, quality
+
+
+def run_fused(
+    input_path,
+    chunksize=DEFAULT_CHUNKSIZE,
+    k=3,
+    columns=PIPELINE_COLUMNS,
+    memory_budget=None,
+    spill_dir=DEFAULT_SPILL_DIR,
+    window=None,
+    sketches=None,
+    risk_windows=None,
+):
+    """
+    Executa limpeza, métricas e as tabelas 1 e 2 em uma única leitura.
+
+    Os blocos do CSV são reduzidos por `aggregate_chunks`; o resultado é o
+    mesmo da limpeza seguida de `compute_table1`, `compute_table2` e das
+    métricas de qualidade (ver `src.main.metrics_from_counts`). Com
+    `memory_budget`, a última venda por endereço é agregada por
+    `src.spill.ExternalLatestSales`, que grava o estado em disco quando ele
+    ultrapassa o orçamento.
+
+    Args:
+        input_path (str): Arquivo CSV de entrada.
+        chunksize (int): Quantidade máxima de linhas lidas por bloco.
+        k (int): Quantidade de transações da Tabela 2.
+        columns (list[str]): Colunas lidas e consideradas na qualidade.
+        memory_budget (int, optional): Bytes do estado por endereço mantidos
+            na memória.
+        spill_dir (str): Diretório dos arquivos temporários da agregação externa.
+        window (tuple[int, int], optional): Janela [início, fim) de 'timestamp',
+            em segundos, considerada nas tabelas.
+        sketches (src.sketches.RegionSketches, optional): Recebe, na mesma
+            leitura, os quantis e as contagens de distintos por região; as
+            colunas de `src.sketches.SKETCH_COLUMNS` são lidas mesmo que não
+            estejam em `columns`.
+        risk_windows (src.windows.RegionWindows, optional): Recebe, na mesma
+            leitura, a série de 'risk_score' por região e janela de tempo.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, dict, dict]: Tabela 1, Tabela 2,
+        métricas da limpeza e métricas de qualidade dos dados limpos.
+    """
+    read_columns = columns
+    if sketches is not None and columns is not None:
+        read_columns = list(columns) + [name for name in SKETCH_COLUMNS if name not in columns]
+    chunks = load_data_in_chunks(input_path, chunksize, read_columns)
+    if memory_budget is None:
+        partial = aggregate_chunks(
+            chunks, window=window, sketches=sketches, columns=columns, risk_windows=risk_windows
+        )
+        return tables_from_partial(partial, k, input_path)
+    with ExternalLatestSales(memory_budget, spill_dir) as latest:
+        partial = aggregate_chunks(chunks, latest, window, sketches, columns, risk_windows)
+        partial['latest_sales'] = latest.candidates(k)
+    return tables_from_partial(partial, k, input_path)
@@ -0,0 +1,357 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+from src.aggregates import (
+    LATEST_SALES_COLUMNS,
+    latest_sales_partial,
+    merge_latest_sales,
+    merge_region_partials,
+    region_partial,
+    table1_from_regions,
+    table2_from_latest,
+)
+from src.columnar import read_table, write_table
+from src.ingestion import iter_csv_range, last_line_end, read_header
+from src.lazy import lazy_import
+from src.main import DEFAULT_CHUNKSIZE, clean_data
+from src.schema import PIPELINE_COLUMNS, read_csv_options
+from src.spill import partition_ids
+from src.topk import top_k_positions
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Arquivo com a marca d'água e a versão vigente do estado
+STATE_FILE = "state.json"
+
+# Partições por hash de 'receiving_address' da última venda por endereço no
+# estado: cada execução lê e regrava apenas as partições com endereços do
+# trecho novo
+STATE_BUCKETS = 256
+
+# Subdiretório com as partições da última venda por endereço; cada partição
+# tem um diretório por versão ('bucket-0007/v3/')
+_LATEST_DIR = "latest_sales"
+
+# Coluna dos candidatos à Tabela 2 com a partição de cada endereço
+_BUCKET_COLUMN = 'bucket'
+
+# Bytes anteriores à marca d'água usados para detectar reescrita da entrada
+_TAIL_BYTES = 4096
+
+
+def _tail_digest(file_path, offset):
+    """
+    Calcula o hash dos bytes imediatamente anteriores a `offset`.
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV.
+        offset (int): Posição da marca d'água, em bytes.
+
+    Returns:
+        str: Hash hexadecimal dos últimos bytes já processados.
+    """
+    start = max(0, offset - _TAIL_BYTES)
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return hashlib.blake2b(f.read(offset - start), digest_size=16).hexdigest()
+
+
+def _bucket_path(state_dir, bucket, version):
+    """Diretório de uma versão de uma partição da última venda por endereço."""
+    return os.path.join(state_dir, _LATEST_DIR, f"bucket-{bucket:04d}", f"v{version}")
+
+
+def load_state(state_dir):
+    """
+    Carrega o estado persistido do processamento incremental.
+
+    A última venda por endereço não é carregada: cada partição é lida sob
+    demanda por `load_bucket`.
+
+    Args:
+        state_dir (str): Diretório do estado.
+
+    Returns:
+        dict | None: Estado com a marca d'água ('offset', 'tail_digest',
+        'header', 'total_records', 'valid_records', 'max_timestamp',
+        'version'), as versões das partições da última venda ('buckets',
+        'bucket_versions'), os agregados parciais por região ('regions') e os
+        candidatos à Tabela 2 ('candidates', as 'candidates_k' maiores vendas
+        recentes de cada partição), ou None se ainda não houver estado.
+    """
+    state_path = os.path.join(state_dir, STATE_FILE)
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path) as f:
+        state = json.load(f)
+    version_dir = os.path.join(state_dir, f"v{state['version']}")
+    state['regions'] = read_table(os.path.join(version_dir, "regions"), mmap=False)
+    state['candidates'] = read_table(os.path.join(version_dir, "candidates"), mmap=False)
+    state['latest_sales'] = {}
+    return state
+
+
+def load_bucket(state_dir, state, bucket):
+    """
+    Carrega a última venda por endereço de uma partição do estado.
+
+    Args:
+        state_dir (str): Diretório do estado.
+        state (dict): Estado como o retornado por `load_state`.
+        bucket (int): Índice da partição.
+
+    Returns:
+        pd.DataFrame | None: Última venda dos endereços da partição, ou None
+        se a partição ainda não tiver vendas.
+    """
+    version = state['bucket_versions'][bucket]
+    if version is None:
+        return None
+    return read_table(_bucket_path(state_dir, bucket, version), mmap=False)
+
+
+def save_state(state_dir, state):
+    """
+    Persiste o estado em uma nova versão e só então a torna vigente.
+
+    Os agregados por região, os candidatos e as partições alteradas da última
+    venda por endereço ('latest_sales', por partição) são gravados em
+    diretórios de versão novos e o arquivo de estado, que aponta para a
+    versão vigente de cada partição, é substituído de forma atômica: uma
+    falha no meio da gravação nunca combina agregados novos com a marca
+    d'água antiga. As partições não alteradas não são regravadas.
+
+    Args:
+        state_dir (str): Diretório do estado.
+        state (dict): Estado como o retornado por `load_state` (modificado).
+    """
+    previous = state.get('version')
+    version = 0 if previous is None else previous + 1
+    version_dir = os.path.join(state_dir, f"v{version}")
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.makedirs(version_dir)
+    write_table(state['regions'], os.path.join(version_dir, "regions"))
+    write_table(state['candidates'], os.path.join(version_dir, "candidates"))
+
+    bucket_versions = list(state['bucket_versions'])
+    superseded = []
+    for bucket, latest in state['latest_sales'].items():
+        bucket_path = _bucket_path(state_dir, bucket, version)
+        shutil.rmtree(bucket_path, ignore_errors=True)
+        write_table(latest, bucket_path)
+        if bucket_versions[bucket] is not None:
+            superseded.append(_bucket_path(state_dir, bucket, bucket_versions[bucket]))
+        bucket_versions[bucket] = version
+
+    watermark = {
+        key: value
+        for key, value in state.items()
+        if key not in ('regions', 'candidates', 'latest_sales')
+    }
+    watermark['version'] = version
+    watermark['bucket_versions'] = bucket_versions
+    state_path = os.path.join(state_dir, STATE_FILE)
+    with open(f"{state_path}.tmp", "w") as f:
+        json.dump(watermark, f)
+    os.replace(f"{state_path}.tmp", state_path)
+    state['version'] = version
+    state['bucket_versions'] = bucket_versions
+    state['latest_sales'] = {}
+
+    if previous is not None:
+        shutil.rmtree(os.path.join(state_dir, f"v{previous}"), ignore_errors=True)
+    for path in superseded:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _bucket_candidates(latest, bucket, k):
+    """Seleciona as `k` maiores vendas recentes de uma partição."""
+    top = top_k_positions(latest['amount'].to_numpy(), k, latest['receiving_address'])
+    candidates = latest.iloc[top].reset_index(drop=True)
+    candidates[_BUCKET_COLUMN] = bucket
+    return candidates
+
+
+def _concat_candidates(frames):
+    """Combina os candidatos das partições em uma única tabela."""
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame(
+            {
+                'receiving_address': pd.Series([], dtype=object),
+                'timestamp': pd.Series([], dtype=np.int64),
+                'amount': pd.Series([], dtype=np.float64),
+                'seq': pd.Series([], dtype=np.int64),
+                _BUCKET_COLUMN: pd.Series([], dtype=np.int64),
+            }
+        )
+    # Endereços como texto: as partições têm categorias diferentes
+    candidates = pd.concat(frames, ignore_index=True)
+    return candidates.astype({'receiving_address': object})
+
+
+def _merge_latest(state_dir, state, delta):
+    """
+    Combina a última venda por endereço do trecho novo com o estado.
+
+    Apenas as partições com endereços de `delta` são carregadas, combinadas
+    e guardadas em 'latest_sales' para `save_state`; os candidatos à Tabela 2
+    dessas partições são recalculados e os das demais são mantidos. Cada
+    endereço pertence a uma única partição, então as `candidates_k` maiores
+    vendas de cada partição contêm as da entrada inteira.
+
+    Args:
+        state_dir (str): Diretório do estado.
+        state (dict): Estado como o retornado por `load_state` (modificado).
+        delta (pd.DataFrame): Última venda por endereço do trecho novo.
+    """
+    ids = partition_ids(delta['receiving_address'].array, state['buckets'])
+    order = np.argsort(ids, kind='stable')
+    touched, starts = np.unique(ids[order], return_index=True)
+    bounds = np.append(starts, len(order))
+
+    candidates = state['candidates']
+    frames = [candidates[~np.isin(candidates[_BUCKET_COLUMN].to_numpy(), touched)]]
+    for i, bucket in enumerate(touched.tolist()):
+        parts = [delta.iloc[order[bounds[i]:bounds[i + 1]]]]
+        saved = load_bucket(state_dir, state, bucket)
+        if saved is not None:
+            parts.insert(0, saved)
+        latest = merge_latest_sales(parts)
+        state['latest_sales'][bucket] = latest
+        frames.append(_bucket_candidates(latest, bucket, state['candidates_k']))
+    state['candidates'] = _concat_candidates(frames)
+
+
+def _rebuild_candidates(state_dir, state, k):
+    """Recalcula os candidatos de todas as partições para `k` transações."""
+    frames = []
+    for bucket in range(state['buckets']):
+        latest = load_bucket(state_dir, state, bucket)
+        if latest is not None:
+            frames.append(_bucket_candidates(latest, bucket, k))
+    state['candidates'] = _concat_candidates(frames)
+    state['candidates_k'] = k
+
+
+def update_incremental(input_path, state_dir, chunksize=DEFAULT_CHUNKSIZE, k=3):
+    """
+    Atualiza as tabelas 1 e 2 processando apenas as linhas novas da entrada.
+
+    A entrada só cresce por anexação. A marca d'água guarda até que byte o
+    arquivo já foi processado e o estado guarda agregados combináveis: soma e
+    contagem de 'risk_score' por região e a última venda por endereço,
+    particionada pelo hash do endereço (ver `STATE_BUCKETS`). Cada execução
+    lê e limpa somente o trecho novo com `clean_data`, reduz esse trecho aos
+    agregados parciais e só então os combina com o estado, carregando apenas
+    as partições dos endereços do trecho novo. A Tabela 2 é gerada a partir
+    das maiores vendas recentes de cada partição, mantidas no estado.
+
+    Se o arquivo encolher, o cabeçalho mudar ou os últimos bytes já
+    processados forem diferentes, o estado é descartado e a entrada é
+    reprocessada desde o início.
+
+    Args:
+        input_path (str): Caminho para o arquivo CSV de entrada.
+        state_dir (str): Diretório onde o estado é persistido.
+        chunksize (int): Quantidade máxima de linhas lidas por bloco.
+        k (int): Quantidade de transações na Tabela 2.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, dict]: Tabela 1, Tabela 2 e um
+        dicionário com a marca d'água e os totais de registros.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    header, data_start = read_header(input_path)
+    size = os.path.getsize(input_path)
+    state = load_state(state_dir)
+
+    if state is not None and (
+        state['header'] != header
+        or state['offset'] > size
+        or state['tail_digest'] != _tail_digest(input_path, state['offset'])
+    ):
+        logging.warning("Entrada reescrita ou truncada; reprocessando do início.")
+        # A numeração das versões continua, para que a anterior seja removida
+        shutil.rmtree(os.path.join(state_dir, _LATEST_DIR), ignore_errors=True)
+        state = {'version': state['version'], 'regions': None}
+    if state is None or state['regions'] is None:
+        state = {
+            'header': header,
+            'offset': data_start,
+            'tail_digest': None,
+            'total_records': 0,
+            'valid_records': 0,
+            'max_timestamp': None,
+            'version': None if state is None else state['version'],
+            'buckets': STATE_BUCKETS,
+            'bucket_versions': [None] * STATE_BUCKETS,
+            'candidates_k': k,
+            'regions': None,
+            'candidates': _concat_candidates([]),
+            'latest_sales': {},
+        }
+    rebuilt = state['candidates_k'] < k
+    if rebuilt:
+        _rebuild_candidates(state_dir, state, k)
+
+    start = state['offset']
+    end = last_line_end(input_path, start, size)
+    position = state['total_records']
+    region_deltas = []
+    latest_deltas = []
+
+    options = read_csv_options(PIPELINE_COLUMNS)
+    for chunk in iter_csv_range(input_path, start, end, header, chunksize, **options):
+        chunk = chunk.reset_index(drop=True)
+        cleaned = clean_data(chunk)
+        seq = position + cleaned.index.to_numpy(dtype=np.int64)
+        position += len(chunk)
+        if cleaned.empty:
+            continue
+        state['valid_records'] += len(cleaned)
+        region_deltas.append(region_partial(cleaned))
+        latest_deltas.append(latest_sales_partial(cleaned, seq))
+        chunk_max = cleaned['timestamp'].max()
+        if isinstance(chunk_max, np.generic):
+            chunk_max = chunk_max.item()
+        if state['max_timestamp'] is None or chunk_max > state['max_timestamp']:
+            state['max_timestamp'] = chunk_max
+
+    new_records = position - state['total_records']
+    state['total_records'] = position
+
+    # O trecho novo é reduzido primeiro e só então combinado com o estado
+    if region_deltas:
+        if state['regions'] is not None:
+            region_deltas.insert(0, state['regions'])
+        state['regions'] = merge_region_partials(region_deltas)
+        _merge_latest(state_dir, state, merge_latest_sales(latest_deltas))
+    if state['regions'] is None:
+        raise ValueError(f"Nenhum registro válido em {input_path}")
+
+    state['offset'] = end
+    state['tail_digest'] = _tail_digest(input_path, end)
+    if new_records or rebuilt or not os.path.exists(os.path.join(state_dir, STATE_FILE)):
+        save_state(state_dir, state)
+
+    logging.info(
+        f"Processamento incremental: {new_records} registros novos "
+        f"(bytes {start}-{end})."
+    )
+    stats = {
+        'offset': end,
+        'new_records': new_records,
+        'total_records': state['total_records'],
+        'valid_records': state['valid_records'],
+        'max_timestamp': state['max_timestamp'],
+    }
+    return (
+        table1_from_regions(state['regions']),
+        table2_from_latest(state['candidates'][LATEST_SALES_COLUMNS], k),
+        stats,
+    )
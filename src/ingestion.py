@@ -0,0 +1,556 @@
+import glob
+import io
+import mmap
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.lazy import lazy_import, load_now
+from src.schema import PIPELINE_COLUMNS, apply_schema, read_csv_options
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Tamanho do bloco lido ao procurar quebras de linha no arquivo
+_SCAN_BLOCK = 1 << 16
+
+# Bytes do início do arquivo usados para estimar o tamanho médio das linhas
+_SAMPLE_BYTES = 1 << 20
+
+# Extensões de arquivos comprimidos (descomprimidos pelo `pd.read_csv`)
+COMPRESSED_SUFFIXES = ('.gz', '.xz', '.bz2', '.zst', '.zip')
+
+# Leitores simultâneos e blocos lidos antecipadamente por arquivo
+DEFAULT_READERS = 4
+DEFAULT_READ_AHEAD = 2
+
+# Diretório dos arquivos trocados com os processos da leitura paralela: em
+# memória (tmpfs), quando disponível; senão, o diretório temporário do sistema
+_SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Intervalo, em segundos, em que um leitor bloqueado verifica o cancelamento
+_PUT_TIMEOUT = 0.1
+
+
+class _RangeReader(io.RawIOBase):
+    """
+    Leitor de arquivo restrito ao intervalo de bytes [start, end).
+
+    Permite que o `pd.read_csv` interprete apenas um trecho do arquivo sem
+    copiá-lo para a memória.
+    """
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: self._remaining]
+        n = self._file.readinto(view)
+        self._remaining -= n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+class _MmapRangeReader(io.RawIOBase):
+    """
+    Leitor do intervalo de bytes [start, end) de um arquivo mapeado em memória.
+
+    Os bytes são copiados direto do mapeamento para o buffer do parser, sem
+    chamadas de leitura ao sistema nem cópia intermediária do intervalo.
+    """
+
+    def __init__(self, path, start, end):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._position = start
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self._end - self._position)
+        if n <= 0:
+            return 0
+        memoryview(buffer)[:n] = self._map[self._position:self._position + n]
+        self._position += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+        super().close()
+
+
+def read_header(file_path):
+    """
+    Lê o cabeçalho de um arquivo CSV.
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV.
+
+    Returns:
+        tuple[list[str], int]: Nomes das colunas e posição (em bytes) do
+        início da primeira linha de dados.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+    with open(file_path, 'rb') as f:
+        line = f.readline()
+    names = pd.read_csv(io.BytesIO(line), nrows=0).columns.tolist()
+    return names, len(line)
+
+
+def last_line_end(file_path, start, end):
+    """
+    Encontra o fim da última linha completa no intervalo [start, end).
+
+    Usado para não interpretar uma linha que ainda está sendo escrita no fim
+    de um arquivo que só cresce por anexação.
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV.
+        start (int): Início do intervalo, em bytes.
+        end (int): Fim do intervalo, em bytes.
+
+    Returns:
+        int: Posição logo após a última quebra de linha do intervalo, ou
+        `start` se o intervalo não contiver nenhuma linha completa.
+    """
+    with open(file_path, 'rb') as f:
+        position = end
+        while position > start:
+            block_start = max(start, position - _SCAN_BLOCK)
+            f.seek(block_start)
+            block = f.read(position - block_start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                return block_start + newline + 1
+            position = block_start
+    return start
+
+
+def next_line_start(file_path, position):
+    """
+    Encontra o início da primeira linha que começa em `position` ou depois.
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV.
+        position (int): Posição, em bytes.
+
+    Returns:
+        int: Posição do início da linha, ou o tamanho do arquivo se não houver
+        nenhuma linha depois de `position`.
+    """
+    if position <= 0:
+        return 0
+    with open(file_path, 'rb') as f:
+        # Se o byte anterior for uma quebra de linha, `position` já é o início
+        f.seek(position - 1)
+        offset = position - 1
+        while True:
+            block = f.read(_SCAN_BLOCK)
+            if not block:
+                return offset
+            newline = block.find(b'\n')
+            if newline >= 0:
+                return offset + newline + 1
+            offset += len(block)
+
+
+def split_ranges(file_path, n_ranges):
+    """
+    Divide as linhas de dados de um CSV em intervalos de bytes de tamanho
+    parecido, cada um começando no início de uma linha.
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV.
+        n_ranges (int): Quantidade desejada de intervalos.
+
+    Returns:
+        list[tuple[int, int]]: Intervalos [início, fim) não vazios, em ordem;
+        podem ser menos que `n_ranges` se o arquivo tiver poucas linhas.
+    """
+    if n_ranges <= 0:
+        raise ValueError(f"n_ranges deve ser positivo: {n_ranges}")
+    _, data_start = read_header(file_path)
+    size = os.path.getsize(file_path)
+    bounds = [data_start]
+    for i in range(1, n_ranges):
+        target = data_start + (size - data_start) * i // n_ranges
+        bounds.append(next_line_start(file_path, max(target, bounds[-1])))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def iter_csv_range(file_path, start, end, names, chunksize, **read_csv_kwargs):
+    """
+    Lê em blocos as linhas de um arquivo CSV contidas em [start, end).
+
+    O intervalo deve começar no início de uma linha e terminar logo após uma
+    quebra de linha; o cabeçalho é informado por `names`.
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV.
+        start (int): Início do intervalo, em bytes.
+        end (int): Fim do intervalo, em bytes.
+        names (list[str]): Nomes das colunas do arquivo.
+        chunksize (int): Quantidade máxima de linhas por bloco.
+        **read_csv_kwargs: Argumentos adicionais para `pd.read_csv`.
+
+    Yields:
+        pd.DataFrame: Bloco com até `chunksize` linhas.
+    """
+    if end <= start:
+        return
+    with io.BufferedReader(_RangeReader(file_path, start, end)) as raw:
+        reader = pd.read_csv(
+            raw, header=None, names=names, chunksize=chunksize, **read_csv_kwargs
+        )
+        with reader:
+            for chunk in reader:
+                yield chunk
+
+
+def _to_shared(values, path):
+    """
+    Grava um array para o processo principal, em um arquivo `.npy` do
+    diretório de troca (ver `_SHARED_DIR`).
+
+    Args:
+        values (np.ndarray): Array numérico ou de texto de largura fixa.
+        path (str): Arquivo de destino.
+
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    np.save(path, values, allow_pickle=False)
+    return path
+
+
+def _from_shared(path):
+    """
+    Mapeia em memória um array gravado por `_to_shared`, sem copiá-lo, e
+    remove o arquivo.
+
+    O mapeamento é privado (cópia na escrita) e continua válido depois da
+    remoção: a memória é liberada quando o último array que o usa é
+    descartado.
+
+    Args:
+        path (str): Retorno de `_to_shared`.
+
+    Returns:
+        np.ndarray: Array mapeado.
+    """
+    try:
+        values = np.load(path, mmap_mode='c', allow_pickle=False)
+    finally:
+        os.remove(path)
+    return values.view(np.ndarray)
+
+
+def _parse_range(file_path, start, end, names, columns, shared_dir):
+    """
+    Interpreta um intervalo de bytes do CSV em um processo do pool.
+
+    As colunas são convertidas para o esquema (ver `src.schema`) e devolvidas
+    como arquivos no diretório de troca, que o processo principal mapeia sem
+    copiar (ver `_from_shared`): valores para colunas numéricas e códigos
+    para colunas categóricas e para as de texto fora do esquema. As
+    categorias (até centenas de milhares de endereços por intervalo) e os
+    valores distintos do texto seguem como arrays de texto de largura fixa,
+    também sem serialização de objetos Python.
+
+    Returns:
+        dict: Descrição de cada coluna, na ordem das colunas lidas.
+    """
+    options = read_csv_options(columns)
+    with io.BufferedReader(_MmapRangeReader(file_path, start, end), _SCAN_BLOCK) as raw:
+        df = pd.read_csv(raw, header=None, names=names, **options)
+    df = apply_schema(df)
+
+    result = {}
+    for i, name in enumerate(df.columns):
+        prefix = os.path.join(shared_dir, f"{start}-{i}")
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Os códigos mantêm o tipo escolhido pelo Pandas, que os reutiliza
+            # sem conversão em `pd.Categorical.from_codes`
+            codes = _to_shared(series.cat.codes.to_numpy(), f"{prefix}-codes.npy")
+            categories = np.asarray(series.cat.categories.to_numpy(), dtype=str)
+            result[name] = (
+                'categorical', codes, _to_shared(categories, f"{prefix}-categories.npy")
+            )
+        elif series.dtype == object or not isinstance(series.dtype, np.dtype):
+            # Texto fora do esquema: códigos e valores distintos, como nas
+            # tabelas colunares (ver `src.columnar`), remontados como texto
+            codes, uniques = pd.factorize(series)
+            result[name] = (
+                'text',
+                _to_shared(codes, f"{prefix}-codes.npy"),
+                _to_shared(np.asarray(uniques, dtype=str), f"{prefix}-categories.npy"),
+            )
+        else:
+            result[name] = ('numeric', _to_shared(series.to_numpy(), f"{prefix}.npy"), None)
+    return result
+
+
+def _collect_range(parsed):
+    """
+    Monta um DataFrame a partir do retorno de `_parse_range`.
+
+    As colunas numéricas e os códigos das categóricas são os arrays mapeados
+    por `_from_shared`, usados pelo DataFrame sem cópia.
+
+    Args:
+        parsed (dict): Descrição das colunas no diretório de troca.
+
+    Returns:
+        pd.DataFrame: Colunas com os tipos do esquema.
+    """
+    data = {}
+    for name, (kind, values_path, categories_path) in parsed.items():
+        values = _from_shared(values_path)
+        if kind == 'categorical':
+            categories = _from_shared(categories_path).astype(object)
+            values = pd.Categorical.from_codes(
+                values, categories=pd.Index(categories, dtype=object)
+            )
+        elif kind == 'text':
+            # Código -1: valor ausente
+            uniques = np.append(_from_shared(categories_path).astype(object), np.nan)
+            values = uniques[values]
+        data[name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def _bytes_per_row(file_path):
+    """Estima o tamanho médio das linhas de dados a partir do início do arquivo."""
+    with open(file_path, 'rb') as f:
+        f.readline()
+        sample = f.read(_SAMPLE_BYTES)
+    return max(1, len(sample) // max(1, sample.count(b'\n')))
+
+
+def _pool(workers):
+    """Cria o pool de processos usado na leitura paralela."""
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def iter_csv_parallel(file_path, workers=None, chunksize=None, columns=PIPELINE_COLUMNS):
+    """
+    Lê um CSV em blocos interpretados em paralelo, devolvidos em ordem.
+
+    O arquivo é dividido em intervalos de bytes alinhados às linhas, com
+    cerca de `chunksize` linhas cada. Cada intervalo é interpretado em um
+    processo que mapeia o arquivo em memória e devolve as colunas já com os
+    tipos do esquema em arquivos mapeados em memória pelo processo principal,
+    sem serializar DataFrames nem copiar as colunas (ver `_parse_range`). No
+    máximo `2 * workers` intervalos ficam em andamento, o que limita a
+    memória usada.
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV.
+        workers (int, optional): Quantidade de processos. Usa o número de
+            CPUs quando omitido.
+        chunksize (int, optional): Quantidade aproximada de linhas por bloco.
+            Se omitido, divide o arquivo em `workers` blocos.
+        columns (list[str], optional): Colunas a ler. Todas, se None.
+
+    Yields:
+        pd.DataFrame: Blocos na ordem do arquivo, com os tipos do esquema e
+        índice igual à posição da linha no arquivo.
+    """
+    workers = workers or os.cpu_count() or 1
+    names, data_start = read_header(file_path)
+    n_ranges = workers
+    if chunksize:
+        rows = (os.path.getsize(file_path) - data_start) / _bytes_per_row(file_path)
+        n_ranges = max(1, int(np.ceil(rows / chunksize)))
+    ranges = split_ranges(file_path, n_ranges)
+
+    position = 0
+    shared_dir = tempfile.mkdtemp(prefix="ingestion-", dir=_SHARED_DIR)
+    try:
+        with _pool(workers) as pool:
+            pending = []
+            for start, end in ranges:
+                pending.append(pool.submit(
+                    _parse_range, file_path, start, end, names, columns, shared_dir
+                ))
+                if len(pending) < 2 * workers:
+                    continue
+                chunk = _collect_range(pending.pop(0).result())
+                chunk.index = pd.RangeIndex(position, position + len(chunk))
+                position += len(chunk)
+                yield chunk
+            for future in pending:
+                chunk = _collect_range(future.result())
+                chunk.index = pd.RangeIndex(position, position + len(chunk))
+                position += len(chunk)
+                yield chunk
+    finally:
+        # Arquivos de intervalos não consumidos (erro ou leitura interrompida)
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+def read_csv_parallel(file_path, workers=None, columns=PIPELINE_COLUMNS):
+    """
+    Lê um CSV inteiro interpretando intervalos de bytes em paralelo.
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV.
+        workers (int, optional): Quantidade de processos. Usa o número de
+            CPUs quando omitido.
+        columns (list[str], optional): Colunas a ler. Todas, se None.
+
+    Returns:
+        pd.DataFrame: Dados com os tipos do esquema (ver `src.schema`).
+    """
+    return concat_frames(list(iter_csv_parallel(file_path, workers, columns=columns)))
+
+
+def concat_frames(frames):
+    """
+    Concatena blocos lidos separadamente, unindo as categorias das colunas
+    categóricas (em vez de convertê-las para texto, como faz `pd.concat`).
+
+    Args:
+        frames (list[pd.DataFrame]): Blocos com as mesmas colunas.
+
+    Returns:
+        pd.DataFrame: Blocos concatenados, com índice 0..n-1.
+    """
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    data = {}
+    for name in frames[0].columns:
+        values = [frame[name] for frame in frames]
+        if all(isinstance(v.dtype, pd.CategoricalDtype) for v in values):
+            data[name] = pd.api.types.union_categoricals([v.array for v in values])
+        else:
+            data[name] = pd.concat(values, ignore_index=True)
+    return pd.DataFrame(data, copy=False)
+
+
+def expand_inputs(pattern):
+    """
+    Lista os arquivos de entrada de um caminho ou padrão glob.
+
+    Args:
+        pattern (str): Caminho de um arquivo ou padrão (ex.: 'data/*.csv.gz').
+
+    Returns:
+        list[str]: Arquivos encontrados, em ordem alfabética.
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo for encontrado.
+    """
+    paths = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+    if not paths:
+        raise FileNotFoundError(f"Arquivo não encontrado: {pattern}")
+    return paths
+
+
+def is_compressed(path):
+    """Indica se o arquivo é comprimido, pela extensão."""
+    return path.endswith(COMPRESSED_SUFFIXES)
+
+
+def _read_file(path, chunksize, options, output, cancelled):
+    """
+    Lê um arquivo em blocos e os coloca na fila `output` (executado em thread).
+
+    A descompressão e a interpretação do CSV liberam o GIL na maior parte do
+    tempo, então vários arquivos avançam ao mesmo tempo. A fila limitada
+    bloqueia o leitor quando o consumidor está atrasado.
+    """
+    def put(item):
+        while not cancelled.is_set():
+            try:
+                output.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        with pd.read_csv(path, chunksize=chunksize, **options) as reader:
+            for chunk in reader:
+                if not put(chunk):
+                    return
+    except BaseException as error:
+        put(error)
+        return
+    put(None)
+
+
+def iter_csv_files(
+    paths,
+    chunksize,
+    columns=PIPELINE_COLUMNS,
+    readers=DEFAULT_READERS,
+    read_ahead=DEFAULT_READ_AHEAD,
+):
+    """
+    Lê vários arquivos CSV (comprimidos ou não) como um único fluxo de blocos.
+
+    Até `readers` arquivos são lidos e descomprimidos ao mesmo tempo, em
+    threads, enquanto o consumidor processa os blocos já lidos. Cada arquivo
+    guarda no máximo `read_ahead` blocos à frente do consumidor, o que limita
+    a memória a cerca de `readers * read_ahead` blocos. Os blocos saem na
+    ordem dos arquivos e das linhas.
+
+    Args:
+        paths (list[str]): Arquivos de entrada, na ordem desejada.
+        chunksize (int): Quantidade máxima de linhas por bloco.
+        columns (list[str], optional): Colunas a ler. Todas, se None.
+        readers (int): Arquivos lidos simultaneamente.
+        read_ahead (int): Blocos lidos antecipadamente por arquivo.
+
+    Yields:
+        pd.DataFrame: Blocos com índice igual à posição da linha no fluxo.
+    """
+    if chunksize <= 0:
+        raise ValueError(f"chunksize deve ser positivo: {chunksize}")
+    options = read_csv_options(columns)
+    outputs = [queue.Queue(maxsize=read_ahead) for _ in paths]
+    cancelled = threading.Event()
+    # As threads de leitura não podem carregar os módulos preguiçosos
+    load_now(pd, np)
+    position = 0
+    # As tarefas começam na ordem de submissão, então o arquivo consumido no
+    # momento sempre já está sendo lido
+    with ThreadPoolExecutor(max_workers=max(1, readers)) as pool:
+        try:
+            for path, output in zip(paths, outputs):
+                pool.submit(_read_file, path, chunksize, options, output, cancelled)
+            for output in outputs:
+                while True:
+                    item = output.get()
+                    if item is None:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    item.index = pd.RangeIndex(position, position + len(item))
+                    position += len(item)
+                    yield item
+        finally:
+            cancelled.set()
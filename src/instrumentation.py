@@ -0,0 +1,215 @@
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# Variável de ambiente com o arquivo JSON lines das métricas das etapas
+METRICS_FILE_ENV = "PIPELINE_METRICS_FILE"
+
+# Variável de ambiente que liga o perfilamento: "cprofile" ou "tracemalloc"
+PROFILE_ENV = "PIPELINE_PROFILE"
+
+# Diretório padrão dos relatórios de perfilamento
+DEFAULT_PROFILE_DIR = "data/profiles"
+
+# Chave das métricas no XCom
+XCOM_KEY = "stage_metrics"
+
+# Quantidade de linhas de alocação no relatório do tracemalloc
+_TRACEMALLOC_TOP = 25
+
+
+def _io_counters():
+    """
+    Lê os bytes lidos e gravados pelo processo em /proc/self/io.
+
+    Usa 'rchar' e 'wchar', que contam todas as leituras e gravações (inclusive
+    as atendidas pelo cache de páginas do sistema).
+
+    Returns:
+        tuple[int, int] | None: Bytes lidos e gravados, ou None se o sistema
+        não oferecer /proc/self/io.
+    """
+    try:
+        with open('/proc/self/io') as f:
+            counters = dict(line.split(': ') for line in f.read().splitlines())
+    except OSError:
+        return None
+    return int(counters['rchar']), int(counters['wchar'])
+
+
+def reset_peak_rss():
+    """
+    Zera o pico de memória residente do processo (VmHWM), quando possível.
+
+    Returns:
+        bool: True se o pico foi zerado; caso contrário, `peak_rss_mb` passa a
+        medir o pico desde o início do processo.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss_mb():
+    """
+    Retorna o pico de memória residente do processo, em MiB.
+
+    Returns:
+        float: VmHWM de /proc/self/status ou, na falta dele, `ru_maxrss`.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss é informado em KiB no Linux e em bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def write_metrics(record, metrics_path):
+    """
+    Anexa o registro de uma etapa ao arquivo JSON lines de métricas.
+
+    Args:
+        record (dict): Métricas da etapa.
+        metrics_path (str): Arquivo de métricas (criado se não existir).
+    """
+    directory = os.path.dirname(metrics_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(metrics_path, 'a') as f:
+        f.write(json.dumps(record, default=str) + '\n')
+
+
+@contextlib.contextmanager
+def _profiled(stage, profile, profile_dir, record):
+    """
+    Executa o bloco sob cProfile ou tracemalloc e grava o relatório.
+
+    Args:
+        stage (str): Nome da etapa, usado no nome do relatório.
+        profile (str | None): "cprofile", "tracemalloc" ou None.
+        profile_dir (str): Diretório dos relatórios.
+        record (dict): Métricas da etapa; recebe o caminho do relatório.
+    """
+    if not profile:
+        yield
+        return
+    if profile not in ("cprofile", "tracemalloc"):
+        raise ValueError(f"Perfilamento inválido: {profile}")
+
+    os.makedirs(profile_dir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+    if profile == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = os.path.join(profile_dir, f"{stage}-{stamp}.prof")
+            profiler.dump_stats(path)
+            record['profile_path'] = path
+        return
+
+    tracemalloc.start()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        path = os.path.join(profile_dir, f"{stage}-{stamp}.tracemalloc.txt")
+        with open(path, 'w') as f:
+            for stat in snapshot.statistics('lineno')[:_TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
+        record['tracemalloc_peak_mb'] = peak / (1024 * 1024)
+        record['profile_path'] = path
+
+
+@contextlib.contextmanager
+def instrument_stage(stage, metrics_path=None, ti=None, profile=None,
+                     profile_dir=DEFAULT_PROFILE_DIR):
+    """
+    Mede uma etapa do pipeline e publica as métricas estruturadas.
+
+    Registra tempo de parede, tempo de CPU (do processo e dos processos
+    filhos encerrados), bytes lidos e gravados, pico de memória residente e
+    as linhas de entrada e saída, que a etapa informa no dicionário
+    retornado pelo `with`. Ao final (mesmo em caso de erro), o
+    registro é anexado ao arquivo JSON lines, enviado ao XCom quando há uma
+    instância de tarefa do Airflow e escrito no log.
+
+    Example:
+        with instrument_stage("data_shard", ti=ti) as metrics:
+            metrics["rows_in"], metrics["rows_out"] = clean(...)
+
+    Args:
+        stage (str): Nome da etapa.
+        metrics_path (str, optional): Arquivo JSON lines de métricas. Usa a
+            variável de ambiente `PIPELINE_METRICS_FILE`; sem nenhum dos dois,
+            as métricas vão apenas para o log e o XCom.
+        ti (TaskInstance, optional): Instância da tarefa do Airflow.
+        profile (str, optional): "cprofile" ou "tracemalloc" para perfilar a
+            etapa. Usa a variável de ambiente `PIPELINE_PROFILE`.
+        profile_dir (str): Diretório dos relatórios de perfilamento.
+
+    Yields:
+        dict: Registro da etapa; preencha 'rows_in' e 'rows_out'.
+    """
+    metrics_path = metrics_path or os.environ.get(METRICS_FILE_ENV)
+    profile = profile or os.environ.get(PROFILE_ENV)
+    record = {
+        'stage': stage,
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'status': 'success',
+        'rows_in': None,
+        'rows_out': None,
+    }
+
+    peak_is_stage = reset_peak_rss()
+    io_start = _io_counters()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    children_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+    try:
+        with _profiled(stage, profile, profile_dir, record):
+            yield record
+    except BaseException:
+        record['status'] = 'failed'
+        raise
+    finally:
+        record['wall_s'] = time.perf_counter() - wall_start
+        record['cpu_s'] = time.process_time() - cpu_start
+        # Processos filhos (ex.: pool de `src.parallel`) já encerrados
+        children_end = resource.getrusage(resource.RUSAGE_CHILDREN)
+        record['children_cpu_s'] = round(
+            children_end.ru_utime + children_end.ru_stime
+            - children_start.ru_utime - children_start.ru_stime,
+            6,
+        )
+        io_end = _io_counters()
+        if io_start is not None and io_end is not None:
+            record['bytes_read'] = io_end[0] - io_start[0]
+            record['bytes_written'] = io_end[1] - io_start[1]
+        record['peak_rss_mb'] = peak_rss_mb()
+        record['peak_rss_scope'] = 'stage' if peak_is_stage else 'process'
+
+        if metrics_path:
+            write_metrics(record, metrics_path)
+        if ti is not None:
+            ti.xcom_push(key=XCOM_KEY, value=record)
+        logging.info(f"Métricas da etapa: {json.dumps(record, default=str)}")
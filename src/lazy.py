@@ -0,0 +1,66 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """
+    Importa um módulo de forma preguiçosa: o código do módulo só é executado
+    no primeiro acesso a um de seus atributos.
+
+    Usado para as dependências pesadas (Pandas, NumPy, SQLAlchemy) nos
+    módulos de `src`: importar o pipeline, o CLI (`python -m src.main --help`)
+    ou as tarefas do DAG (a cada análise do arquivo pelo agendador do Airflow)
+    não paga a importação dessas bibliotecas, que acontece apenas quando uma
+    etapa é de fato executada.
+
+    Os módulos que usam esta função não podem acessar o módulo preguiçoso no
+    nível do módulo (constantes, valores padrão de argumentos, classes base),
+    apenas dentro das funções.
+
+    Example:
+        pd = lazy_import("pandas")
+
+        def load(path):
+            return pd.read_csv(path)  # Pandas é importado aqui
+
+    Args:
+        name (str): Nome completo do módulo.
+
+    Returns:
+        module: O módulo, já carregado se tiver sido importado antes.
+
+    Raises:
+        ModuleNotFoundError: Se o módulo não estiver instalado.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def load_now(*modules):
+    """
+    Carrega na thread atual módulos obtidos com `lazy_import`.
+
+    O `LazyLoader` não é seguro entre threads antes do Python 3.12: threads
+    que acessam ao mesmo tempo um módulo ainda não carregado podem executá-lo
+    mais de uma vez ou vê-lo parcialmente inicializado. Chame esta função
+    antes de iniciar threads que usam os módulos.
+
+    Example:
+        load_now(pd, np)
+        thread.start()
+
+    Args:
+        *modules (module): Módulos preguiçosos (ou já carregados).
+    """
+    for module in modules:
+        # O acesso a qualquer atributo executa o módulo
+        module.__name__
@@ -1,80 +1,346 @@
-import pandas as pd
+import argparse
+import contextlib
 import os
-
-# Configurações de exibição do Pandas (opcional)
-pd.set_option('display.max_columns', None)  # Exibir todas as colunas
-pd.set_option('display.max_rows', None)     # Exibir todas as linhas
-pd.set_option('display.width', None)        # Ajustar a largura da exibição
-pd.set_option('display.max_colwidth', None) # Exibir todo o conteúdo das células
-
-
-def load_data(file_path):
+import shutil
+from datetime import datetime, timezone
+
+from src.aggregates import latest_sales_partial, table1_from_regions, table2_from_latest
+from src.cache import run_cached
+from src.columnar import append_table
+from src.dedup import IDENTITY_COLUMNS, DedupIndex, identity_hashes
+from src.engines import DEFAULT_ENGINE, ENGINES, get_engine
+from src.ingestion import (
+    concat_frames,
+    expand_inputs,
+    is_compressed,
+    iter_csv_files,
+    iter_csv_parallel,
+    read_csv_parallel,
+)
+from src.instrumentation import instrument_stage
+from src.lazy import lazy_import
+from src.parallel import compute_tables_parallel
+from src.partitioned import (
+    append_partitioned,
+    filter_window,
+    iter_partitioned,
+    parse_time,
+)
+from src.quality import add_counts, evaluate_rules, quarantine_rows
+from src.report_service import publish_run
+from src.schema import PIPELINE_COLUMNS, apply_schema, read_csv_options
+from src.spill import DEFAULT_SPILL_DIR, ExternalLatestSales
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Configurações de exibição do Pandas ao imprimir as listas: todas as colunas,
+# com o conteúdo completo das células. Aplicadas apenas na impressão (sem
+# alterar as opções globais de quem importa este módulo)
+DISPLAY_OPTIONS = (
+    'display.max_columns', None,
+    'display.width', None,
+    'display.max_colwidth', None,
+)
+
+# Quantidade padrão de linhas lidas por bloco no modo streaming
+DEFAULT_CHUNKSIZE = 100_000
+
+# Colunas usadas no cálculo das tabelas 1 e 2
+TABLE_COLUMNS = PIPELINE_COLUMNS
+
+
+def load_data(file_path, columns=PIPELINE_COLUMNS, workers=1):
     """
     Carrega os dados de um arquivo CSV.
 
+    A leitura segue o esquema de `src.schema`: apenas as colunas pedidas são
+    lidas e as colunas de texto já chegam como categóricas. Com `workers`
+    diferente de 1, o arquivo é interpretado em paralelo por intervalos de
+    bytes (ver `src.ingestion.read_csv_parallel`) e as colunas numéricas já
+    chegam convertidas. Um padrão glob ou arquivos comprimidos são lidos
+    simultaneamente e concatenados na ordem dos arquivos (ver
+    `src.ingestion.iter_csv_files`).
+
     Args:
-        file_path (str): Caminho para o arquivo CSV.
+        file_path (str): Caminho para o arquivo CSV ou padrão glob.
+        columns (list[str], optional): Colunas a ler. Todas, se None.
+        workers (int): Processos usados na leitura (0 ou None = todas as CPUs).
 
     Returns:
         pd.DataFrame: DataFrame contendo os dados carregados.
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-    return pd.read_csv(file_path)
+    paths = expand_inputs(file_path)
+    if len(paths) > 1 or is_compressed(paths[0]):
+        return concat_frames(list(iter_csv_files(paths, DEFAULT_CHUNKSIZE, columns)))
+    if workers != 1:
+        return read_csv_parallel(paths[0], workers or None, columns)
+    return pd.read_csv(paths[0], **read_csv_options(columns))
 
 
-def clean_data(df):
+def load_data_in_chunks(file_path, chunksize=DEFAULT_CHUNKSIZE, columns=PIPELINE_COLUMNS):
+    """
+    Lê um arquivo CSV em blocos de tamanho fixo, sem carregá-lo inteiro.
+
+    Um padrão glob ou arquivos comprimidos viram um único fluxo de blocos,
+    com leitura e descompressão simultâneas dos arquivos (ver
+    `src.ingestion.iter_csv_files`).
+
+    Args:
+        file_path (str): Caminho para o arquivo CSV ou padrão glob.
+        chunksize (int): Quantidade máxima de linhas por bloco.
+        columns (list[str], optional): Colunas a ler. Todas, se None.
+
+    Yields:
+        pd.DataFrame: Bloco com até `chunksize` linhas do arquivo.
+    """
+    paths = expand_inputs(file_path)
+    if chunksize <= 0:
+        raise ValueError(f"chunksize deve ser positivo: {chunksize}")
+    if len(paths) > 1 or is_compressed(paths[0]):
+        yield from iter_csv_files(paths, chunksize, columns)
+        return
+    options = read_csv_options(columns)
+    with pd.read_csv(paths[0], chunksize=chunksize, **options) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def clean_data(df, engine=DEFAULT_ENGINE):
     """
     Limpa os dados para preparar para processamento.
 
+    Converte as colunas para os tipos de `src.schema` e mantém apenas as
+    linhas que passam nas regras de `src.quality.RULES` ('risk_score',
+    'amount' e 'timestamp' válidos e 'location_region' no padrão), com uma
+    única seleção sobre o DataFrame.
+
     Args:
         df (pd.DataFrame): DataFrame original.
+        engine (str): Motor de cálculo (ver `src.engines`).
 
     Returns:
         pd.DataFrame: DataFrame limpo.
     """
-    df['risk_score'] = pd.to_numeric(df['risk_score'], errors='coerce')
-    df['amount'] = pd.to_numeric(df['amount'], errors='coerce')
-    df = df[df['location_region'].str.match(r'^[a-zA-Z\s]+$', na=False)]
-    df = df.dropna(subset=['risk_score', 'amount'])
-    return df
+    return get_engine(engine).clean(df)
+
+
+def clean_data_streaming(
+    input_path,
+    output_path,
+    chunksize=DEFAULT_CHUNKSIZE,
+    output_format="csv",
+    workers=1,
+    quarantine_path=None,
+    rejections=None,
+    dedup=None,
+    engine=DEFAULT_ENGINE,
+):
+    """
+    Limpa um arquivo CSV bloco a bloco, anexando o resultado ao arquivo de saída.
 
+    Cada bloco passa pelas mesmas regras de `clean_data`, de modo que o uso de
+    memória fica limitado pelo tamanho do bloco e não pelo tamanho do arquivo.
+    As regras são avaliadas uma vez por bloco (ver `src.quality`), e a mesma
+    avaliação fornece as linhas rejeitadas e a contagem por regra.
 
-def compute_table1(df):
+    Args:
+        input_path (str): Caminho para o arquivo CSV original.
+        output_path (str): Caminho da saída limpa a ser gerada.
+        chunksize (int): Quantidade máxima de linhas lidas por bloco.
+        output_format (str): "csv" para um arquivo CSV, "columnar" para uma
+            tabela colunar (ver `src.columnar`), com uma parte por bloco, ou
+            "partitioned" para uma tabela colunar por data (ver
+            `src.partitioned`).
+        workers (int): Processos que interpretam os blocos em paralelo (ver
+            `src.ingestion.iter_csv_parallel`); 0 ou None = todas as CPUs.
+            Ignorado para padrões glob e arquivos comprimidos.
+        quarantine_path (str, optional): Arquivo CSV que recebe as linhas
+            rejeitadas, com a coluna 'rejected_by' (ver
+            `src.quality.quarantine_rows`).
+        rejections (dict, optional): Recebe a quantidade de linhas rejeitadas
+            por regra (somada às contagens já presentes).
+        dedup (src.dedup.DedupIndex, optional): Índice das transações já
+            ingeridas. Linhas válidas já presentes no índice (ou repetidas na
+            entrada) são descartadas e contadas como 'duplicate'; as novas são
+            acrescentadas ao índice, que deve ser gravado pelo chamador depois
+            da saída.
+        engine (str): Motor de cálculo que seleciona as linhas válidas de
+            cada bloco (ver `src.engines`).
+
+    Returns:
+        tuple[int, int]: Total de registros lidos e total de registros válidos
+        (gravados na saída).
+    """
+    if output_format not in ("csv", "columnar", "partitioned"):
+        raise ValueError(f"Formato de saída inválido: {output_format}")
+
+    engine = get_engine(engine)
+    columns = PIPELINE_COLUMNS if dedup is None else dedup_columns()
+    paths = expand_inputs(input_path)
+    if workers == 1 or len(paths) > 1 or is_compressed(paths[0]):
+        chunks = load_data_in_chunks(input_path, chunksize, columns)
+    else:
+        chunks = iter_csv_parallel(paths[0], workers or None, chunksize, columns)
+
+    total_records = 0
+    valid_records = 0
+    with contextlib.ExitStack() as stack:
+        if output_format in ("columnar", "partitioned"):
+            shutil.rmtree(output_path, ignore_errors=True)
+            if output_format == "partitioned":
+                # Uma tabela sem partições (nenhuma linha nova) ainda é válida
+                os.makedirs(output_path)
+        else:
+            output = stack.enter_context(open(output_path, 'w', newline=''))
+        if quarantine_path is not None:
+            quarantine = stack.enter_context(open(quarantine_path, 'w', newline=''))
+
+        for i, chunk in enumerate(chunks):
+            chunk = apply_schema(chunk)
+            valid, failures, counts = evaluate_rules(chunk)
+            cleaned = engine.select_rows(chunk, valid)
+            if dedup is not None:
+                cleaned = drop_duplicates(cleaned, dedup, counts)
+            if output_format == "columnar":
+                append_table(cleaned, output_path)
+            elif output_format == "partitioned":
+                append_partitioned(cleaned, output_path)
+            else:
+                cleaned.to_csv(output, index=False, header=(i == 0))
+            if quarantine_path is not None:
+                rejected = quarantine_rows(chunk, valid, failures)
+                rejected.to_csv(quarantine, index=False, header=(i == 0))
+            if rejections is not None:
+                add_counts(rejections, counts)
+            total_records += len(chunk)
+            valid_records += len(cleaned)
+    return total_records, valid_records
+
+
+def dedup_columns():
+    """
+    Lista as colunas lidas quando há deduplicação: as do pipeline e as de
+    identidade (ver `src.dedup.IDENTITY_COLUMNS`).
+
+    Returns:
+        list[str]: Nomes das colunas.
+    """
+    return PIPELINE_COLUMNS + [name for name in IDENTITY_COLUMNS if name not in PIPELINE_COLUMNS]
+
+
+def drop_duplicates(df, dedup, counts):
+    """
+    Descarta as transações já ingeridas de um DataFrame limpo.
+
+    Args:
+        df (pd.DataFrame): Linhas limpas, com as colunas de `dedup_columns`.
+        dedup (src.dedup.DedupIndex): Índice das transações já ingeridas,
+            que recebe as novas.
+        counts (dict): Recebe a quantidade de linhas descartadas em
+            'duplicate'.
+
+    Returns:
+        pd.DataFrame: Linhas novas, apenas com as colunas do pipeline.
+    """
+    new = dedup.add_new(identity_hashes(df))
+    counts['duplicate'] = counts.get('duplicate', 0) + int(len(new) - new.sum())
+    return df.loc[new, PIPELINE_COLUMNS]
+
+
+def compute_table1(df, engine=DEFAULT_ENGINE):
     """
     Calcula a média de 'risk_score' por 'location_region', em ordem decrescente.
 
     Args:
         df (pd.DataFrame): DataFrame limpo.
+        engine (str): Motor de cálculo (ver `src.engines`).
 
     Returns:
         pd.DataFrame: DataFrame contendo a tabela 1.
     """
-    return (
-        df.groupby('location_region')['risk_score']
-        .mean()
-        .sort_values(ascending=False)
-        .reset_index()
-    )
+    return get_engine(engine).table1(df)
 
 
-def compute_table2(df):
+def compute_table2(
+    df, k=3, memory_budget=None, spill_dir=DEFAULT_SPILL_DIR, engine=DEFAULT_ENGINE
+):
     """
-    Seleciona os 3 maiores valores de 'amount' considerando transações recentes.
+    Seleciona os `k` maiores valores de 'amount' considerando transações recentes.
+
+    Para cada 'receiving_address' com vendas, considera apenas a venda mais
+    recente (em empate de 'timestamp', a que aparece por último) e retorna as
+    `k` de maior 'amount'. Usa `src.topk.latest_top_k`, em tempo linear, sem
+    ordenar todas as vendas nem copiar o DataFrame filtrado.
+
+    Com `memory_budget`, o agrupamento por endereço é feito em blocos pela
+    agregação externa de `src.spill`, que grava o estado em disco quando ele
+    ultrapassa o orçamento; o resultado é o mesmo.
 
     Args:
         df (pd.DataFrame): DataFrame limpo.
+        k (int): Quantidade de transações na tabela.
+        memory_budget (int, optional): Bytes do estado por endereço mantidos
+            na memória.
+        spill_dir (str): Diretório dos arquivos temporários da agregação externa.
+        engine (str): Motor de cálculo sem `memory_budget` (ver `src.engines`).
 
     Returns:
         pd.DataFrame: DataFrame contendo a tabela 2.
     """
-    df_filtered = df[df['transaction_type'] == 'sale']
-    df_filtered = (
-        df_filtered.sort_values('timestamp')
-        .groupby('receiving_address', as_index=False)
-        .last()
-    )
-    return df_filtered.nlargest(3, 'amount')[['receiving_address', 'amount', 'timestamp']]
+    if memory_budget is not None:
+        with ExternalLatestSales(memory_budget, spill_dir) as latest:
+            for start in range(0, len(df), DEFAULT_CHUNKSIZE):
+                block = df.iloc[start:start + DEFAULT_CHUNKSIZE]
+                seq = np.arange(start, start + len(block), dtype=np.int64)
+                latest.add(latest_sales_partial(block, seq))
+            return table2_from_latest(latest.candidates(k), k)
+    return get_engine(engine).table2(df, k)
+
+
+def tables_from_partitioned(
+    path, start=None, end=None, k=3, memory_budget=None, spill_dir=DEFAULT_SPILL_DIR
+):
+    """
+    Calcula as tabelas 1 e 2 a partir de uma tabela limpa particionada por
+    data, parte a parte.
+
+    Cada parte (ver `src.partitioned.iter_partitioned`) é reduzida aos
+    agregados parciais de `src.fused.aggregate_cleaned`, de modo que a memória
+    depende do tamanho das partes e da quantidade de endereços, não da tabela.
+    O resultado é o mesmo de `compute_table1` e `compute_table2` sobre
+    `read_partitioned(path, TABLE_COLUMNS, start, end)`.
+
+    Args:
+        path (str): Diretório raiz da tabela particionada.
+        start (int, optional): Início da janela (inclusivo), em segundos.
+        end (int, optional): Fim da janela (exclusivo), em segundos.
+        k (int): Quantidade de transações na Tabela 2.
+        memory_budget (int, optional): Bytes do estado por endereço mantidos
+            na memória (ver `src.spill`).
+        spill_dir (str): Diretório dos arquivos temporários da agregação externa.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, int]: Tabela 1, Tabela 2 e
+        quantidade de linhas lidas.
+    """
+    # Importado aqui porque src.fused depende deste módulo
+    from src.fused import aggregate_cleaned
+
+    parts = iter_partitioned(path, TABLE_COLUMNS, start, end)
+    if memory_budget is None:
+        partial = aggregate_cleaned(parts)
+        latest = partial['latest_sales']
+    else:
+        with ExternalLatestSales(memory_budget, spill_dir) as spill:
+            partial = aggregate_cleaned(parts, spill)
+            latest = spill.candidates(k)
+    if partial['regions'] is None:
+        # Nenhuma partição na janela
+        empty = pd.DataFrame(columns=TABLE_COLUMNS)
+        return compute_table1(empty), compute_table2(empty, k), 0
+    table1 = table1_from_regions(partial['regions'])
+    return table1, table2_from_latest(latest, k), partial['valid_records']
 
 
 def calculate_metrics(df, original_count):
@@ -88,8 +354,20 @@ def calculate_metrics(df, original_count):
     Returns:
         dict: Dicionário contendo as métricas calculadas.
     """
-    total_records = original_count
-    valid_records = len(df)
+    return metrics_from_counts(original_count, len(df))
+
+
+def metrics_from_counts(total_records, valid_records):
+    """
+    Calcula métricas de qualidade a partir das contagens de registros.
+
+    Args:
+        total_records (int): Total de registros lidos.
+        valid_records (int): Total de registros que passaram na limpeza.
+
+    Returns:
+        dict: Dicionário contendo as métricas calculadas.
+    """
     error_records = total_records - valid_records
     compliance_rate = (valid_records / total_records) * 100
 
@@ -101,47 +379,517 @@ def calculate_metrics(df, original_count):
     }
 
 
-def main():
+def cleaning_cache_params(layout, window=None):
+    """
+    Monta os parâmetros da chave de cache da etapa "cleaning" (ver
+    `src.cache.stage_key`).
+
+    O formato da saída faz parte dos parâmetros: a mesma entrada limpa gera
+    entradas distintas do cache para cada formato.
+
+    Args:
+        layout (str): "partitioned" para a tabela particionada por data com
+            todas as colunas do pipeline (ver `clean_data_streaming`), ou
+            "table" para o DataFrame limpo com as colunas das tabelas,
+            restrito à janela.
+        window (tuple[int, int], optional): Janela [início, fim) aplicada à
+            saída "table".
+
+    Returns:
+        dict: Parâmetros da chave.
+
+    Raises:
+        ValueError: Se o formato for desconhecido.
+    """
+    if layout == "partitioned":
+        return {"layout": layout, "columns": PIPELINE_COLUMNS}
+    if layout != "table":
+        raise ValueError(f"Formato da saída limpa inválido: {layout}")
+    params = {"layout": layout, "columns": TABLE_COLUMNS}
+    if window is not None:
+        params["window"] = list(window)
+    return params
+
+
+def run_batch(
+    input_file,
+    output_dir,
+    chunksize=None,
+    workers=1,
+    cache_dir=None,
+    metrics_path=None,
+    profile=None,
+    quarantine_path=None,
+    memory_budget=None,
+    spill_dir=DEFAULT_SPILL_DIR,
+    window=None,
+    dedup_dir=None,
+    engine=DEFAULT_ENGINE,
+):
+    """
+    Executa a limpeza e o cálculo das tabelas sobre a entrada completa.
+
+    Com `cache_dir`, cada etapa é memorizada pela impressão digital da
+    entrada, pelos parâmetros e pela versão do código (ver `src.cache`): se
+    nada mudou, as tabelas são lidas do cache sem limpar nem agregar. Com
+    `quarantine_path` o cache não é usado, pois a quarentena só é gerada
+    quando a entrada é relida. Com `dedup_dir` também não: o resultado depende
+    das transações ingeridas nas execuções anteriores.
+
+    Args:
+        input_file (str): Arquivo CSV de entrada.
+        output_dir (str): Diretório de saída (usado pela limpeza em blocos).
+        chunksize (int, optional): Limpa a entrada em blocos deste tamanho. A
+            saída limpa é gravada em `output_dir`/cleaned_data e as tabelas
+            são calculadas parte a parte (ver `tables_from_partitioned`), sem
+            carregar a tabela inteira.
+        workers (int): Processos usados na leitura e, sem `chunksize`, nas
+            tabelas (0 = todas as CPUs).
+        cache_dir (str, optional): Diretório do cache das etapas.
+        metrics_path (str, optional): Arquivo JSON lines com as métricas de
+            desempenho de cada etapa (ver `src.instrumentation`).
+        profile (str, optional): "cprofile" ou "tracemalloc" para perfilar
+            as etapas.
+        quarantine_path (str, optional): Arquivo CSV que recebe as linhas
+            rejeitadas e as regras violadas (ver `src.quality`).
+        memory_budget (int, optional): Bytes do estado por endereço da Tabela
+            2 mantidos na memória (ver `compute_table2`); apenas com
+            `workers=1`.
+        spill_dir (str): Diretório dos arquivos temporários da agregação externa.
+        window (tuple[int, int], optional): Janela [início, fim) de 'timestamp',
+            em segundos (None em um dos lados = sem limite), considerada nas
+            tabelas. Na limpeza em blocos, a saída é particionada por data
+            (ver `src.partitioned`) e apenas as partições da janela são lidas;
+            a tabela inteira é memorizada no cache e restaurada em
+            `output_dir`.
+        dedup_dir (str, optional): Diretório do índice das transações já
+            ingeridas (ver `src.dedup`). Transações reentregues, nesta ou em
+            execuções anteriores, são descartadas; o índice é gravado depois
+            da limpeza.
+        engine (str): Motor de cálculo da limpeza e, com `workers=1` e sem
+            `chunksize`, das tabelas (ver `src.engines`). Os motores produzem os mesmos
+            resultados, por isso o motor não faz parte da chave do cache.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, dict]: Tabela 1, Tabela 2 e métricas,
+        incluindo as linhas rejeitadas por regra ('rejections').
+    """
+    start, end = window or (None, None)
+    if quarantine_path is not None or dedup_dir is not None:
+        cache_dir = None
+    dedup = None if dedup_dir is None else DedupIndex.open(dedup_dir)
+
+    def cleaning_stage():
+        with instrument_stage("cleaning", metrics_path, profile=profile) as stage:
+            if chunksize:
+                # Limpeza em blocos: a entrada nunca é carregada inteira na memória
+                print(f"Limpando os dados em blocos de {chunksize} linhas...\n")
+                # Saída intermediária colunar e particionada por data: relida
+                # parte a parte, sem parsing de texto, apenas nas partições
+                # da janela
+                rejections = {}
+                original_count, valid_count = clean_data_streaming(
+                    input_file,
+                    cleaned_dir,
+                    chunksize,
+                    output_format="partitioned",
+                    workers=workers,
+                    quarantine_path=quarantine_path,
+                    rejections=rejections,
+                    dedup=dedup,
+                    engine=engine,
+                )
+                cleaned, rows_out = cleaned_dir, valid_count
+            else:
+                # Carregando os dados
+                print("Carregando os dados...")
+                columns = PIPELINE_COLUMNS if dedup is None else dedup_columns()
+                df_original = apply_schema(load_data(input_file, columns, workers=workers))
+                original_count = len(df_original)
+
+                # Limpando os dados: a mesma avaliação das regras de `clean_data`,
+                # mantendo as contagens e as linhas rejeitadas
+                print("Limpando os dados...\n")
+                valid, failures, rejections = evaluate_rules(df_original)
+                if quarantine_path is not None:
+                    quarantine = quarantine_rows(df_original, valid, failures)
+                    quarantine.to_csv(quarantine_path, index=False)
+                df_cleaned = get_engine(engine).select_rows(df_original, valid)
+                if dedup is not None:
+                    df_cleaned = drop_duplicates(df_cleaned, dedup, rejections)
+                valid_count = len(df_cleaned)
+                cleaned = filter_window(df_cleaned, start, end)
+                rows_out = len(cleaned)
+            if dedup is not None:
+                # Apenas depois da saída limpa: uma falha antes deste ponto
+                # não marca as transações como ingeridas
+                dedup.save()
+            stage["rows_in"], stage["rows_out"] = original_count, rows_out
+        metadata = {
+            "total_records": original_count,
+            "valid_records": valid_count,
+            "rejections": rejections,
+        }
+        return {"cleaned_data": cleaned}, metadata
+
+    # A chave do cache considera todos os arquivos de um padrão glob
+    inputs = expand_inputs(input_file)
+    window_params = {} if window is None else {"window": [start, end]}
+    cleaned_dir = os.path.join(output_dir, "cleaned_data")
+    if chunksize:
+        # A tabela particionada inteira é memorizada e restaurada em
+        # `cleaned_dir`; a janela só é aplicada na leitura
+        cleaning_params = cleaning_cache_params("partitioned")
+        restore = {"cleaned_data": cleaned_dir}
+    else:
+        cleaning_params = cleaning_cache_params("table", window)
+        restore = None
+    tables_params = {"k": 3, **window_params}
+
+    def tables_stage():
+        cleaned, info = run_cached(
+            cache_dir, "cleaning", inputs, cleaning_params, cleaning_stage, restore=restore
+        )
+
+        # Calculando métricas de qualidade (da limpeza inteira, não da janela)
+        print("Calculando metricas de qualidade...\n")
+        metrics = metrics_from_counts(info["total_records"], info["valid_records"])
+        metrics["rejections"] = info["rejections"]
+
+        # Processando as Listas 1 e 2
+        with instrument_stage("tables", metrics_path, profile=profile) as stage:
+            if chunksize:
+                # As partes da saída limpa alimentam os agregados parciais,
+                # sem carregar a tabela inteira
+                table1, table2, rows_in = tables_from_partitioned(
+                    cleaned_dir, start, end, memory_budget=memory_budget, spill_dir=spill_dir
+                )
+                stage["rows_in"], stage["rows_out"] = rows_in, len(table1) + len(table2)
+                return {"table1": table1, "table2": table2}, metrics
+            df_cleaned = cleaned["cleaned_data"]
+            if workers == 1:
+                table1 = compute_table1(df_cleaned, engine)
+                table2 = compute_table2(
+                    df_cleaned, memory_budget=memory_budget, spill_dir=spill_dir, engine=engine
+                )
+            else:
+                print(f"Calculando as listas em {workers or 'todas as'} CPUs...\n")
+                table1, table2 = compute_tables_parallel(df_cleaned, workers=workers or None)
+            stage["rows_in"], stage["rows_out"] = len(df_cleaned), len(table1) + len(table2)
+        return {"table1": table1, "table2": table2}, metrics
+
+    tables, metrics = run_cached(cache_dir, "tables", inputs, tables_params, tables_stage)
+    return tables["table1"], tables["table2"], metrics
+
+
+def parse_args(argv=None):
+    """
+    Interpreta os argumentos de linha de comando do pipeline.
+
+    Args:
+        argv (list[str], optional): Argumentos a interpretar. Usa `sys.argv`
+            quando omitido.
+
+    Returns:
+        argparse.Namespace: Argumentos interpretados.
+    """
+    parser = argparse.ArgumentParser(description="Pipeline local de dados")
+    parser.add_argument(
+        "--input",
+        default="data/input.csv",
+        help="Arquivo CSV de entrada ou padrão glob (aceita .gz, .xz, .bz2, .zst e .zip)",
+    )
+    parser.add_argument(
+        "--output-dir", default="data/output", help="Diretório de saída"
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Limpa a entrada em blocos com este número de linhas (streaming)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processos usados na leitura e no cálculo das tabelas (0 = todas as CPUs)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Processa apenas as linhas anexadas desde a última execução",
+    )
+    parser.add_argument(
+        "--state-dir",
+        default="data/state",
+        help="Diretório do estado do modo incremental",
+    )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="Limpa, mede e calcula as tabelas em uma única leitura da entrada",
+    )
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help=(
+            "Lê, limpa, agrega e grava a saída limpa em etapas simultâneas ligadas "
+            "por filas limitadas, com memória limitada a poucos blocos"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Reaproveita as saídas das etapas quando a entrada não mudou",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=None,
+        help="Anexa as métricas de desempenho de cada etapa a este arquivo JSON lines",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "tracemalloc"],
+        default=None,
+        help="Perfila cada etapa e grava os relatórios em data/profiles",
+    )
+    parser.add_argument(
+        "--quarantine",
+        default=None,
+        help="Grava as linhas rejeitadas, com as regras violadas, neste arquivo CSV",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Grava as Listas 1 e 2 neste banco (URL do SQLAlchemy)",
+    )
+    parser.add_argument(
+        "--run-id",
+        default=None,
+        help="Identificador da execução (no banco, repetir o mesmo id substitui as linhas)",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=None,
+        help=(
+            "Memória (MiB) do agrupamento por endereço da Lista 2; acima dela, o estado "
+            "é gravado em disco (modos em lote com --workers 1 e --fused)"
+        ),
+    )
+    parser.add_argument(
+        "--spill-dir",
+        default=DEFAULT_SPILL_DIR,
+        help="Diretório dos arquivos temporários de --memory-budget",
+    )
+    parser.add_argument(
+        "--since",
+        default=None,
+        help=(
+            "Início da janela de 'timestamp' considerada nas listas (data ISO, ex.: "
+            "2024-01-01, ou segundos desde a época); modos em lote e --fused"
+        ),
+    )
+    parser.add_argument(
+        "--until",
+        default=None,
+        help="Fim (exclusivo) da janela de 'timestamp' considerada nas listas",
+    )
+    parser.add_argument(
+        "--sketches",
+        action="store_true",
+        help=(
+            "Com --fused, gera também region_stats.csv: quantis de 'risk_score' e "
+            "'amount' e endereços distintos aproximados por região, em memória constante"
+        ),
+    )
+    parser.add_argument(
+        "--risk-window",
+        default=None,
+        help=(
+            "Com --fused, gera também risk_windows.csv: contagem, média e máximo de "
+            "'risk_score' por região e janela de tempo desta largura (ex.: 1h, 1D)"
+        ),
+    )
+    parser.add_argument(
+        "--risk-slide",
+        default=None,
+        help="Passo das janelas deslizantes de --risk-window (ex.: 1h); sem ele, janelas fixas",
+    )
+    parser.add_argument(
+        "--dedup-dir",
+        default=None,
+        help=(
+            "Índice das transações já ingeridas: transações reentregues (na mesma "
+            "ou em outra execução) são descartadas; apenas nos modos em lote"
+        ),
+    )
+    parser.add_argument(
+        "--engine",
+        choices=sorted(ENGINES),
+        default=DEFAULT_ENGINE,
+        help=(
+            "Motor de cálculo da limpeza e, com --workers 1, das listas; os motores "
+            "produzem os mesmos resultados (apenas nos modos em lote)"
+        ),
+    )
+    args = parser.parse_args(argv)
+    if args.sketches and not args.fused:
+        parser.error("--sketches requer --fused")
+    if args.risk_window and not args.fused:
+        parser.error("--risk-window requer --fused")
+    if args.risk_slide and not args.risk_window:
+        parser.error("--risk-slide requer --risk-window")
+    if args.dedup_dir and (args.fused or args.incremental):
+        parser.error("--dedup-dir não pode ser usado com --fused ou --incremental")
+    if args.pipelined and (args.fused or args.incremental or args.quarantine or args.dedup_dir):
+        parser.error(
+            "--pipelined não pode ser usado com --fused, --incremental, --quarantine "
+            "ou --dedup-dir"
+        )
+    if args.engine != DEFAULT_ENGINE and (args.fused or args.incremental):
+        parser.error("--engine não pode ser usado com --fused ou --incremental")
+    return args
+
+
+def main(argv=None):
     """
     Função principal para executar o pipeline de dados.
+
+    Args:
+        argv (list[str], optional): Argumentos de linha de comando.
     """
-    input_file = "data/input.csv"
-    output_dir = "data/output"
+    args = parse_args(argv)
+    memory_budget = args.memory_budget * 1024 * 1024 if args.memory_budget else None
+    window = None
+    if args.since is not None or args.until is not None:
+        window = (parse_time(args.since), parse_time(args.until))
+    sketches = None
+    risk_windows = None
+    input_file = args.input
+    output_dir = args.output_dir
 
     # Criação do diretório de saída, se não existir
     os.makedirs(output_dir, exist_ok=True)
 
     print("=== Iniciando o pipeline de dados ===")
 
-    # Carregando os dados
-    print("Carregando os dados...")
-    df_original = load_data(input_file)
-    original_count = len(df_original)
-
-    # Limpando os dados
-    print("Limpando os dados...\n")
-    df_cleaned = clean_data(df_original)
-
-    # Calculando métricas de qualidade
-    print("Calculando metricas de qualidade...\n")
-    metrics = calculate_metrics(df_cleaned, original_count)
-    print(f"Metricas calculadas: ")
+    if args.incremental:
+        # Importado aqui porque src.incremental depende deste módulo
+        from src.incremental import update_incremental
+
+        print("Processando apenas as linhas novas (modo incremental)...\n")
+        with instrument_stage("incremental", args.metrics_file, profile=args.profile) as stage:
+            table1, table2, stats = update_incremental(
+                input_file, args.state_dir, args.chunksize or DEFAULT_CHUNKSIZE
+            )
+            stage["rows_in"] = stats['new_records']
+            stage["rows_out"] = len(table1) + len(table2)
+        print(f"Registros novos processados: {stats['new_records']}\n")
+        metrics = metrics_from_counts(
+            stats['total_records'], stats['valid_records']
+        )
+    elif args.fused:
+        # Importado aqui porque src.fused depende deste módulo
+        from src.fused import run_fused
+        from src.sketches import RegionSketches
+        from src.windows import RegionWindows
+
+        if args.sketches:
+            sketches = RegionSketches()
+        if args.risk_window:
+            risk_windows = RegionWindows(args.risk_window, args.risk_slide)
+        print("Limpando e processando os dados em uma única leitura...\n")
+        with instrument_stage("fused", args.metrics_file, profile=args.profile) as stage:
+            table1, table2, metrics, _ = run_fused(
+                input_file,
+                args.chunksize or DEFAULT_CHUNKSIZE,
+                memory_budget=memory_budget,
+                spill_dir=args.spill_dir,
+                window=window,
+                sketches=sketches,
+                risk_windows=risk_windows,
+            )
+            stage["rows_in"] = metrics['total_records']
+            stage["rows_out"] = len(table1) + len(table2)
+    elif args.pipelined:
+        # Importado aqui porque src.pipelined depende deste módulo
+        from src.pipelined import run_pipelined
+
+        print("Limpando e processando os dados em pipeline...\n")
+        with instrument_stage("pipelined", args.metrics_file, profile=args.profile) as stage:
+            table1, table2, metrics = run_pipelined(
+                input_file,
+                os.path.join(output_dir, "cleaned_data"),
+                args.chunksize or DEFAULT_CHUNKSIZE,
+                window=window,
+                engine=args.engine,
+            )
+            stage["rows_in"] = metrics['total_records']
+            stage["rows_out"] = len(table1) + len(table2)
+    else:
+        table1, table2, metrics = run_batch(
+            input_file,
+            output_dir,
+            args.chunksize,
+            args.workers,
+            args.cache_dir,
+            args.metrics_file,
+            args.profile,
+            args.quarantine,
+            memory_budget,
+            args.spill_dir,
+            window,
+            args.dedup_dir,
+            args.engine,
+        )
+
+    print("Metricas calculadas: ")
     for key, value in metrics.items():
         print(f"{key}: {value}")
 
-    # Processando a Lista 1
+    # Salvando a Lista 1
     print("\nGerando a Lista 1...")
-    table1 = compute_table1(df_cleaned)
     table1.to_csv(os.path.join(output_dir, "table1.csv"), index=False)
     print("Lista 1 gerada com sucesso!")
-    print(table1)
+    with pd.option_context(*DISPLAY_OPTIONS):
+        print(table1)
 
-    # Processando a Lista 2
+    # Salvando a Lista 2
     print("\nGerando a Lista 2...")
-    table2 = compute_table2(df_cleaned)
     table2.to_csv(os.path.join(output_dir, "table2.csv"), index=False)
     print("Lista 2 gerada com sucesso!")
-    print(table2)
+    with pd.option_context(*DISPLAY_OPTIONS):
+        print(table2)
+
+    if sketches is not None:
+        # Estatísticas por região aproximadas, a partir dos sketches
+        print("\nGerando as estatísticas por região...")
+        region_stats = sketches.table()
+        region_stats.to_csv(os.path.join(output_dir, "region_stats.csv"), index=False)
+        with pd.option_context(*DISPLAY_OPTIONS):
+            print(region_stats)
+
+    if risk_windows is not None:
+        # Série de risco por região e janela de tempo
+        print("\nGerando a série de risco por janela...")
+        series = risk_windows.table()
+        series.to_csv(os.path.join(output_dir, "risk_windows.csv"), index=False)
+        print(f"{len(series)} linhas por região e janela")
+
+    run_id = args.run_id or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+    if args.database_url:
+        # Importado aqui porque o SQLAlchemy só é necessário com banco de destino
+        from src.sink import sink_tables
+
+        print(f"\nGravando as listas no banco (execução {run_id})...")
+        with instrument_stage("sink", args.metrics_file, profile=args.profile) as stage:
+            rows = sink_tables({"table1": table1, "table2": table2}, run_id, args.database_url)
+            stage["rows_in"] = stage["rows_out"] = sum(rows.values())
+
+    # Marca a execução como concluída, invalidando o cache do serviço de
+    # consulta (ver `src.report_service`)
+    publish_run(output_dir, metrics, run_id)
 
     print("\n=== Pipeline concluido ===")
 
@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from src.aggregates import (
+    latest_sales_partial,
+    merge_region_partials,
+    region_partial,
+    table1_from_regions,
+    table2_from_latest,
+)
+from src.lazy import lazy_import
+from src.topk import top_k_positions
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# DataFrame compartilhado com os processos do pool e partição de endereço de
+# cada linha (ver `_init_worker`)
+_FRAME = None
+_PARTITIONS = None
+
+
+def _init_worker(df, partitions):
+    """
+    Inicializa um processo do pool com o DataFrame a ser agregado.
+
+    Com o método "fork", o DataFrame e as partições são herdados pelo processo
+    filho sem serem serializados; nos demais métodos eles são enviados uma vez
+    por processo.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpo.
+        partitions (np.ndarray): Partição de endereço de cada linha.
+    """
+    global _FRAME, _PARTITIONS
+    _FRAME = df
+    _PARTITIONS = partitions
+
+
+def _address_partitions(addresses, n_partitions):
+    """
+    Distribui as linhas entre partições pelo hash do endereço.
+
+    Em uma coluna categórica, apenas as categorias são convertidas e
+    hasheadas; cada linha recebe o hash da sua categoria pelo código.
+
+    Args:
+        addresses (pd.Series): Coluna 'receiving_address'.
+        n_partitions (int): Quantidade de partições.
+
+    Returns:
+        np.ndarray: Índice da partição de cada linha.
+    """
+    if isinstance(addresses.dtype, pd.CategoricalDtype):
+        # O código -1 (endereço ausente) seleciona o valor ausente acrescentado
+        categories = np.append(addresses.cat.categories.to_numpy(dtype=object), None)
+        hashes = pd.util.hash_array(categories)[addresses.cat.codes.to_numpy()]
+    else:
+        hashes = pd.util.hash_array(addresses.to_numpy(dtype=object))
+    return (hashes % np.uint64(n_partitions)).astype(np.int64)
+
+
+def _aggregate_partition(partition, k):
+    """
+    Agrega as linhas de uma partição de endereços.
+
+    Cada endereço pertence a uma única partição, então a última venda de cada
+    endereço é exata aqui e basta devolver o top-k local.
+
+    Args:
+        partition (int): Índice da partição.
+        k (int): Quantidade de transações da Tabela 2.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Parcial de região da partição e as
+        `k` maiores vendas recentes da partição.
+    """
+    rows = np.flatnonzero(_PARTITIONS == partition)
+    part = _FRAME.iloc[rows]
+    latest = latest_sales_partial(part, rows)
+    top = top_k_positions(latest['amount'].to_numpy(), k, latest['receiving_address'])
+    return region_partial(part), latest.iloc[top]
+
+
+def compute_tables_parallel(df, workers=None, k=3):
+    """
+    Calcula as tabelas 1 e 2 em vários processos.
+
+    As linhas são divididas pelo hash de 'receiving_address', uma partição
+    por processo, de modo que cada processo é dono de um conjunto de
+    endereços. Cada processo calcula a soma e a contagem de 'risk_score' por
+    região e a última venda por endereço da sua partição e devolve o parcial
+    de região e o seu top-k local; o processo principal combina os parciais
+    de região e os top-k locais.
+
+    O resultado é o mesmo de `compute_table1` e `compute_table2`, a menos do
+    arredondamento de ponto flutuante na soma das médias.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpo.
+        workers (int, optional): Quantidade de processos. Usa o número de
+            CPUs quando omitido.
+        k (int): Quantidade de transações da Tabela 2.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: Tabela 1 e Tabela 2.
+    """
+    workers = workers or os.cpu_count() or 1
+    partitions = _address_partitions(df['receiving_address'], workers)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(df, partitions),
+    ) as pool:
+        mapped = list(pool.map(_aggregate_partition, range(workers), [k] * workers))
+
+    table1 = table1_from_regions(merge_region_partials([regions for regions, _ in mapped]))
+    table2 = table2_from_latest(pd.concat([top for _, top in mapped], ignore_index=True), k)
+    return table1, table2
@@ -0,0 +1,303 @@
+import os
+import re
+import shutil
+
+from src.columnar import (
+    MANIFEST_FILE,
+    append_table,
+    iter_table_parts,
+    move_parts,
+    read_table,
+    table_columns,
+)
+from src.ingestion import concat_frames
+from src.lazy import lazy_import
+from src.schema import TIMESTAMP_COLUMN
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Granularidades de partição: chave dos diretórios no estilo Hive e unidade
+# do NumPy. Cada partição ('date=2024-01-31' ou 'month=2024-01') é uma tabela
+# colunar com as linhas daquele período (UTC) do 'timestamp'
+GRANULARITIES = {
+    "day": ("date", "D"),
+    "month": ("month", "M"),
+}
+
+# Mês por partição: com poucos registros por dia, partições diárias gerariam
+# milhares de arquivos pequenos para cada bloco gravado
+DEFAULT_GRANULARITY = "month"
+
+_PARTITION_PATTERN = re.compile(r"^(date|month)=(\d{4}-\d{2}(?:-\d{2})?)$")
+_UNITS = {key: unit for key, unit in GRANULARITIES.values()}
+
+
+def parse_time(value):
+    """
+    Converte um limite de janela em segundos desde a época.
+
+    Args:
+        value (int | str | None): Segundos desde a época, ou data/hora em
+            texto (ex.: '2024-01-31' ou '2024-01-31T12:00:00Z'; sem fuso, UTC).
+
+    Returns:
+        int | None: Segundos desde a época, ou None se `value` for None.
+
+    Raises:
+        ValueError: Se o texto não for uma data/hora válida.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)) or str(value).lstrip('-').isdigit():
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int(timestamp.timestamp())
+
+
+def window_mask(timestamps, start=None, end=None):
+    """
+    Indica os timestamps dentro da janela [start, end).
+
+    Args:
+        timestamps (array-like): Segundos desde a época.
+        start (int, optional): Início da janela (inclusivo). Sem limite, se None.
+        end (int, optional): Fim da janela (exclusivo). Sem limite, se None.
+
+    Returns:
+        np.ndarray: Máscara booleana.
+    """
+    timestamps = np.asarray(timestamps)
+    mask = np.ones(len(timestamps), dtype=bool)
+    if start is not None:
+        mask &= timestamps >= start
+    if end is not None:
+        mask &= timestamps < end
+    return mask
+
+
+def filter_window(df, start=None, end=None):
+    """
+    Mantém apenas as linhas de um DataFrame limpo dentro da janela [start, end).
+
+    Args:
+        df (pd.DataFrame): DataFrame limpo, com 'timestamp' em segundos.
+        start (int, optional): Início da janela (inclusivo).
+        end (int, optional): Fim da janela (exclusivo).
+
+    Returns:
+        pd.DataFrame: O próprio DataFrame, se a janela não tiver limites, ou
+        as linhas selecionadas.
+    """
+    if start is None and end is None:
+        return df
+    return df[window_mask(df[TIMESTAMP_COLUMN].to_numpy(), start, end)]
+
+
+def _periods(timestamps, unit):
+    """Converte segundos desde a época em períodos (dias ou meses) desde a época."""
+    return np.asarray(timestamps, dtype='datetime64[s]').astype(f'datetime64[{unit}]')
+
+
+def _period_bounds(period):
+    """Retorna o início e o fim (exclusivo) de um período, em segundos."""
+    bounds = np.array([period, period + 1]).astype('datetime64[s]').astype(np.int64)
+    return int(bounds[0]), int(bounds[1])
+
+
+def _compact_categories(values):
+    """
+    Mantém apenas as categorias usadas por uma seleção de uma coluna categórica.
+
+    Equivale a `remove_unused_categories`, mas com custo proporcional às
+    linhas selecionadas e não à quantidade de categorias do bloco.
+    """
+    used, codes = np.unique(values.codes, return_inverse=True)
+    if len(used) and used[0] == -1:
+        used, codes = used[1:], codes - 1
+    return pd.Categorical.from_codes(codes, categories=values.categories.take(used))
+
+
+def append_partitioned(df, path, granularity=DEFAULT_GRANULARITY):
+    """
+    Acrescenta um DataFrame limpo à tabela particionada por data.
+
+    As linhas de cada período (UTC) são anexadas à tabela colunar da partição
+    correspondente (ver `src.columnar.append_table`), na ordem em que aparecem.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpo, com 'timestamp' em int64.
+        path (str): Diretório raiz da tabela particionada.
+        granularity (str): "day" ou "month" (ver `GRANULARITIES`).
+
+    Returns:
+        list[str]: Partições que receberam linhas.
+
+    Raises:
+        ValueError: Se a granularidade for desconhecida.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularidade de partição inválida: {granularity}")
+    key, unit = GRANULARITIES[granularity]
+    periods = _periods(df[TIMESTAMP_COLUMN].to_numpy(), unit)
+    order = np.argsort(periods, kind='stable')
+    unique_periods, starts = np.unique(periods[order], return_index=True)
+    bounds = np.append(starts, len(order))
+    categorical = [
+        name for name in df.columns if isinstance(df[name].dtype, pd.CategoricalDtype)
+    ]
+
+    written = []
+    for i, period in enumerate(unique_periods):
+        rows = order[bounds[i]:bounds[i + 1]]
+        part = df.iloc[rows].reset_index(drop=True)
+        for name in categorical:
+            part[name] = _compact_categories(part[name].array)
+        name = f"{key}={period}"
+        append_table(part, os.path.join(path, name))
+        written.append(name)
+    return written
+
+
+def move_partitioned(source, path):
+    """
+    Acrescenta as linhas de uma tabela particionada às partições de outra.
+
+    As partes de cada partição da origem são transferidas para a partição de
+    mesmo nome do destino (ver `src.columnar.move_parts`), depois das que já
+    estão lá, sem regravar os dados. Combina as saídas limpas de vários
+    shards na ordem da entrada.
+
+    Args:
+        source (str): Diretório raiz da tabela de origem (removido).
+        path (str): Diretório raiz da tabela de destino.
+
+    Returns:
+        list[str]: Partições que receberam linhas.
+    """
+    os.makedirs(path, exist_ok=True)
+    moved = []
+    for partition in list_partitions(source):
+        name = os.path.basename(partition)
+        move_parts(partition, os.path.join(path, name))
+        moved.append(name)
+    shutil.rmtree(source)
+    return moved
+
+
+def list_partitions(path, start=None, end=None):
+    """
+    Lista as partições que se sobrepõem à janela [start, end), sem ler dados.
+
+    Uma tabela colunar sem partições (ver `src.columnar`) é tratada como uma
+    única partição, sempre lida.
+
+    Args:
+        path (str): Diretório raiz da tabela particionada.
+        start (int, optional): Início da janela (inclusivo), em segundos.
+        end (int, optional): Fim da janela (exclusivo), em segundos.
+
+    Returns:
+        list[str]: Diretórios das partições, em ordem de data.
+
+    Raises:
+        FileNotFoundError: Se a tabela não existir.
+    """
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return [path]
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Tabela particionada não encontrada: {path}")
+    selected = []
+    for name in sorted(os.listdir(path)):
+        match = _PARTITION_PATTERN.match(name)
+        if match is None or not os.path.exists(os.path.join(path, name, MANIFEST_FILE)):
+            continue
+        key, value = match.groups()
+        period_start, period_end = _period_bounds(np.datetime64(value, _UNITS[key]))
+        if start is not None and period_end <= start:
+            continue
+        if end is not None and period_start >= end:
+            continue
+        selected.append(os.path.join(path, name))
+    return selected
+
+
+def partitioned_columns(path):
+    """
+    Lista as colunas de uma tabela particionada sem ler os dados.
+
+    Args:
+        path (str): Diretório raiz da tabela particionada.
+
+    Returns:
+        list[str]: Nomes das colunas (vazia se não houver partições).
+    """
+    partitions = list_partitions(path)
+    return table_columns(partitions[0]) if partitions else []
+
+
+def _with_timestamp(columns, start, end):
+    """Colunas a ler, acrescentando 'timestamp' se a janela tiver limites."""
+    if columns is None or (start is None and end is None) or TIMESTAMP_COLUMN in columns:
+        return columns
+    return list(columns) + [TIMESTAMP_COLUMN]
+
+
+def iter_partitioned(path, columns=None, start=None, end=None):
+    """
+    Percorre as partes das partições na janela [start, end), em ordem de data.
+
+    Partições fora da janela não são abertas; nas partições das bordas, as
+    linhas fora da janela são descartadas.
+
+    Args:
+        path (str): Diretório raiz da tabela particionada.
+        columns (list[str], optional): Colunas a carregar. Todas, se omitido.
+        start (int, optional): Início da janela (inclusivo), em segundos.
+        end (int, optional): Fim da janela (exclusivo), em segundos.
+
+    Yields:
+        pd.DataFrame: Linhas de uma parte, com as colunas pedidas.
+    """
+    read_columns = _with_timestamp(columns, start, end)
+    for partition in list_partitions(path, start, end):
+        for part in iter_table_parts(partition, read_columns):
+            part = filter_window(part, start, end)
+            yield part if read_columns is columns else part[columns]
+
+
+def read_partitioned(path, columns=None, start=None, end=None):
+    """
+    Lê as linhas da tabela particionada dentro da janela [start, end).
+
+    Apenas as partições que se sobrepõem à janela são lidas. As linhas
+    voltam em ordem de data e, em cada partição, na ordem de gravação.
+
+    Example:
+        recent = read_partitioned(
+            "data/cleaned_data", ["amount", "timestamp"], start=parse_time("2024-01-01")
+        )
+
+    Args:
+        path (str): Diretório raiz da tabela particionada.
+        columns (list[str], optional): Colunas a carregar. Todas, se omitido.
+        start (int, optional): Início da janela (inclusivo), em segundos.
+        end (int, optional): Fim da janela (exclusivo), em segundos.
+
+    Returns:
+        pd.DataFrame: Linhas da janela, com índice 0..n-1.
+
+    Raises:
+        FileNotFoundError: Se a tabela não existir.
+    """
+    read_columns = _with_timestamp(columns, start, end)
+    frames = [
+        filter_window(read_table(partition, read_columns, mmap=False), start, end)
+        for partition in list_partitions(path, start, end)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    df = concat_frames(frames)
+    return df if read_columns is columns else df[columns]
@@ -0,0 +1,201 @@
+"""
+Execução em pipeline: leitura, limpeza, agregação e gravação sobrepostas.
+
+Cada etapa roda em uma thread e passa os blocos à seguinte por uma fila
+limitada. Enquanto o bloco N é agregado, o bloco N+1 já está sendo limpo e o
+N+2 interpretado do CSV, e a gravação da saída limpa não bloqueia as demais
+etapas. A interpretação do CSV e as operações do NumPy liberam o GIL na
+maior parte do tempo, então as etapas avançam de fato em paralelo.
+
+Uma etapa mais lenta que as anteriores enche a sua fila de entrada, o que
+bloqueia as anteriores (contrapressão): a memória fica limitada a cerca de
+`queue_size` blocos por etapa, independentemente do tamanho da entrada.
+"""
+import os
+import queue
+import shutil
+import threading
+
+from src.engines import DEFAULT_ENGINE, get_engine
+from src.fused import add_chunk, aggregate_chunks, tables_from_partial
+from src.lazy import lazy_import, load_now
+from src.main import DEFAULT_CHUNKSIZE, load_data_in_chunks
+from src.partitioned import append_partitioned
+from src.quality import evaluate_rules
+from src.schema import PIPELINE_COLUMNS, apply_schema
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Blocos aguardando em cada fila entre duas etapas
+DEFAULT_QUEUE_SIZE = 2
+
+# Intervalo, em segundos, em que uma etapa bloqueada verifica o cancelamento
+_POLL_TIMEOUT = 0.1
+
+# Marca o fim dos itens de uma fila
+_END = object()
+
+
+def _put(output, item, cancelled):
+    """
+    Coloca um item na fila, esperando enquanto ela estiver cheia.
+
+    Returns:
+        bool: False se o pipeline foi cancelado antes de haver espaço.
+    """
+    while not cancelled.is_set():
+        try:
+            output.put(item, timeout=_POLL_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _drain(source, cancelled):
+    """
+    Lê os itens de uma fila até o fim, repassando os erros da etapa anterior.
+
+    Yields:
+        object: Itens da fila, na ordem em que foram colocados.
+    """
+    while not cancelled.is_set():
+        try:
+            item = source.get(timeout=_POLL_TIMEOUT)
+        except queue.Empty:
+            continue
+        if item is _END:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def _run_stage(function, items, output, cancelled):
+    """
+    Aplica `function` a cada item e coloca o resultado na fila `output`
+    (executado em thread). Um erro é colocado na fila no lugar do resultado.
+    """
+    try:
+        for item in items:
+            if not _put(output, item if function is None else function(item), cancelled):
+                return
+    except BaseException as error:
+        _put(output, error, cancelled)
+        return
+    finally:
+        close = getattr(items, 'close', None)
+        if close is not None:
+            close()
+    _put(output, _END, cancelled)
+
+
+def iter_pipelined(source, stages, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Encadeia etapas em threads ligadas por filas limitadas.
+
+    A iteração de `source` roda em uma thread própria, e cada função de
+    `stages` em outra, recebendo os resultados da anterior na ordem. Um erro
+    em qualquer etapa é relançado para o consumidor; se o consumidor para
+    antes do fim, as etapas são canceladas.
+
+    Example:
+        for table in iter_pipelined(read_chunks(path), [clean, aggregate]):
+            ...
+
+    Args:
+        source (iterable): Itens de entrada (ex.: blocos lidos do CSV).
+        stages (list[callable]): Funções aplicadas em sequência a cada item.
+        queue_size (int): Itens aguardando em cada fila; limita a memória.
+
+    Yields:
+        object: Resultado da última etapa para cada item, na ordem de `source`.
+    """
+    if queue_size <= 0:
+        raise ValueError(f"queue_size deve ser positivo: {queue_size}")
+    cancelled = threading.Event()
+    threads = []
+    items = source
+    # As etapas usam Pandas e NumPy: carregados aqui, e não pelas threads
+    # (ver `src.lazy.load_now`)
+    load_now(pd, np)
+    try:
+        for function in [None] + list(stages):
+            output = queue.Queue(maxsize=queue_size)
+            thread = threading.Thread(
+                target=_run_stage, args=(function, items, output, cancelled), daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+            items = _drain(output, cancelled)
+        yield from items
+    finally:
+        cancelled.set()
+        for thread in threads:
+            thread.join()
+
+
+def run_pipelined(
+    input_path,
+    output_path=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    k=3,
+    window=None,
+    queue_size=DEFAULT_QUEUE_SIZE,
+    engine=DEFAULT_ENGINE,
+    columns=PIPELINE_COLUMNS,
+):
+    """
+    Limpa a entrada, grava a saída limpa e calcula as tabelas 1 e 2 em
+    pipeline, com leitura, limpeza, agregação e gravação sobrepostas.
+
+    O resultado é o mesmo da limpeza em blocos seguida de `compute_table1`,
+    `compute_table2` e das métricas (ver `src.main.run_batch`); a saída limpa
+    é a mesma de `src.main.clean_data_streaming` no formato particionado. As
+    tabelas são agregadas bloco a bloco (ver `src.fused.add_chunk`), sem
+    reler a saída limpa.
+
+    Args:
+        input_path (str): Arquivo CSV de entrada ou padrão glob.
+        output_path (str, optional): Diretório da tabela limpa, particionada
+            por data (ver `src.partitioned`). Sem gravação, se None.
+        chunksize (int): Quantidade máxima de linhas lidas por bloco.
+        k (int): Quantidade de transações da Tabela 2.
+        window (tuple[int, int], optional): Janela [início, fim) de
+            'timestamp', em segundos, considerada nas tabelas.
+        queue_size (int): Blocos aguardando entre duas etapas.
+        engine (str): Motor de cálculo que seleciona as linhas válidas (ver
+            `src.engines`).
+        columns (list[str]): Colunas lidas.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, dict]: Tabela 1, Tabela 2 e métricas,
+        incluindo as linhas rejeitadas por regra ('rejections').
+    """
+    engine = get_engine(engine)
+    partial = aggregate_chunks([])
+    if output_path is not None:
+        shutil.rmtree(output_path, ignore_errors=True)
+        os.makedirs(output_path)
+
+    def clean(chunk):
+        chunk = apply_schema(chunk)
+        valid, _, counts = evaluate_rules(chunk)
+        cleaned = None if output_path is None else engine.select_rows(chunk, valid)
+        return chunk, valid, counts, cleaned
+
+    def aggregate(item):
+        chunk, valid, counts, cleaned = item
+        add_chunk(partial, chunk, valid, counts, window=window, columns=columns)
+        return cleaned
+
+    def write(cleaned):
+        append_partitioned(cleaned, output_path)
+
+    stages = [clean, aggregate] if output_path is None else [clean, aggregate, write]
+    chunks = load_data_in_chunks(input_path, chunksize, columns)
+    for _ in iter_pipelined(chunks, stages, queue_size):
+        pass
+    table1, table2, metrics, _ = tables_from_partial(partial, k, input_path)
+    return table1, table2, metrics
@@ -0,0 +1,167 @@
+from src.lazy import lazy_import
+from src.validation import is_valid_region, validate_by_value
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Coluna da quarentena com as regras violadas por cada linha rejeitada
+REJECTED_BY_COLUMN = 'rejected_by'
+
+# Separador dos nomes das regras em `REJECTED_BY_COLUMN`
+_RULE_SEPARATOR = ';'
+
+# Regras de qualidade dos dados, declaradas uma única vez. Cada regra tem um
+# nome, a coluna verificada e o tipo de verificação (ver `CHECKS`), além dos
+# parâmetros do tipo. Regras de colunas ausentes no bloco são ignoradas. As
+# regras são avaliadas sobre os dados já convertidos por
+# `src.schema.apply_schema`, em que valores não numéricos viram NaN.
+# `RULES` é o conjunto aplicado por padrão e reproduz o filtro original da
+# limpeza: 'risk_score', 'amount' e 'timestamp' presentes e
+# 'location_region' no padrão
+RULES = [
+    {'name': 'risk_score_numeric', 'column': 'risk_score', 'check': 'not_null'},
+    {'name': 'amount_numeric', 'column': 'amount', 'check': 'not_null'},
+    {'name': 'timestamp_valid', 'column': 'timestamp', 'check': 'not_null'},
+    {
+        'name': 'location_region_pattern',
+        'column': 'location_region',
+        'check': 'per_value',
+        'predicate': is_valid_region,
+    },
+]
+
+# Regras de faixa opcionais: rejeitam linhas que o filtro padrão mantém, por
+# isso só valem quando passadas explicitamente (ver `STRICT_RULES`)
+RANGE_RULES = [
+    {'name': 'risk_score_range', 'column': 'risk_score', 'check': 'range', 'min': 0, 'max': 100},
+    {'name': 'amount_range', 'column': 'amount', 'check': 'range', 'min': 0},
+]
+
+# Regras padrão acrescidas das regras de faixa
+STRICT_RULES = RULES + RANGE_RULES
+
+
+def _check_not_null(values, rule):
+    """Aceita os valores presentes (não nulos)."""
+    return values.notna().to_numpy()
+
+
+def _check_range(values, rule):
+    """
+    Aceita os valores dentro de [min, max]; os limites ausentes são abertos.
+
+    Valores nulos passam nesta verificação: eles são responsabilidade de uma
+    regra 'not_null', de modo que cada linha é contada apenas pela causa real.
+    """
+    array = values.to_numpy()
+    valid = np.ones(len(array), dtype=bool)
+    if rule.get('min') is not None:
+        valid &= ~(array < rule['min'])
+    if rule.get('max') is not None:
+        valid &= ~(array > rule['max'])
+    return valid
+
+
+def _check_per_value(values, rule):
+    """Aplica o predicado da regra uma vez por valor distinto."""
+    return validate_by_value(values, rule['predicate'])
+
+
+def _check_allowed(values, rule):
+    """Aceita apenas os valores listados em 'values'."""
+    return validate_by_value(values, frozenset(rule['values']).__contains__)
+
+
+# Tipos de verificação: recebem a coluna e a regra e retornam a máscara das
+# linhas aceitas
+CHECKS = {
+    'not_null': _check_not_null,
+    'range': _check_range,
+    'per_value': _check_per_value,
+    'allowed': _check_allowed,
+}
+
+
+def evaluate_rules(df, rules=RULES):
+    """
+    Avalia todas as regras sobre um bloco, em uma passagem vetorizada.
+
+    Cada regra gera uma máscara NumPy; as máscaras são combinadas na máscara
+    das linhas válidas e em um vetor de bits com as regras violadas por
+    linha (o bit `i` corresponde a `rules[i]`), usado pela quarentena.
+
+    Args:
+        df (pd.DataFrame): Dados com os tipos de `src.schema`.
+        rules (list[dict]): Regras a avaliar (até 32).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, dict]: Máscara das linhas válidas, bits
+        das regras violadas por linha e linhas rejeitadas por regra. Uma linha
+        que viola várias regras é contada em cada uma delas.
+
+    Raises:
+        ValueError: Se houver mais de 32 regras ou se uma regra usar um tipo
+            de verificação desconhecido.
+    """
+    if len(rules) > 32:
+        raise ValueError(f"No máximo 32 regras são suportadas: {len(rules)}")
+    valid = np.ones(len(df), dtype=bool)
+    failures = np.zeros(len(df), dtype=np.uint32)
+    counts = {}
+    for bit, rule in enumerate(rules):
+        if rule['column'] not in df.columns:
+            continue
+        if rule['check'] not in CHECKS:
+            raise ValueError(f"Verificação desconhecida na regra {rule['name']}: {rule['check']}")
+        passed = CHECKS[rule['check']](df[rule['column']], rule)
+        counts[rule['name']] = len(passed) - int(np.count_nonzero(passed))
+        if counts[rule['name']]:
+            valid &= passed
+            np.bitwise_or(failures, np.uint32(1 << bit), out=failures, where=~passed)
+    return valid, failures, counts
+
+
+def add_counts(total, counts):
+    """
+    Soma contagens de rejeição por regra em `total` (modificado).
+
+    Args:
+        total (dict): Contagens acumuladas.
+        counts (dict): Contagens a somar.
+
+    Returns:
+        dict: O próprio `total`.
+    """
+    for name, count in counts.items():
+        total[name] = total.get(name, 0) + count
+    return total
+
+
+def quarantine_rows(df, valid, failures, rules=RULES):
+    """
+    Seleciona as linhas rejeitadas, identificando as regras violadas.
+
+    Os valores seguem os tipos de `src.schema`: valores que não puderam ser
+    convertidos aparecem vazios, e a coluna 'rejected_by' lista as regras
+    violadas separadas por ';'.
+
+    Args:
+        df (pd.DataFrame): Bloco avaliado por `evaluate_rules`.
+        valid (np.ndarray): Máscara das linhas válidas.
+        failures (np.ndarray): Bits das regras violadas por linha.
+        rules (list[dict]): As mesmas regras passadas a `evaluate_rules`.
+
+    Returns:
+        pd.DataFrame: Linhas rejeitadas e a coluna 'rejected_by'.
+    """
+    rejected = df[~valid].copy()
+    # Os nomes são montados uma vez por combinação distinta de regras
+    codes, combinations = pd.factorize(failures[~valid])
+    labels = [
+        _RULE_SEPARATOR.join(
+            rule['name'] for bit, rule in enumerate(rules) if int(combination) >> bit & 1
+        )
+        for combination in combinations
+    ]
+    rejected[REJECTED_BY_COLUMN] = pd.Categorical.from_codes(codes, categories=labels)
+    return rejected
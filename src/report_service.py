@@ -0,0 +1,335 @@
+"""
+Serviço local de consulta aos resultados do pipeline.
+
+Mantém em memória as Tabelas 1 e 2 e as métricas da última execução
+concluída. Cada execução publica um marcador (ver `publish_run`); as
+consultas só comparam a data de modificação do marcador e recarregam os
+resultados quando ele muda, de modo que painéis que consultam o serviço
+repetidamente não provocam novas leituras do disco.
+
+Uso:
+    python -m src.report_service --results-dir data/output --port 8050
+
+    curl 'http://127.0.0.1:8050/table1?limit=5&offset=0'
+    curl 'http://127.0.0.1:8050/metrics'
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlparse
+
+from src.columnar import MANIFEST_FILE, read_table
+from src.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Marcador gravado ao final de cada execução, com o id e as métricas
+RUN_MARKER_FILE = "_run.json"
+
+# Tabelas servidas
+TABLES = ("table1", "table2")
+
+# Linhas retornadas por página quando `limit` não é informado
+DEFAULT_PAGE_SIZE = 100
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8050
+
+
+def publish_run(results_dir, metrics, run_id=None):
+    """
+    Publica o marcador de uma execução concluída, invalidando o cache do serviço.
+
+    Deve ser chamado depois que as tabelas da execução foram gravadas. O
+    marcador é gravado em um arquivo temporário e renomeado, de modo que o
+    serviço nunca lê um marcador incompleto.
+
+    Args:
+        results_dir (str): Diretório com as tabelas da execução.
+        metrics (dict): Métricas da execução (limpeza e qualidade).
+        run_id (str, optional): Identificador da execução. Usa a data e hora
+            de conclusão, se omitido.
+
+    Returns:
+        str: Caminho do marcador.
+    """
+    completed_at = datetime.now(timezone.utc)
+    marker = {
+        "run_id": run_id or completed_at.strftime('%Y%m%dT%H%M%S'),
+        "completed_at": completed_at.isoformat(),
+        "metrics": metrics,
+    }
+    path = os.path.join(results_dir, RUN_MARKER_FILE)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(marker, f, default=str)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def read_result_table(results_dir, name):
+    """
+    Lê uma tabela de resultados, preferindo o formato colunar ao CSV.
+
+    Args:
+        results_dir (str): Diretório dos resultados.
+        name (str): Nome da tabela ('table1' ou 'table2').
+
+    Returns:
+        pd.DataFrame: Tabela lida.
+
+    Raises:
+        FileNotFoundError: Se a tabela não existir em nenhum dos formatos.
+    """
+    path = os.path.join(results_dir, name)
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return read_table(path, mmap=False)
+    if os.path.exists(f"{path}.csv"):
+        return pd.read_csv(f"{path}.csv")
+    raise FileNotFoundError(f"Tabela não encontrada: {path}")
+
+
+def _check_page(name, limit, offset):
+    """Valida a tabela e os parâmetros de paginação de uma consulta."""
+    if name not in TABLES:
+        raise KeyError(f"Tabela desconhecida: {name}")
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError(f"limit e offset devem ser não negativos: {limit}, {offset}")
+
+
+class ReportService:
+    """
+    Cache em memória dos resultados da última execução, com paginação.
+
+    Seguro para uso por várias threads (ex.: o servidor HTTP de `make_server`).
+
+    Args:
+        results_dir (str): Diretório com as tabelas e o marcador de execução.
+    """
+
+    def __init__(self, results_dir):
+        self.results_dir = results_dir
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._version = None
+        # Marcador e tabelas da mesma execução, substituídos juntos
+        self._snapshot = None
+
+    def _marker_version(self):
+        """Identifica o marcador atual (inode, data de modificação e tamanho)."""
+        try:
+            stat = os.stat(os.path.join(self.results_dir, RUN_MARKER_FILE))
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"Nenhuma execução concluída em {self.results_dir}"
+            ) from None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """
+        Recarrega os resultados se uma nova execução foi concluída.
+
+        Returns:
+            tuple[dict, dict]: Marcador e tabelas da última execução.
+
+        Raises:
+            FileNotFoundError: Se nenhuma execução foi publicada.
+        """
+        with self._lock:
+            version = self._marker_version()
+            if version != self._version:
+                with open(os.path.join(self.results_dir, RUN_MARKER_FILE)) as f:
+                    marker = json.load(f)
+                tables = {name: read_result_table(self.results_dir, name) for name in TABLES}
+                self._snapshot = marker, tables
+                self._version = version
+                self.loads += 1
+                logging.info(f"Resultados da execução {marker['run_id']} carregados.")
+            return self._snapshot
+
+    def run(self):
+        """
+        Retorna o marcador da última execução.
+
+        Returns:
+            dict: 'run_id', 'completed_at' e 'metrics'.
+        """
+        marker, _ = self.refresh()
+        return marker
+
+    def metrics(self):
+        """
+        Retorna as métricas da última execução.
+
+        Returns:
+            dict: Métricas publicadas por `publish_run`.
+        """
+        return self.run()["metrics"]
+
+    def table(self, name, limit=None, offset=0):
+        """
+        Retorna uma página de uma tabela (as tabelas já estão ordenadas, então
+        `limit=n` equivale ao top-N).
+
+        Args:
+            name (str): 'table1' ou 'table2'.
+            limit (int, optional): Linhas da página. Todas, se None.
+            offset (int): Linhas a pular.
+
+        Returns:
+            pd.DataFrame: Linhas pedidas.
+
+        Raises:
+            KeyError: Se a tabela não existir.
+            ValueError: Se `limit` ou `offset` forem negativos.
+        """
+        _check_page(name, limit, offset)
+        _, tables = self.refresh()
+        stop = None if limit is None else offset + limit
+        return tables[name].iloc[offset:stop]
+
+    def page(self, name, limit=DEFAULT_PAGE_SIZE, offset=0):
+        """
+        Retorna uma página de uma tabela em formato serializável (JSON).
+
+        Args:
+            name (str): 'table1' ou 'table2'.
+            limit (int): Linhas da página.
+            offset (int): Linhas a pular.
+
+        Returns:
+            dict: 'run_id', 'total', 'offset', 'limit' e 'rows' (uma lista de
+            dicionários).
+
+        Raises:
+            KeyError: Se a tabela não existir.
+            ValueError: Se `limit` ou `offset` forem negativos.
+        """
+        _check_page(name, limit, offset)
+        marker, tables = self.refresh()
+        rows = tables[name].iloc[offset:offset + limit]
+        return {
+            "run_id": marker["run_id"],
+            "total": len(tables[name]),
+            "offset": offset,
+            "limit": limit,
+            "rows": json.loads(rows.to_json(orient="records")),
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_service(results_dir):
+    """
+    Retorna o serviço do diretório, compartilhado pelo processo.
+
+    Args:
+        results_dir (str): Diretório dos resultados.
+
+    Returns:
+        ReportService: Serviço com cache em memória.
+    """
+    return ReportService(results_dir)
+
+
+def _int_param(query, name, default):
+    """Lê um parâmetro inteiro da query string."""
+    values = query.get(name)
+    return int(values[0]) if values else default
+
+
+def make_handler(service):
+    """
+    Cria a classe de tratamento das requisições HTTP para o serviço.
+
+    Rotas (apenas GET): '/run', '/metrics', '/table1' e '/table2', estas com
+    os parâmetros 'limit' e 'offset'.
+
+    Args:
+        service (ReportService): Serviço consultado.
+
+    Returns:
+        type: Subclasse de `BaseHTTPRequestHandler`.
+    """
+    # Importado aqui: `publish_run` é usado pelo pipeline e pelo DAG, que não
+    # precisam do servidor HTTP
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            name = url.path.strip('/')
+            query = parse_qs(url.query)
+            try:
+                if name == "run":
+                    body = service.run()
+                elif name == "metrics":
+                    body = service.metrics()
+                elif name in TABLES:
+                    limit = _int_param(query, "limit", DEFAULT_PAGE_SIZE)
+                    offset = _int_param(query, "offset", 0)
+                    body = service.page(name, limit, offset)
+                else:
+                    self._send(HTTPStatus.NOT_FOUND, {"error": f"Rota desconhecida: {url.path}"})
+                    return
+            except ValueError as error:
+                self._send(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+                return
+            except FileNotFoundError as error:
+                self._send(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(error)})
+                return
+            self._send(HTTPStatus.OK, body)
+
+        def _send(self, status, body):
+            payload = json.dumps(body, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logging.debug(format % args)
+
+    return Handler
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Cria o servidor HTTP do serviço (uma thread por requisição).
+
+    Args:
+        service (ReportService): Serviço consultado.
+        host (str): Endereço de escuta; por padrão, apenas a máquina local.
+        port (int): Porta (0 = escolhida pelo sistema).
+
+    Returns:
+        ThreadingHTTPServer: Servidor ainda não iniciado.
+    """
+    from http.server import ThreadingHTTPServer
+
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço de consulta aos resultados do pipeline")
+    parser.add_argument("--results-dir", default="data/output", help="Diretório dos resultados")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    server = make_server(get_service(args.results_dir), args.host, args.port)
+    print(f"Servindo {args.results_dir} em http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
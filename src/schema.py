@@ -0,0 +1,135 @@
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Colunas de texto armazenadas como categóricas: poucas categorias distintas
+# (região, tipo) ou valores muito repetidos (endereços), que viram códigos
+# inteiros em vez de objetos Python
+CATEGORICAL_COLUMNS = [
+    'location_region',
+    'transaction_type',
+    'sending_address',
+    'receiving_address',
+]
+
+# Colunas numéricas e o dtype final após a conversão. 'risk_score' é uma
+# pontuação de 0 a 100 e cabe em float32; 'amount' é valor monetário e
+# permanece em float64
+NUMERIC_COLUMNS = {
+    'risk_score': 'float32',
+    'amount': 'float64',
+}
+
+# Coluna de data/hora, convertida para segundos desde a época (int64)
+TIMESTAMP_COLUMN = 'timestamp'
+
+# Colunas usadas pelo pipeline (limpeza e tabelas 1 e 2)
+PIPELINE_COLUMNS = [
+    'location_region',
+    'risk_score',
+    'transaction_type',
+    'receiving_address',
+    'amount',
+    'timestamp',
+]
+
+
+def read_csv_options(columns=PIPELINE_COLUMNS):
+    """
+    Monta os argumentos de `pd.read_csv` para o conjunto de transações.
+
+    Apenas as colunas pedidas são lidas e as colunas de texto já são
+    interpretadas como categóricas. As colunas numéricas não recebem dtype na
+    leitura, pois podem conter valores inválidos que a limpeza descarta.
+
+    Args:
+        columns (list[str], optional): Colunas a ler. Colunas ausentes no
+            arquivo são ignoradas. Todas as colunas, se None.
+
+    Returns:
+        dict: Argumentos `usecols` e `dtype` para `pd.read_csv`.
+    """
+    categorical = [name for name in CATEGORICAL_COLUMNS if columns is None or name in columns]
+    options = {'dtype': {name: 'category' for name in categorical}}
+    if columns is not None:
+        wanted = set(columns)
+        options['usecols'] = lambda name: name in wanted
+    return options
+
+
+def _datetime_to_seconds(values):
+    """
+    Converte uma coluna datetime (com ou sem fuso) em segundos desde a época.
+
+    Args:
+        values (pd.Series): Coluna datetime; NaT vira NaN.
+
+    Returns:
+        pd.Series: Segundos desde a época, em float64.
+    """
+    epoch = pd.Timestamp(0, tz='UTC') if values.dt.tz is not None else pd.Timestamp(0)
+    return ((values - epoch) // pd.Timedelta(seconds=1)).astype('float64')
+
+
+def to_epoch_seconds(values):
+    """
+    Converte timestamps em segundos desde a época.
+
+    Aceita números (já em segundos) ou texto de data/hora. Valores que não
+    podem ser interpretados viram NaN.
+
+    Args:
+        values (pd.Series): Coluna de timestamps.
+
+    Returns:
+        pd.Series: Segundos desde a época, em float64 (NaN para inválidos).
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return _datetime_to_seconds(values)
+    numeric = pd.to_numeric(values, errors='coerce').astype('float64')
+    unparsed = numeric.isna() & values.notna()
+    if unparsed.any():
+        parsed = pd.to_datetime(values[unparsed], errors='coerce', utc=True)
+        numeric[unparsed] = _datetime_to_seconds(parsed)
+    return numeric
+
+
+def apply_schema(df):
+    """
+    Converte as colunas presentes no DataFrame para os tipos do esquema.
+
+    Colunas numéricas inválidas e timestamps que não podem ser interpretados
+    viram NaN; a limpeza é quem descarta essas linhas. O DataFrame recebido
+    é modificado e retornado.
+
+    Args:
+        df (pd.DataFrame): Dados brutos.
+
+    Returns:
+        pd.DataFrame: O mesmo DataFrame, com os tipos do esquema.
+    """
+    for name, dtype in NUMERIC_COLUMNS.items():
+        if name in df.columns:
+            df[name] = pd.to_numeric(df[name], errors='coerce').astype(dtype)
+    if TIMESTAMP_COLUMN in df.columns:
+        df[TIMESTAMP_COLUMN] = to_epoch_seconds(df[TIMESTAMP_COLUMN])
+    for name in CATEGORICAL_COLUMNS:
+        if name in df.columns and not isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = df[name].astype('category')
+    return df
+
+
+def finalize_timestamp(df):
+    """
+    Converte o timestamp de um DataFrame limpo (sem NaN) para int64.
+
+    Args:
+        df (pd.DataFrame): DataFrame limpo.
+
+    Returns:
+        pd.DataFrame: DataFrame com 'timestamp' em int64.
+    """
+    if TIMESTAMP_COLUMN not in df.columns or df[TIMESTAMP_COLUMN].dtype == np.int64:
+        return df
+    return df.astype({TIMESTAMP_COLUMN: 'int64'})
@@ -0,0 +1,541 @@
+import contextlib
+import json
+import math
+import os
+import shutil
+
+from src.columnar import read_table, write_table
+from src.dedup import identity_hashes
+from src.engines import DEFAULT_ENGINE, get_engine
+from src.fused import (
+    add_chunk,
+    aggregate_chunks,
+    flush_chunks,
+    merge_partials,
+    tables_from_partial,
+)
+from src.ingestion import (
+    expand_inputs,
+    is_compressed,
+    iter_csv_range,
+    read_header,
+    split_ranges,
+)
+from src.lazy import lazy_import
+from src.main import DEFAULT_CHUNKSIZE, dedup_columns, load_data_in_chunks
+from src.partitioned import append_partitioned, list_partitions, move_partitioned
+from src.quality import add_counts, evaluate_rules, quarantine_rows
+from src.schema import PIPELINE_COLUMNS, TIMESTAMP_COLUMN, apply_schema, read_csv_options
+from src.sketches import SKETCH_COLUMNS, RegionSketches
+from src.windows import RegionWindows
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Arquivo com os contadores do agregado parcial de um shard
+COUNTS_FILE = "counts.json"
+
+_COUNT_NAMES = ('total_records', 'valid_records', 'missing_values', 'rejections')
+
+# Subdiretório com os sketches por região de um shard (ver `src.sketches`)
+SKETCHES_DIR = "sketches"
+
+# Subdiretório com a série de risco por região e janela de um shard (ver
+# `src.windows`)
+RISK_WINDOWS_DIR = "risk_windows"
+
+# Subdiretório com as linhas limpas de um shard, particionadas por data (ver
+# `src.partitioned`), combinadas por `merge_cleaned`
+CLEANED_DIR = "cleaned_data"
+
+# Arquivo CSV com as linhas rejeitadas de um shard (ver
+# `src.quality.quarantine_rows`), combinadas por `merge_quarantine`
+QUARANTINE_FILE = "quarantine.csv"
+
+# Subdiretório com a chave de deduplicação (ver `src.dedup`) e a posição na
+# entrada de cada linha limpa de um shard, além das colunas dos sketches que
+# não estão na saída limpa. É particionado como `CLEANED_DIR`, com as linhas
+# na mesma ordem, de modo que `dedup_shards` filtra as saídas do shard pelas
+# chaves e recalcula o seu parcial sem reler a entrada
+DEDUP_ROWS_DIR = "dedup_rows"
+
+# Colunas de `DEDUP_ROWS_DIR` além das copiadas das linhas limpas
+_KEY_COLUMN = 'key'
+_POSITION_COLUMN = 'position'
+
+# Posições de linha reservadas para cada arquivo de um padrão glob: as linhas
+# do arquivo i ficam em [i * _FILE_POSITIONS, (i + 1) * _FILE_POSITIONS)
+_FILE_POSITIONS = 1 << 40
+
+
+def plan_shards(input_path, n_shards):
+    """
+    Divide a entrada em shards.
+
+    Um padrão glob é expandido (ver `src.ingestion.expand_inputs`) e os
+    shards seguem a ordem dos arquivos. Um CSV sem compressão é dividido em
+    intervalos de bytes alinhados às linhas, com os `n_shards` distribuídos
+    entre os arquivos pelo tamanho; um arquivo comprimido não pode ser lido a
+    partir de um byte qualquer, então é um único shard, lido inteiro
+    (`end` None).
+
+    Args:
+        input_path (str): Arquivo CSV de entrada ou padrão glob; arquivos
+            comprimidos (.gz, .xz, .bz2, .zst, .zip) são aceitos.
+        n_shards (int): Quantidade desejada de shards.
+
+    Returns:
+        list[dict]: Um dicionário por shard, com 'shard', 'path', 'start',
+        'end' e 'offset' (ver `process_shard`).
+
+    Raises:
+        FileNotFoundError: Se nenhum arquivo for encontrado.
+    """
+    if n_shards <= 0:
+        raise ValueError(f"n_shards deve ser positivo: {n_shards}")
+    paths = expand_inputs(input_path)
+    total = sum(os.path.getsize(path) for path in paths if not is_compressed(path))
+    shards = []
+    for i, path in enumerate(paths):
+        if is_compressed(path):
+            ranges = [(0, None)]
+        else:
+            share = math.ceil(n_shards * os.path.getsize(path) / total) if total else 1
+            ranges = split_ranges(path, max(share, 1))
+        for start, end in ranges:
+            shards.append({
+                'shard': len(shards),
+                'path': path,
+                'start': start,
+                'end': end,
+                'offset': i * _FILE_POSITIONS,
+            })
+    return shards
+
+
+def save_partial(partial, path):
+    """
+    Grava um agregado parcial de `src.fused.aggregate_chunks` em um diretório.
+
+    Args:
+        partial (dict): Agregado parcial.
+        path (str): Diretório de destino; um parcial já gravado nele é
+            substituído.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name in ("regions", "latest_sales"):
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    if partial['regions'] is not None:
+        write_table(partial['regions'], os.path.join(path, "regions"))
+        write_table(partial['latest_sales'], os.path.join(path, "latest_sales"))
+    with open(os.path.join(path, COUNTS_FILE), 'w') as f:
+        json.dump({name: partial[name] for name in _COUNT_NAMES}, f)
+
+
+def load_partial(path):
+    """
+    Carrega um agregado parcial gravado por `save_partial`.
+
+    Args:
+        path (str): Diretório do parcial.
+
+    Returns:
+        dict: Agregado parcial.
+    """
+    with open(os.path.join(path, COUNTS_FILE)) as f:
+        partial = json.load(f)
+    partial['regions'] = None
+    partial['latest_sales'] = None
+    if os.path.exists(os.path.join(path, "regions")):
+        partial['regions'] = read_table(os.path.join(path, "regions"), mmap=False)
+        partial['latest_sales'] = read_table(os.path.join(path, "latest_sales"), mmap=False)
+    return partial
+
+
+def process_shard(
+    input_path,
+    start,
+    end,
+    output_path,
+    chunksize=DEFAULT_CHUNKSIZE,
+    sketches=False,
+    risk_window=None,
+    risk_slide=None,
+    engine=DEFAULT_ENGINE,
+    quarantine=False,
+    dedup=None,
+    offset=0,
+):
+    """
+    Limpa um shard, grava suas linhas limpas e o reduz a um agregado parcial
+    (fase de mapeamento).
+
+    Cada bloco é avaliado uma vez pelas regras de `src.quality`: a mesma
+    máscara de linhas válidas seleciona as linhas anexadas à saída limpa do
+    shard (`CLEANED_DIR`, particionada por data) e alimenta o agregado
+    parcial (ver `src.fused.add_chunk`).
+
+    A posição de cada linha, usada nos desempates da Tabela 2, é `offset`
+    somado ao byte de início do shard e à posição da linha no shard: como
+    toda linha ocupa ao menos um byte, a ordem resultante é a mesma das
+    linhas no arquivo. Um shard que é o arquivo inteiro usa a posição da
+    linha no arquivo.
+
+    Args:
+        input_path (str): Arquivo CSV de entrada; comprimido apenas com `end`
+            None.
+        start (int): Início do shard, em bytes.
+        end (int | None): Fim do shard, em bytes; None lê o arquivo inteiro
+            (ver `plan_shards`).
+        output_path (str): Diretório onde o parcial e a saída limpa são
+            gravados (substituído se existir).
+        chunksize (int): Quantidade máxima de linhas lidas por bloco.
+        sketches (bool): Se True, grava também os sketches por região do shard
+            (ver `src.sketches.RegionSketches`), combinados por `merge_sketches`.
+        risk_window (int | str, optional): Largura das janelas da série de
+            risco por região (ver `src.windows.RegionWindows`), gravada também
+            e combinada por `merge_risk_windows`.
+        risk_slide (int | str, optional): Passo das janelas deslizantes.
+        engine (str): Motor de cálculo que seleciona as linhas limpas (ver
+            `src.engines`); a saída é a mesma com todos os motores.
+        quarantine (bool): Se True, grava também as linhas rejeitadas do
+            shard e as regras violadas (`QUARANTINE_FILE`), combinadas por
+            `merge_quarantine`.
+        dedup (src.dedup.DedupIndex, optional): Índice das transações já
+            ingeridas. Linhas válidas já presentes no índice (ou repetidas no
+            shard) são descartadas e contadas como 'duplicate'; as novas são
+            acrescentadas ao índice e suas chaves gravadas no shard
+            (`DEDUP_ROWS_DIR`), para que `dedup_shards` descarte também as
+            repetições entre shards.
+        offset (int): Posição da primeira linha do arquivo, para que as
+            posições sigam a ordem dos arquivos de um padrão glob (ver
+            `plan_shards`).
+
+    Returns:
+        dict: Contadores do shard ('total_records', 'valid_records',
+        'missing_values', 'rejections').
+    """
+    region_sketches = RegionSketches() if sketches else None
+    risk_windows = None if risk_window is None else RegionWindows(risk_window, risk_slide)
+    columns = PIPELINE_COLUMNS
+    if sketches:
+        # Endereços de envio: lidos só para os sketches, fora da qualidade
+        columns = columns + [name for name in SKETCH_COLUMNS if name not in columns]
+    if dedup is not None:
+        columns = columns + [name for name in dedup_columns() if name not in columns]
+    options = read_csv_options(columns)
+
+    def chunks():
+        if end is None:
+            source = load_data_in_chunks(input_path, chunksize, columns)
+            first = offset
+        else:
+            names, _ = read_header(input_path)
+            source = iter_csv_range(input_path, start, end, names, chunksize, **options)
+            first = offset + start
+        for chunk in source:
+            chunk.index = chunk.index + first
+            yield chunk
+
+    shutil.rmtree(output_path, ignore_errors=True)
+    cleaned_path = os.path.join(output_path, CLEANED_DIR)
+    # Um shard sem linhas válidas ainda tem uma saída limpa (vazia)
+    os.makedirs(cleaned_path)
+    rows_path = os.path.join(output_path, DEDUP_ROWS_DIR)
+    if dedup is not None:
+        os.makedirs(rows_path)
+    engine = get_engine(engine)
+    partial = aggregate_chunks([])
+    with contextlib.ExitStack() as stack:
+        if quarantine:
+            rejected_file = stack.enter_context(
+                open(os.path.join(output_path, QUARANTINE_FILE), 'w', newline='')
+            )
+        for i, chunk in enumerate(chunks()):
+            chunk = apply_schema(chunk)
+            # Colunas da saída limpa: as do pipeline, na ordem do cabeçalho
+            # (como em `src.main.clean_data_streaming`)
+            cleaned_columns = [name for name in chunk.columns if name in PIPELINE_COLUMNS]
+            valid, failures, counts = evaluate_rules(chunk)
+            cleaned = engine.select_rows(chunk, valid)
+            kept = valid
+            if dedup is not None:
+                # Hashes das linhas já selecionadas, com os tipos da saída
+                # limpa: os mesmos de `src.main.drop_duplicates`
+                hashes = identity_hashes(cleaned)
+                new = dedup.add_new(hashes)
+                counts['duplicate'] = counts.get('duplicate', 0) + int(len(new) - new.sum())
+                cleaned = cleaned[new]
+                kept = valid.copy()
+                kept[np.flatnonzero(valid)[~new]] = False
+                append_partitioned(
+                    _dedup_rows(cleaned, hashes[new], cleaned_columns, sketches), rows_path
+                )
+            add_chunk(
+                partial,
+                chunk,
+                kept,
+                counts,
+                sketches=region_sketches,
+                columns=PIPELINE_COLUMNS,
+                risk_windows=risk_windows,
+            )
+            append_partitioned(cleaned[cleaned_columns], cleaned_path)
+            if quarantine:
+                rejected = quarantine_rows(chunk[cleaned_columns], valid, failures)
+                rejected.to_csv(rejected_file, index=False, header=(i == 0))
+    flush_chunks(partial)
+    save_partial(partial, output_path)
+    if region_sketches is not None:
+        region_sketches.save(os.path.join(output_path, SKETCHES_DIR))
+    if risk_windows is not None:
+        risk_windows.save(os.path.join(output_path, RISK_WINDOWS_DIR))
+    return {name: partial[name] for name in _COUNT_NAMES}
+
+
+def _dedup_rows(cleaned, keys, cleaned_columns, sketches):
+    """Monta as linhas de `DEDUP_ROWS_DIR` para as linhas limpas de um bloco."""
+    rows = pd.DataFrame(
+        {
+            TIMESTAMP_COLUMN: cleaned[TIMESTAMP_COLUMN].to_numpy(),
+            _KEY_COLUMN: keys,
+            _POSITION_COLUMN: cleaned.index.to_numpy(dtype=np.int64),
+        }
+    )
+    if sketches:
+        for name in SKETCH_COLUMNS:
+            if name not in cleaned_columns:
+                rows[name] = cleaned[name].array
+    return rows
+
+
+def _filter_shard(path, keep):
+    """
+    Mantém nas saídas de um shard apenas as linhas de `keep` e recalcula o
+    seu parcial, os sketches e a série de risco a partir dessas linhas.
+
+    Args:
+        path (str): Diretório gravado por `process_shard` com `dedup`.
+        keep (np.ndarray): Máscara das linhas mantidas, na ordem das
+            partições de `DEDUP_ROWS_DIR`.
+    """
+    partial = load_partial(path)
+    sketches_path = os.path.join(path, SKETCHES_DIR)
+    region_sketches = None
+    if os.path.exists(sketches_path):
+        saved = RegionSketches.load(sketches_path)
+        region_sketches = RegionSketches(saved.relative_accuracy, saved.precision)
+    windows_path = os.path.join(path, RISK_WINDOWS_DIR)
+    risk_windows = None
+    if os.path.exists(windows_path):
+        saved = RegionWindows.load(windows_path)
+        risk_windows = RegionWindows(saved.width, saved.pane)
+
+    rebuilt = aggregate_chunks([])
+    first = 0
+    for partition in list_partitions(os.path.join(path, DEDUP_ROWS_DIR)):
+        cleaned_partition = os.path.join(path, CLEANED_DIR, os.path.basename(partition))
+        rows = read_table(partition, mmap=False)
+        chunk = read_table(cleaned_partition, mmap=False)
+        mask = keep[first:first + len(rows)]
+        first += len(rows)
+        if not mask.all():
+            rows = rows[mask].reset_index(drop=True)
+            chunk = chunk[mask].reset_index(drop=True)
+            if not len(rows):
+                shutil.rmtree(partition)
+                shutil.rmtree(cleaned_partition)
+                continue
+            write_table(rows, partition)
+            write_table(chunk, cleaned_partition)
+
+        # Linhas restantes, com a posição na entrada como índice (desempates
+        # da Tabela 2), reduzidas como as linhas válidas de um bloco
+        if region_sketches is not None:
+            for name in SKETCH_COLUMNS:
+                if name not in chunk.columns:
+                    chunk[name] = rows[name]
+        chunk.index = rows[_POSITION_COLUMN].to_numpy()
+        add_chunk(
+            rebuilt,
+            chunk,
+            np.ones(len(chunk), dtype=bool),
+            {},
+            sketches=region_sketches,
+            columns=PIPELINE_COLUMNS,
+            risk_windows=risk_windows,
+        )
+    flush_chunks(rebuilt)
+
+    rejections = dict(partial['rejections'])
+    add_counts(rejections, {'duplicate': partial['valid_records'] - rebuilt['valid_records']})
+    rebuilt['total_records'] = partial['total_records']
+    rebuilt['rejections'] = rejections
+    save_partial(rebuilt, path)
+    if region_sketches is not None:
+        shutil.rmtree(sketches_path)
+        region_sketches.save(sketches_path)
+    if risk_windows is not None:
+        shutil.rmtree(windows_path)
+        risk_windows.save(windows_path)
+
+
+def dedup_shards(shard_paths, dedup):
+    """
+    Descarta as transações repetidas entre shards, na ordem da entrada.
+
+    Cada shard processado com `dedup` já descartou as transações do índice
+    gravado e as repetidas dentro do shard, mas os shards rodam em paralelo
+    e não veem as chaves uns dos outros. Aqui as chaves gravadas por cada
+    shard (`DEDUP_ROWS_DIR`) são acrescentadas ao índice em ordem; as linhas
+    de um shard com chaves já aceitas por um shard anterior são removidas das
+    suas saídas gravadas, e o seu parcial é recalculado a partir das linhas
+    restantes, sem reler a entrada. Cada transação fica apenas na sua
+    primeira ocorrência, como na limpeza da entrada inteira em blocos.
+
+    Args:
+        shard_paths (list[str]): Diretórios gravados por `process_shard` com
+            `dedup`, na ordem da entrada.
+        dedup (src.dedup.DedupIndex): Índice aberto antes dos shards, que
+            recebe as chaves de todos eles; deve ser gravado pelo chamador
+            depois das saídas.
+
+    Returns:
+        int: Linhas descartadas por repetirem transações de shards anteriores.
+    """
+    dropped = 0
+    for path in shard_paths:
+        keys = [
+            read_table(partition, [_KEY_COLUMN], mmap=False)[_KEY_COLUMN].to_numpy()
+            for partition in list_partitions(os.path.join(path, DEDUP_ROWS_DIR))
+        ]
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.uint64)
+        # As chaves de um shard já são distintas entre si
+        keep = dedup.add_new(keys)
+        if not keep.all():
+            _filter_shard(path, keep)
+            dropped += int(len(keep) - keep.sum())
+    return dropped
+
+
+def merge_shards(shard_paths, k=3):
+    """
+    Combina os parciais dos shards nas tabelas e métricas (fase de redução).
+
+    Args:
+        shard_paths (list[str]): Diretórios gravados por `process_shard`.
+        k (int): Quantidade de transações da Tabela 2.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame, dict, dict]: Tabela 1, Tabela 2,
+        métricas da limpeza e métricas de qualidade dos dados limpos.
+    """
+    partial = merge_partials(load_partial(path) for path in shard_paths)
+    return tables_from_partial(partial, k, f"{len(shard_paths)} shards")
+
+
+def merge_cleaned(shard_paths, path):
+    """
+    Combina as saídas limpas dos shards em uma única tabela particionada.
+
+    As partes de cada shard são transferidas, na ordem dos shards, para as
+    partições de `path` (ver `src.partitioned.move_partitioned`), sem regravar
+    os dados: o resultado é o mesmo da limpeza da entrada inteira em blocos
+    (ver `src.main.clean_data_streaming`).
+
+    Args:
+        shard_paths (list[str]): Diretórios gravados por `process_shard`, na
+            ordem da entrada.
+        path (str): Diretório raiz da tabela limpa (substituído se existir).
+
+    Returns:
+        list[str]: Partições da tabela limpa.
+    """
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    partitions = set()
+    for shard_path in shard_paths:
+        partitions.update(move_partitioned(os.path.join(shard_path, CLEANED_DIR), path))
+    return sorted(partitions)
+
+
+def merge_quarantine(shard_paths, path):
+    """
+    Combina as quarentenas gravadas pelos shards em um único arquivo CSV.
+
+    Os arquivos são concatenados na ordem dos shards, com um único
+    cabeçalho: o resultado é o mesmo da quarentena da limpeza da entrada
+    inteira em blocos (ver `src.main.clean_data_streaming`).
+
+    Args:
+        shard_paths (list[str]): Diretórios gravados por `process_shard`, na
+            ordem da entrada.
+        path (str): Arquivo CSV da quarentena (substituído se existir).
+
+    Returns:
+        bool: True se a quarentena foi gravada, ou False se nenhum shard
+        tiver sido processado com `quarantine=True`.
+    """
+    shard_files = [os.path.join(shard_path, QUARANTINE_FILE) for shard_path in shard_paths]
+    shard_files = [name for name in shard_files if os.path.exists(name)]
+    if not shard_files:
+        return False
+    header = None
+    with open(path, 'w', newline='') as output:
+        for name in shard_files:
+            with open(name, newline='') as shard:
+                # Um shard sem linhas não grava nem o cabeçalho
+                line = shard.readline()
+                if line and header is None:
+                    header = line
+                    output.write(header)
+                shutil.copyfileobj(shard, output)
+    return True
+
+
+def merge_sketches(shard_paths):
+    """
+    Combina os sketches por região gravados pelos shards.
+
+    Args:
+        shard_paths (list[str]): Diretórios gravados por `process_shard`.
+
+    Returns:
+        src.sketches.RegionSketches | None: Sketches combinados, ou None se
+        nenhum shard tiver sido processado com `sketches=True`.
+    """
+    merged = None
+    for path in shard_paths:
+        sketches_path = os.path.join(path, SKETCHES_DIR)
+        if not os.path.exists(sketches_path):
+            continue
+        sketches = RegionSketches.load(sketches_path)
+        if merged is None:
+            merged = sketches
+        else:
+            merged.merge(sketches)
+    return merged
+
+
+def merge_risk_windows(shard_paths):
+    """
+    Combina as séries de risco por região e janela gravadas pelos shards.
+
+    Args:
+        shard_paths (list[str]): Diretórios gravados por `process_shard`.
+
+    Returns:
+        src.windows.RegionWindows | None: Janelas combinadas, ou None se
+        nenhum shard tiver sido processado com `risk_window`.
+    """
+    merged = None
+    for path in shard_paths:
+        windows_path = os.path.join(path, RISK_WINDOWS_DIR)
+        if not os.path.exists(windows_path):
+            continue
+        windows = RegionWindows.load(windows_path)
+        if merged is None:
+            merged = windows
+        else:
+            merged.merge(windows)
+    return merged
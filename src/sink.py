@@ -0,0 +1,205 @@
+import csv
+import functools
+import io
+import itertools
+import logging
+import os
+
+from src.lazy import lazy_import
+from src.partitioned import iter_partitioned, read_partitioned
+
+pd = lazy_import("pandas")
+sa = lazy_import("sqlalchemy")
+
+# Variável de ambiente com a URL do banco de destino (formato do SQLAlchemy)
+DATABASE_URL_ENV = "PIPELINE_DATABASE_URL"
+
+# Coluna que identifica a execução que gravou cada linha
+RUN_ID_COLUMN = "run_id"
+
+# Linhas enviadas ao banco por lote (um COPY ou um executemany)
+DEFAULT_BATCH_ROWS = 50_000
+
+
+@functools.lru_cache(maxsize=None)
+def get_engine(url):
+    """
+    Retorna o engine do SQLAlchemy para a URL, criado uma vez por processo.
+
+    O engine mantém um pool de conexões, reaproveitadas entre as cargas das
+    tabelas e entre chamadas no mesmo processo (ex.: no worker do Airflow).
+
+    Args:
+        url (str): URL do banco (ex.: 'postgresql+psycopg2://...' ou
+            'sqlite:///data/pipeline.db').
+
+    Returns:
+        sqlalchemy.engine.Engine: Engine com pool de conexões.
+    """
+    return sa.create_engine(url, pool_pre_ping=True)
+
+
+def _column_type(series):
+    """
+    Escolhe o tipo SQL de uma coluna do DataFrame.
+
+    Args:
+        series (pd.Series): Coluna a ser gravada.
+
+    Returns:
+        sqlalchemy.types.TypeEngine: Tipo da coluna no banco.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return sa.Boolean()
+    if pd.api.types.is_integer_dtype(dtype):
+        return sa.BigInteger()
+    if pd.api.types.is_float_dtype(dtype):
+        return sa.Float(precision=53)
+    return sa.Text()
+
+
+def define_table(name, df, metadata=None):
+    """
+    Define a tabela de destino a partir das colunas do DataFrame.
+
+    A tabela recebe a coluna `run_id`, indexada, usada para substituir as
+    linhas de uma execução quando ela é repetida.
+
+    Args:
+        name (str): Nome da tabela.
+        df (pd.DataFrame): Dados (ou apenas a estrutura) a serem gravados.
+        metadata (sqlalchemy.MetaData, optional): Metadados da tabela.
+
+    Returns:
+        sqlalchemy.Table: Tabela definida (não criada no banco).
+    """
+    columns = [sa.Column(RUN_ID_COLUMN, sa.String(250), nullable=False, index=True)]
+    columns += [sa.Column(column, _column_type(df[column])) for column in df.columns]
+    return sa.Table(name, metadata if metadata is not None else sa.MetaData(), *columns)
+
+
+def _batches(frames, batch_rows):
+    """Divide os DataFrames em lotes de até `batch_rows` linhas."""
+    for frame in frames:
+        for start in range(0, len(frame), batch_rows):
+            yield frame.iloc[start:start + batch_rows]
+
+
+def _copy_batch(connection, table, batch, run_id):
+    """
+    Envia um lote com COPY ... FROM STDIN (PostgreSQL com psycopg2).
+
+    O lote é serializado em CSV na memória e transmitido em uma única
+    operação, na mesma transação da conexão.
+    """
+    buffer = io.StringIO()
+    batch = batch.copy()
+    batch.insert(0, RUN_ID_COLUMN, run_id)
+    batch.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+    buffer.seek(0)
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY "{table.name}" ({columns}) FROM STDIN WITH (FORMAT csv)', buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _insert_batch(connection, table, batch, run_id):
+    """
+    Envia um lote com um único executemany (demais bancos, como o SQLite).
+
+    Valores ausentes viram NULL e os tipos NumPy viram tipos Python. Com
+    drivers de parâmetros posicionais, as linhas vão como tuplas direto ao
+    driver, sem o custo de montar um dicionário por linha.
+    """
+    values = batch.astype(object).where(batch.notna(), None)
+    dialect = connection.dialect
+    if dialect.positional:
+        statement = str(table.insert().compile(dialect=dialect))
+        rows = [(run_id, *row) for row in values.itertuples(index=False, name=None)]
+        connection.exec_driver_sql(statement, rows)
+        return
+    records = values.to_dict("records")
+    for record in records:
+        record[RUN_ID_COLUMN] = run_id
+    connection.execute(table.insert(), records)
+
+
+def load_table(engine, name, data, run_id, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Grava uma tabela no banco, substituindo as linhas da mesma execução.
+
+    A remoção das linhas anteriores de `run_id` e a carga acontecem em uma
+    única transação: repetir a execução deixa o banco no mesmo estado, e uma
+    falha no meio da carga não deixa linhas parciais. No PostgreSQL os lotes
+    são enviados com COPY; nos demais bancos, com executemany em lotes.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine do banco (ver `get_engine`).
+        name (str): Nome da tabela de destino (criada se não existir).
+        data (pd.DataFrame | str): Dados ou diretório de uma tabela colunar,
+            particionada por data ou não, lida parte a parte (ver
+            `src.partitioned`).
+        run_id (str): Identificador da execução.
+        batch_rows (int): Linhas por lote.
+
+    Returns:
+        int: Linhas gravadas.
+
+    Raises:
+        ValueError: Se `batch_rows` não for positivo.
+    """
+    if batch_rows <= 0:
+        raise ValueError(f"batch_rows deve ser positivo: {batch_rows}")
+    if isinstance(data, str):
+        frames = iter_partitioned(data)
+        # Tabela sem partes: usa apenas a estrutura gravada no manifesto
+        first = next(frames, None)
+        if first is None:
+            first = read_partitioned(data)
+    else:
+        frames, first = iter(()), data
+    table = define_table(name, first)
+    send = _copy_batch if engine.dialect.driver == "psycopg2" else _insert_batch
+
+    rows = 0
+    with engine.begin() as connection:
+        table.create(connection, checkfirst=True)
+        connection.execute(table.delete().where(table.c[RUN_ID_COLUMN] == run_id))
+        for batch in _batches(itertools.chain([first], frames), batch_rows):
+            send(connection, table, batch, run_id)
+            rows += len(batch)
+    logging.info(f"Sink: {rows} linhas gravadas em '{name}' (execução {run_id}).")
+    return rows
+
+
+def sink_tables(tables, run_id, url=None, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Grava várias tabelas no banco, cada uma substituindo a execução `run_id`.
+
+    Args:
+        tables (dict): DataFrames ou diretórios de tabelas colunares, por nome
+            da tabela de destino.
+        run_id (str): Identificador da execução.
+        url (str, optional): URL do banco. Usa a variável de ambiente
+            `PIPELINE_DATABASE_URL`.
+        batch_rows (int): Linhas por lote.
+
+    Returns:
+        dict: Linhas gravadas por tabela.
+
+    Raises:
+        ValueError: Se nenhuma URL de banco for informada.
+    """
+    url = url or os.environ.get(DATABASE_URL_ENV)
+    if not url:
+        raise ValueError(f"URL do banco não informada (defina {DATABASE_URL_ENV})")
+    engine = get_engine(url)
+    return {
+        name: load_table(engine, name, data, run_id, batch_rows)
+        for name, data in tables.items()
+    }
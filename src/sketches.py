@@ -0,0 +1,448 @@
+import json
+import math
+import os
+
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# Erro relativo máximo dos quantis (ex.: 0.01 = o valor retornado está a no
+# máximo 1% do valor exato)
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Faixa de valores com erro relativo garantido; valores menores contam como
+# zero e maiores ficam no último intervalo. A quantidade de intervalos (e a
+# memória do sketch) é fixa e depende apenas da faixa e da precisão
+MIN_VALUE = 1e-3
+MAX_VALUE = 1e12
+
+# Bits do índice de registrador do HyperLogLog: 2 ** 12 registradores de um
+# byte (4 KiB), com erro padrão de cerca de 1.6% na contagem de distintos
+DEFAULT_PRECISION = 12
+
+# Quantis das colunas da tabela de estatísticas por região
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Colunas resumidas por quantis e por contagem de distintos
+QUANTILE_COLUMNS = ('risk_score', 'amount')
+DISTINCT_COLUMNS = {
+    'sending_address': 'distinct_senders',
+    'receiving_address': 'distinct_receivers',
+}
+
+# Colunas lidas para calcular os sketches
+SKETCH_COLUMNS = ['location_region', *QUANTILE_COLUMNS, *DISTINCT_COLUMNS]
+
+# Arquivos gravados por `RegionSketches.save`
+_ARRAYS_FILE = "sketches.npz"
+_REGIONS_FILE = "regions.json"
+
+
+class QuantileSketch:
+    """
+    Sketch de quantis com erro relativo garantido (no estilo do DDSketch).
+
+    Os valores são contados em intervalos de tamanho geométrico: o intervalo
+    `i` cobre (gamma ** (i - 1), gamma ** i], com
+    gamma = (1 + accuracy) / (1 - accuracy), de modo que qualquer valor do
+    intervalo está a no máximo `accuracy` do seu representante. A memória é
+    fixa e dois sketches com a mesma precisão são combinados somando as
+    contagens, sem perda de precisão.
+
+    Example:
+        sketch = QuantileSketch()
+        sketch.update(df['amount'].to_numpy())
+        sketch.quantile(0.99)
+
+    Args:
+        relative_accuracy (float): Erro relativo máximo, entre 0 e 1.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy deve estar entre 0 e 1: {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self._offset = math.ceil(math.log(MIN_VALUE) / self._log_gamma)
+        size = math.ceil(math.log(MAX_VALUE) / self._log_gamma) - self._offset + 1
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.zero_count = 0
+
+    @property
+    def count(self):
+        """Quantidade de valores acrescentados."""
+        return int(self.counts.sum()) + self.zero_count
+
+    def keys(self, values):
+        """
+        Calcula o intervalo de cada valor (-1 para valores abaixo de `MIN_VALUE`).
+
+        Args:
+            values (np.ndarray): Valores numéricos, sem NaN.
+
+        Returns:
+            np.ndarray: Índice do intervalo de cada valor.
+        """
+        values = np.asarray(values, dtype='float64')
+        keys = np.full(len(values), -1, dtype=np.int64)
+        positive = values >= MIN_VALUE
+        logs = np.log(np.minimum(values[positive], MAX_VALUE)) / self._log_gamma
+        keys[positive] = np.ceil(logs).astype(np.int64) - self._offset
+        return np.clip(keys, -1, len(self.counts) - 1)
+
+    def add_keys(self, keys):
+        """
+        Acrescenta valores já convertidos em intervalos por `keys`.
+
+        Args:
+            keys (np.ndarray): Índices dos intervalos.
+        """
+        zero = keys < 0
+        self.zero_count += int(zero.sum())
+        self.counts += np.bincount(keys[~zero], minlength=len(self.counts))
+
+    def update(self, values):
+        """
+        Acrescenta valores ao sketch; NaN é ignorado.
+
+        Args:
+            values (array-like): Valores numéricos.
+        """
+        values = np.asarray(values, dtype='float64')
+        self.add_keys(self.keys(values[~np.isnan(values)]))
+
+    def merge(self, other):
+        """
+        Combina outro sketch a este (modificado).
+
+        Args:
+            other (QuantileSketch): Sketch com a mesma precisão.
+
+        Raises:
+            ValueError: Se as precisões forem diferentes.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches de quantis com precisões diferentes")
+        self.counts += other.counts
+        self.zero_count += other.zero_count
+
+    def quantile(self, q):
+        """
+        Estima o quantil `q` dos valores acrescentados.
+
+        Args:
+            q (float): Quantil, entre 0 e 1.
+
+        Returns:
+            float: Valor estimado (NaN se o sketch estiver vazio).
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"q deve estar entre 0 e 1: {q}")
+        total = self.count
+        if total == 0:
+            return float('nan')
+        rank = q * (total - 1)
+        if rank < self.zero_count:
+            return 0.0
+        key = int(np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, side='right'))
+        gamma = math.exp(self._log_gamma)
+        # Representante do intervalo: equidistante, em erro relativo, das bordas
+        return 2 * gamma ** (key + self._offset) / (gamma + 1)
+
+
+def hash_values(values):
+    """
+    Calcula um hash de 64 bits por valor (colunas categóricas: uma vez por categoria).
+
+    Args:
+        values (array-like | pd.Categorical): Valores a contar.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Hashes (uint64) e máscara dos valores
+        não nulos.
+    """
+    if isinstance(values, pd.Categorical):
+        hashes = pd.util.hash_array(np.asarray(values.categories, dtype=object))
+        codes = values.codes
+        return hashes[np.maximum(codes, 0)], codes >= 0
+    values = pd.Series(values).to_numpy(dtype=object)
+    present = pd.notna(values)
+    hashes = np.zeros(len(values), dtype=np.uint64)
+    hashes[present] = pd.util.hash_array(values[present])
+    return hashes, present
+
+
+class HyperLogLog:
+    """
+    Contagem aproximada de valores distintos (HyperLogLog).
+
+    Cada valor é convertido em um hash de 64 bits: os primeiros `precision`
+    bits escolhem um registrador, que guarda a maior posição do primeiro bit 1
+    no restante do hash. A memória é de 2 ** `precision` bytes, qualquer que
+    seja a quantidade de valores, e dois sketches são combinados pelo máximo
+    de cada registrador.
+
+    Args:
+        precision (int): Bits do índice de registrador, entre 4 e 16.
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"precision deve estar entre 4 e 16: {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def ranks(self, hashes):
+        """
+        Calcula o registrador e a posição do primeiro bit 1 de cada hash.
+
+        Args:
+            hashes (np.ndarray): Hashes de 64 bits (uint64).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Índice do registrador e posição.
+        """
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # Quantidade de bits do restante; o arredondamento do float64 só afeta
+        # restos com mais de 52 bits, em que o erro é desprezível
+        length = np.zeros(len(rest), dtype=np.int64)
+        nonzero = rest > 0
+        length[nonzero] = np.floor(np.log2(rest[nonzero].astype('float64'))).astype(np.int64) + 1
+        return index, (bits - length + 1).astype(np.uint8)
+
+    def add_hashes(self, hashes):
+        """
+        Acrescenta valores já convertidos em hashes (ver `hash_values`).
+
+        Args:
+            hashes (np.ndarray): Hashes de 64 bits (uint64).
+        """
+        index, rank = self.ranks(hashes)
+        np.maximum.at(self.registers, index, rank)
+
+    def update(self, values):
+        """
+        Acrescenta valores ao sketch; valores nulos são ignorados.
+
+        Args:
+            values (array-like | pd.Categorical): Valores a contar.
+        """
+        hashes, present = hash_values(values)
+        self.add_hashes(hashes[present])
+
+    def merge(self, other):
+        """
+        Combina outro sketch a este (modificado).
+
+        Args:
+            other (HyperLogLog): Sketch com a mesma precisão.
+
+        Raises:
+            ValueError: Se as precisões forem diferentes.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Sketches HyperLogLog com precisões diferentes")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        """
+        Estima a quantidade de valores distintos acrescentados.
+
+        Returns:
+            int: Estimativa da contagem de distintos.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Correção para poucos valores: contagem linear dos registradores vazios
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class RegionSketches:
+    """
+    Sketches combináveis por 'location_region', com memória fixa por região.
+
+    Para cada região, mantém a quantidade de registros, sketches de quantis de
+    'risk_score' e 'amount' (`QuantileSketch`) e a contagem aproximada de
+    endereços distintos de envio e de recebimento (`HyperLogLog`). É
+    atualizado bloco a bloco (ver `src.fused.aggregate_chunks`) e os sketches
+    de blocos, shards ou execuções diferentes são combinados com `merge`.
+
+    Example:
+        sketches = RegionSketches()
+        for chunk in chunks:
+            sketches.update(chunk, valid)
+        stats = sketches.table()
+
+    Args:
+        relative_accuracy (float): Erro relativo dos quantis.
+        precision (int): Bits do índice de registrador do HyperLogLog.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, precision=DEFAULT_PRECISION):
+        self.relative_accuracy = relative_accuracy
+        self.precision = precision
+        self.regions = {}
+
+    def _region(self, name):
+        """Retorna os sketches de uma região, criando-os se necessário."""
+        if name not in self.regions:
+            self.regions[name] = {
+                'records': 0,
+                **{column: QuantileSketch(self.relative_accuracy) for column in QUANTILE_COLUMNS},
+                **{column: HyperLogLog(self.precision) for column in DISTINCT_COLUMNS},
+            }
+        return self.regions[name]
+
+    def update(self, chunk, rows=None):
+        """
+        Acrescenta as linhas de um bloco com os tipos do esquema.
+
+        Os intervalos dos quantis e os hashes dos endereços são calculados uma
+        vez para o bloco; cada região recebe apenas as suas linhas. Colunas de
+        `SKETCH_COLUMNS` ausentes no bloco são ignoradas.
+
+        Args:
+            chunk (pd.DataFrame): Bloco com 'location_region' categórica.
+            rows (np.ndarray, optional): Máscara das linhas consideradas
+                (ex.: as válidas). Todas, se None.
+        """
+        codes = chunk['location_region'].cat.codes.to_numpy()
+        selected = codes >= 0 if rows is None else rows & (codes >= 0)
+        positions = np.flatnonzero(selected)
+        if len(positions) == 0:
+            return
+        order = positions[np.argsort(codes[positions], kind='stable')]
+        groups, starts = np.unique(codes[order], return_index=True)
+        bounds = np.append(starts, len(order))
+
+        template = QuantileSketch(self.relative_accuracy)
+        keys = {}
+        for column in QUANTILE_COLUMNS:
+            if column in chunk.columns:
+                values = chunk[column].to_numpy(dtype='float64')[order]
+                keys[column] = (template.keys(np.nan_to_num(values)), ~np.isnan(values))
+        hashes = {}
+        for column in DISTINCT_COLUMNS:
+            if column in chunk.columns:
+                column_hashes, present = hash_values(chunk[column].array)
+                hashes[column] = (column_hashes[order], present[order])
+
+        categories = chunk['location_region'].cat.categories
+        for i, code in enumerate(groups):
+            group = slice(bounds[i], bounds[i + 1])
+            region = self._region(categories[code])
+            region['records'] += bounds[i + 1] - bounds[i]
+            for column, (column_keys, present) in keys.items():
+                region[column].add_keys(column_keys[group][present[group]])
+            for column, (column_hashes, present) in hashes.items():
+                region[column].add_hashes(column_hashes[group][present[group]])
+
+    def merge(self, other):
+        """
+        Combina os sketches de outra instância a estes (modificados).
+
+        Args:
+            other (RegionSketches): Sketches com as mesmas precisões.
+        """
+        for name, sketches in other.regions.items():
+            region = self._region(name)
+            region['records'] += sketches['records']
+            for column in (*QUANTILE_COLUMNS, *DISTINCT_COLUMNS):
+                region[column].merge(sketches[column])
+
+    def table(self, quantiles=DEFAULT_QUANTILES):
+        """
+        Gera a tabela de estatísticas de risco por região.
+
+        Args:
+            quantiles (tuple[float]): Quantis de 'risk_score' e 'amount'.
+
+        Returns:
+            pd.DataFrame: Uma linha por região, com 'records', as colunas
+            '<coluna>_p<quantil>' (ex.: 'risk_score_p90') e as contagens
+            aproximadas 'distinct_senders' e 'distinct_receivers', em ordem
+            decrescente de mediana de 'risk_score'.
+        """
+        rows = []
+        for name, region in self.regions.items():
+            row = {'location_region': name, 'records': int(region['records'])}
+            for column in QUANTILE_COLUMNS:
+                for q in quantiles:
+                    row[f"{column}_p{q * 100:g}"] = region[column].quantile(q)
+            for column, label in DISTINCT_COLUMNS.items():
+                row[label] = region[column].estimate()
+            rows.append(row)
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        sort_by = f"risk_score_p{quantiles[0] * 100:g}"
+        table = table.sort_values([sort_by, 'location_region'], ascending=[False, True])
+        return table.reset_index(drop=True)
+
+    def save(self, path):
+        """
+        Grava os sketches em um diretório (arrays NumPy, sem pickle).
+
+        Args:
+            path (str): Diretório de destino (criado se necessário).
+        """
+        os.makedirs(path, exist_ok=True)
+        names = list(self.regions)
+        arrays = {'records': np.array([self.regions[n]['records'] for n in names], dtype=np.int64)}
+        for column in QUANTILE_COLUMNS:
+            arrays[f"{column}.counts"] = np.array(
+                [self.regions[n][column].counts for n in names], dtype=np.int64
+            ).reshape(len(names), -1)
+            arrays[f"{column}.zero_count"] = np.array(
+                [self.regions[n][column].zero_count for n in names], dtype=np.int64
+            )
+        for column in DISTINCT_COLUMNS:
+            arrays[f"{column}.registers"] = np.array(
+                [self.regions[n][column].registers for n in names], dtype=np.uint8
+            ).reshape(len(names), -1)
+        np.savez(os.path.join(path, _ARRAYS_FILE), **arrays)
+        with open(os.path.join(path, _REGIONS_FILE), 'w') as f:
+            json.dump(
+                {
+                    'regions': names,
+                    'relative_accuracy': self.relative_accuracy,
+                    'precision': self.precision,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carrega sketches gravados por `save`.
+
+        Args:
+            path (str): Diretório dos sketches.
+
+        Returns:
+            RegionSketches: Sketches carregados.
+
+        Raises:
+            FileNotFoundError: Se os sketches não existirem.
+        """
+        with open(os.path.join(path, _REGIONS_FILE)) as f:
+            info = json.load(f)
+        sketches = cls(info['relative_accuracy'], info['precision'])
+        with np.load(os.path.join(path, _ARRAYS_FILE), allow_pickle=False) as arrays:
+            for i, name in enumerate(info['regions']):
+                region = sketches._region(name)
+                region['records'] = int(arrays['records'][i])
+                for column in QUANTILE_COLUMNS:
+                    region[column].counts[:] = arrays[f"{column}.counts"][i]
+                    region[column].zero_count = int(arrays[f"{column}.zero_count"][i])
+                for column in DISTINCT_COLUMNS:
+                    region[column].registers[:] = arrays[f"{column}.registers"][i]
+        return sketches
@@ -0,0 +1,160 @@
+import os
+import shutil
+import tempfile
+
+from src.aggregates import LATEST_SALES_COLUMNS, merge_latest_sales
+from src.lazy import lazy_import
+from src.topk import top_k_positions
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Diretório padrão dos arquivos temporários da agregação externa
+DEFAULT_SPILL_DIR = "data/spill"
+
+# Partições de hash gravadas em disco; na fase de combinação, a memória usada
+# corresponde a cerca de 1/`DEFAULT_PARTITIONS` do estado total
+DEFAULT_PARTITIONS = 64
+
+
+def partition_ids(keys, partitions):
+    """
+    Atribui cada chave a uma partição de hash, de forma determinística.
+
+    Colunas categóricas têm apenas as categorias calculadas; a partição de
+    cada linha é obtida pelos códigos.
+
+    Args:
+        keys (array-like): Chaves (ex.: 'receiving_address').
+        partitions (int): Quantidade de partições.
+
+    Returns:
+        np.ndarray: Partição de cada chave, entre 0 e `partitions - 1`.
+    """
+    if isinstance(keys, pd.Categorical):
+        hashes = pd.util.hash_array(np.asarray(keys.categories, dtype=object))
+        return (hashes % np.uint64(partitions)).astype(np.int64)[keys.codes]
+    hashes = pd.util.hash_array(np.asarray(keys, dtype=object))
+    return (hashes % np.uint64(partitions)).astype(np.int64)
+
+
+class ExternalLatestSales:
+    """
+    Agregação de "última venda por endereço" com orçamento de memória.
+
+    Os parciais de `src.aggregates` são acumulados na memória enquanto couberem
+    em `memory_budget` bytes. Ao ultrapassar o orçamento, os parciais são
+    combinados e gravados em disco, divididos em partições por hash do
+    endereço. Como cada endereço cai sempre na mesma partição, a fase final
+    combina uma partição por vez e mantém apenas os `k` maiores valores de
+    cada uma: a união desses candidatos contém as `k` maiores vendas globais.
+
+    Use como gerenciador de contexto para apagar os arquivos temporários.
+
+    Example:
+        with ExternalLatestSales(512 * 1024 ** 2) as latest:
+            for chunk in chunks:
+                latest.add(latest_sales_partial(chunk, seq))
+            table2 = table2_from_latest(latest.candidates(k=3), k=3)
+
+    Args:
+        memory_budget (int): Bytes de parciais mantidos na memória.
+        spill_dir (str): Diretório onde o diretório temporário é criado, apenas
+            na primeira gravação em disco.
+        partitions (int): Quantidade de partições de hash.
+    """
+
+    def __init__(self, memory_budget, spill_dir=DEFAULT_SPILL_DIR, partitions=DEFAULT_PARTITIONS):
+        if memory_budget <= 0:
+            raise ValueError(f"memory_budget deve ser positivo: {memory_budget}")
+        self.memory_budget = memory_budget
+        self.partitions = partitions
+        self.spills = 0
+        self.spilled_rows = 0
+        self.spill_dir = spill_dir
+        self._dir = None
+        self._buffer = []
+        self._buffered_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Apaga os arquivos temporários."""
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self._buffer = []
+
+    def add(self, partial):
+        """
+        Acrescenta um parcial de última venda, gravando em disco se necessário.
+
+        Args:
+            partial (pd.DataFrame): Linhas com as colunas de
+                `LATEST_SALES_COLUMNS` (não precisam ser únicas por endereço).
+        """
+        if len(partial) == 0:
+            return
+        self._buffer.append(partial)
+        self._buffered_bytes += int(partial.memory_usage(deep=True).sum())
+        if self._buffered_bytes > self.memory_budget:
+            self._spill()
+
+    def _spill(self):
+        """Combina os parciais da memória e os grava, particionados, em disco."""
+        if self._dir is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._dir = tempfile.mkdtemp(prefix="latest-sales-", dir=self.spill_dir)
+        state = merge_latest_sales(self._buffer)
+        self._buffer = []
+        self._buffered_bytes = 0
+        ids = partition_ids(state['receiving_address'].array, self.partitions)
+        order = np.argsort(ids, kind='stable')
+        bounds = np.searchsorted(ids[order], np.arange(self.partitions + 1))
+        # Os endereços são quase todos distintos: como categóricos, cada parte
+        # carregaria todas as categorias do estado. Em disco, ficam como texto
+        state['receiving_address'] = state['receiving_address'].astype(object)
+        for partition in range(self.partitions):
+            rows = order[bounds[partition]:bounds[partition + 1]]
+            if len(rows):
+                part_dir = os.path.join(self._dir, f"partition-{partition:04d}")
+                os.makedirs(part_dir, exist_ok=True)
+                part = state.iloc[rows].reset_index(drop=True)
+                part.to_pickle(os.path.join(part_dir, f"spill-{self.spills:05d}.pkl"))
+        self.spills += 1
+        self.spilled_rows += len(state)
+
+    def candidates(self, k):
+        """
+        Retorna as vendas candidatas à Tabela 2 (as `k` maiores por partição).
+
+        Sem gravações em disco, combina os parciais na memória. O resultado
+        pode ser passado a `src.aggregates.table2_from_latest`, que produz a
+        mesma Tabela 2 da agregação em memória.
+
+        Args:
+            k (int): Quantidade de transações da Tabela 2.
+
+        Returns:
+            pd.DataFrame: Última venda dos endereços candidatos, com as colunas
+            de `LATEST_SALES_COLUMNS`.
+        """
+        if self.spills == 0:
+            if not self._buffer:
+                return pd.DataFrame(columns=LATEST_SALES_COLUMNS)
+            return merge_latest_sales(self._buffer)
+        if self._buffer:
+            self._spill()
+
+        selected = []
+        for name in sorted(os.listdir(self._dir)):
+            part_dir = os.path.join(self._dir, name)
+            parts = [os.path.join(part_dir, part) for part in sorted(os.listdir(part_dir))]
+            latest = merge_latest_sales([pd.read_pickle(part) for part in parts])
+            top = top_k_positions(latest['amount'].to_numpy(), k, latest['receiving_address'])
+            selected.append(latest.iloc[top])
+        return pd.concat(selected, ignore_index=True)
@@ -0,0 +1,142 @@
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Regiões do conjunto original; cardinalidades maiores geram nomes extras
+BASE_REGIONS = ['Europe', 'Asia', 'North America', 'South America', 'Africa']
+
+# Tipos de transação do conjunto original
+TRANSACTION_TYPES = ['sale', 'purchase', 'transfer', 'scam', 'phishing']
+
+# Ordem das colunas no CSV gerado (a mesma do conjunto original)
+SYNTHETIC_COLUMNS = [
+    'timestamp',
+    'sending_address',
+    'receiving_address',
+    'amount',
+    'transaction_type',
+    'location_region',
+    'risk_score',
+]
+
+# Linhas geradas por bloco ao gravar o CSV
+DEFAULT_BLOCK_ROWS = 1_000_000
+
+_TIMESTAMP_START = 1_600_000_000
+_TIMESTAMP_SPAN = 100_000_000
+
+
+def region_names(cardinality):
+    """
+    Gera nomes de região válidos (apenas letras e espaços).
+
+    Args:
+        cardinality (int): Quantidade de regiões distintas.
+
+    Returns:
+        list[str]: As regiões originais seguidas de "Region A", "Region B", ...
+    """
+    names = BASE_REGIONS[:cardinality]
+    for i in range(cardinality - len(names)):
+        suffix = ''
+        i += 1
+        while i:
+            i, rest = divmod(i - 1, 26)
+            suffix = chr(ord('A') + rest) + suffix
+        names.append(f"Region {suffix}")
+    return names
+
+
+def address_names(cardinality):
+    """
+    Gera endereços no formato do conjunto original ('0x' + 40 dígitos hex).
+
+    Args:
+        cardinality (int): Quantidade de endereços distintos.
+
+    Returns:
+        np.ndarray: Endereços, como array de objetos.
+    """
+    return np.array([f"0x{i:040x}" for i in range(cardinality)], dtype=object)
+
+
+def generate_transactions(
+    rows, regions=5, addresses=10_000, invalid_ratio=0.1, seed=0, start=0
+):
+    """
+    Gera transações sintéticas com o esquema do conjunto original.
+
+    A geração é determinística: os mesmos argumentos produzem sempre os
+    mesmos dados. Uma fração `invalid_ratio` das linhas recebe exatamente um
+    defeito que a limpeza descarta (região fora do padrão, 'risk_score' ou
+    'amount' não numérico, ou 'timestamp' inválido).
+
+    Args:
+        rows (int): Quantidade de linhas.
+        regions (int): Cardinalidade de 'location_region'.
+        addresses (int): Cardinalidade dos endereços de envio e recebimento.
+        invalid_ratio (float): Fração de linhas inválidas, entre 0 e 1.
+        seed (int): Semente da geração.
+        start (int): Posição da primeira linha no conjunto; blocos com
+            posições diferentes recebem sequências aleatórias independentes.
+
+    Returns:
+        pd.DataFrame: Transações com as colunas de `SYNTHETIC_COLUMNS`, com
+        os valores numéricos já como texto (como lidos de um CSV sujo).
+    """
+    if not 0 <= invalid_ratio <= 1:
+        raise ValueError(f"invalid_ratio deve estar entre 0 e 1: {invalid_ratio}")
+    rng = np.random.default_rng([seed, start])
+    region_pool = np.array(region_names(regions), dtype=object)
+    address_pool = address_names(addresses)
+
+    df = pd.DataFrame(
+        {
+            'timestamp': (
+                _TIMESTAMP_START + rng.integers(0, _TIMESTAMP_SPAN, rows)
+            ).astype(str).astype(object),
+            'sending_address': address_pool[rng.integers(0, addresses, rows)],
+            'receiving_address': address_pool[rng.integers(0, addresses, rows)],
+            'amount': np.round(rng.uniform(0, 80_000, rows), 2).astype(str).astype(object),
+            'transaction_type': np.array(TRANSACTION_TYPES, dtype=object)[
+                rng.integers(0, len(TRANSACTION_TYPES), rows)
+            ],
+            'location_region': region_pool[rng.integers(0, regions, rows)],
+            'risk_score': (np.round(rng.uniform(0, 100, rows) * 4) / 4).astype(str).astype(object),
+        },
+        columns=SYNTHETIC_COLUMNS,
+    )
+
+    invalid = np.flatnonzero(rng.random(rows) < invalid_ratio)
+    defects = rng.integers(0, 4, len(invalid))
+    df.loc[invalid[defects == 0], 'location_region'] = '0'
+    df.loc[invalid[defects == 1], 'risk_score'] = 'n/a'
+    df.loc[invalid[defects == 2], 'amount'] = ''
+    df.loc[invalid[defects == 3], 'timestamp'] = 'invalid'
+    df.index = pd.RangeIndex(start, start + rows)
+    return df
+
+
+def write_transactions(path, rows, block_rows=DEFAULT_BLOCK_ROWS, **options):
+    """
+    Grava transações sintéticas em um CSV, bloco a bloco.
+
+    A memória usada depende apenas de `block_rows`, permitindo gerar arquivos
+    maiores que a memória disponível.
+
+    Args:
+        path (str): Arquivo CSV a ser gerado.
+        rows (int): Quantidade total de linhas.
+        block_rows (int): Linhas geradas por bloco.
+        **options: Argumentos de `generate_transactions` (regions,
+            addresses, invalid_ratio, seed).
+
+    Returns:
+        int: Tamanho do arquivo gerado, em bytes.
+    """
+    with open(path, 'w', newline='') as output:
+        for start in range(0, rows, block_rows):
+            block = generate_transactions(min(block_rows, rows - start), start=start, **options)
+            block.to_csv(output, index=False, header=(start == 0))
+        return output.tell()
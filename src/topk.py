@@ -0,0 +1,151 @@
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def _ordinal(timestamps):
+    """
+    Converte timestamps em valores numéricos comparáveis.
+
+    Valores ausentes são tratados como os mais antigos possíveis.
+
+    Args:
+        timestamps (array-like): Timestamps numéricos, datetime ou texto.
+
+    Returns:
+        np.ndarray: Valores numéricos na mesma ordem dos timestamps.
+    """
+    ts = np.asarray(timestamps)
+    if ts.dtype.kind in 'iub':
+        return ts
+    if ts.dtype.kind == 'f':
+        return np.where(np.isnan(ts), -np.inf, ts)
+    if ts.dtype.kind == 'M':
+        return ts.view(np.int64)
+    # Texto ou objetos: posição de cada valor entre os valores distintos
+    # ordenados (ausentes recebem -1, o menor valor)
+    codes, _ = pd.factorize(ts, sort=True)
+    return codes
+
+
+def _lowest(dtype):
+    """Retorna o menor valor representável de um dtype numérico."""
+    if dtype.kind == 'f':
+        return -np.inf
+    return np.iinfo(dtype).min
+
+
+def latest_per_key(keys, timestamps, order=None):
+    """
+    Encontra a linha mais recente de cada chave em uma única passagem.
+
+    Calcula o maior timestamp de cada chave (argmax por grupo, sem ordenar) e,
+    entre as linhas empatadas nesse timestamp, escolhe a de maior `order`, ou
+    seja, a que aparece por último. Chaves ausentes são ignoradas.
+
+    Args:
+        keys (array-like): Chave de cada linha (ex.: 'receiving_address').
+        timestamps (array-like): Timestamp de cada linha.
+        order (array-like, optional): Posição global de cada linha, usada no
+            desempate. Se omitido, usa a posição no array.
+
+    Returns:
+        np.ndarray: Posições (crescentes) das linhas escolhidas, uma por chave.
+    """
+    codes, uniques = pd.factorize(keys)
+    if len(uniques) == 0:
+        return np.flatnonzero(codes >= 0)
+    ts = _ordinal(timestamps)
+    if order is None:
+        order = np.arange(len(codes), dtype=np.int64)
+    order = np.asarray(order)
+    valid = codes >= 0
+
+    max_ts = np.full(len(uniques), _lowest(ts.dtype), dtype=ts.dtype)
+    np.maximum.at(max_ts, codes[valid], ts[valid])
+    candidates = valid & (ts == max_ts[codes])
+
+    max_order = np.full(len(uniques), _lowest(order.dtype), dtype=order.dtype)
+    np.maximum.at(max_order, codes[candidates], order[candidates])
+    return np.flatnonzero(candidates & (order == max_order[codes]))
+
+
+def _key_ranks(keys, positions):
+    """
+    Posição de cada chave selecionada na ordem crescente dos seus valores.
+
+    É a ordem dos grupos de `groupby` por uma coluna de texto (ou categórica
+    com as categorias em ordem, como as lidas por `pd.read_csv`).
+
+    Args:
+        keys (array-like): Chaves de todas as linhas.
+        positions (np.ndarray): Linhas selecionadas.
+
+    Returns:
+        np.ndarray: Posição de cada chave selecionada entre as selecionadas.
+    """
+    if isinstance(keys, pd.Series):
+        keys = keys.array
+    elif not hasattr(keys, 'take'):
+        keys = np.asarray(keys)
+    selected = np.asarray(keys.take(positions), dtype=object)
+    ranks, _ = pd.factorize(selected, sort=True)
+    return ranks
+
+
+def top_k_positions(values, k, keys=None):
+    """
+    Seleciona as posições dos `k` maiores valores sem ordenar o array inteiro.
+
+    Usa seleção parcial (`np.partition`) para achar o k-ésimo maior valor e
+    ordena apenas os candidatos. Empates são resolvidos pela menor chave em
+    `keys` (como `groupby(keys).last()` seguido de
+    `nlargest(keep='first')`), ou, sem chaves, pela menor posição. Valores
+    ausentes são ignorados.
+
+    Args:
+        values (array-like): Valores a comparar (ex.: 'amount').
+        k (int): Quantidade de posições a retornar.
+        keys (array-like, optional): Chave de cada valor (ex.:
+            'receiving_address'), usada no desempate.
+
+    Returns:
+        np.ndarray: Até `k` posições, do maior para o menor valor.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    candidates = np.flatnonzero(~np.isnan(values))
+    if k <= 0 or len(candidates) == 0:
+        return candidates[:0]
+    if k < len(candidates):
+        kth = -np.partition(-values[candidates], k - 1)[k - 1]
+        candidates = candidates[values[candidates] >= kth]
+    # Apenas os candidatos são comparados: as chaves dos empates são poucas
+    order = candidates if keys is None else _key_ranks(keys, candidates)
+    ranking = np.lexsort((order, -values[candidates]))
+    return candidates[ranking[:k]]
+
+
+def latest_top_k(keys, timestamps, values, k=3, order=None):
+    """
+    Seleciona a linha mais recente de cada chave e, dentre elas, as `k` de
+    maior valor, em tempo linear. Valores empatados são desempatados pela
+    chave (ver `top_k_positions`).
+
+    Args:
+        keys (array-like): Chave de cada linha (ex.: 'receiving_address').
+        timestamps (array-like): Timestamp de cada linha.
+        values (array-like): Valor de cada linha (ex.: 'amount').
+        k (int): Quantidade de linhas a retornar.
+        order (array-like, optional): Posição global de cada linha, usada no
+            desempate de timestamps. Se omitido, usa a posição no array.
+
+    Returns:
+        np.ndarray: Até `k` posições, do maior para o menor valor.
+    """
+    latest = latest_per_key(keys, timestamps, order)
+    if isinstance(keys, pd.Series):
+        keys = keys.array
+    elif not hasattr(keys, 'take'):
+        keys = np.asarray(keys)
+    return latest[top_k_positions(np.asarray(values)[latest], k, keys.take(latest))]
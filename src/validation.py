@@ -0,0 +1,73 @@
+import functools
+import re
+
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# Padrão válido para 'location_region': apenas letras e espaços
+REGION_PATTERN = re.compile(r'^[a-zA-Z\s]+$')
+
+# Quantidade máxima de valores distintos lembrados por regra
+RULE_CACHE_SIZE = 65_536
+
+
+def per_value_rule(predicate):
+    """
+    Decora uma regra que valida um único valor, memorizando os resultados.
+
+    A regra é avaliada no máximo uma vez por valor distinto, mesmo ao longo de
+    vários blocos. Use com `validate_by_value` para que o custo da validação
+    dependa da cardinalidade da coluna, e não da quantidade de linhas.
+
+    Args:
+        predicate (callable): Função que recebe um valor e retorna bool.
+
+    Returns:
+        callable: A mesma regra, com cache dos resultados.
+    """
+    return functools.lru_cache(maxsize=RULE_CACHE_SIZE)(predicate)
+
+
+@per_value_rule
+def is_valid_region(value):
+    """
+    Verifica se uma região contém apenas letras e espaços.
+
+    Args:
+        value: Valor de 'location_region'.
+
+    Returns:
+        bool: True se o valor for um texto no padrão `REGION_PATTERN`.
+    """
+    return isinstance(value, str) and REGION_PATTERN.match(value) is not None
+
+
+def validate_by_value(values, rule):
+    """
+    Aplica uma regra uma vez por valor distinto e propaga o resultado às linhas.
+
+    Colunas categóricas usam diretamente seus códigos; as demais são
+    fatoradas. A regra é avaliada sobre os valores distintos e a máscara por
+    linha é obtida indexando o resultado pelos códigos. Valores ausentes são
+    sempre inválidos.
+
+    Args:
+        values (pd.Series): Coluna a validar.
+        rule (callable): Regra por valor, de preferência decorada com
+            `per_value_rule`.
+
+    Returns:
+        np.ndarray: Máscara booleana com True nas linhas válidas.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    # A última posição (código -1) corresponde aos valores ausentes
+    lookup = np.zeros(len(uniques) + 1, dtype=bool)
+    lookup[:-1] = [bool(rule(value)) for value in uniques]
+    return lookup[codes]
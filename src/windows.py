@@ -0,0 +1,297 @@
+import json
+import os
+
+from src.columnar import read_table, write_table
+from src.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Colunas do agregado parcial por região e painel: um painel é um intervalo
+# de 'timestamp' de largura fixa, a menor unidade das janelas
+WINDOW_PARTIAL_COLUMNS = ['location_region', 'pane', 'risk_sum', 'risk_count', 'risk_max']
+
+# Colunas usadas pelas séries de risco por janela
+WINDOW_COLUMNS = ['location_region', 'timestamp', 'risk_score']
+
+_META_FILE = "windows.json"
+_PARTIAL_DIR = "panes"
+
+
+def parse_duration(value):
+    """
+    Converte uma duração em segundos.
+
+    Args:
+        value (int | str): Segundos, ou duração no formato do Pandas
+            (ex.: '1h', '15min', '1D').
+
+    Returns:
+        int: Duração em segundos.
+
+    Raises:
+        ValueError: Se a duração não for um número inteiro positivo de segundos.
+    """
+    if isinstance(value, (int, np.integer)) or str(value).isdigit():
+        seconds = int(value)
+    else:
+        seconds = pd.Timedelta(value).total_seconds()
+        if seconds != int(seconds):
+            raise ValueError(f"Duração deve ser um número inteiro de segundos: {value}")
+        seconds = int(seconds)
+    if seconds <= 0:
+        raise ValueError(f"Duração deve ser positiva: {value}")
+    return seconds
+
+
+def window_partial(df, pane, rows=None):
+    """
+    Calcula soma, contagem e máximo de 'risk_score' por região e painel.
+
+    O painel de cada linha é `timestamp // pane`, calculado de uma vez para
+    todas as linhas, e o agrupamento é vetorizado (sem laço por janela). O
+    resultado é um agregado parcial: parciais de blocos, shards ou execuções
+    diferentes são combinados com `merge_window_partials`.
+
+    Args:
+        df (pd.DataFrame): Linhas com as colunas de `WINDOW_COLUMNS` e
+            'timestamp' em segundos desde a época.
+        pane (int): Largura do painel, em segundos.
+        rows (np.ndarray, optional): Máscara das linhas consideradas (ex.: as
+            válidas de um bloco bruto). Todas, se None.
+
+    Returns:
+        pd.DataFrame: Colunas de `WINDOW_PARTIAL_COLUMNS`.
+    """
+    region = df['location_region']
+    if isinstance(region.dtype, pd.CategoricalDtype):
+        codes, categories = region.cat.codes.to_numpy(), region.cat.categories
+    else:
+        codes, categories = pd.factorize(region)
+    selected = codes >= 0 if rows is None else rows & (codes >= 0)
+    timestamps = df['timestamp'].to_numpy()[selected].astype(np.int64)
+    grouped = pd.DataFrame(
+        {
+            'code': codes[selected],
+            'pane': np.floor_divide(timestamps, pane),
+            'risk': df['risk_score'].to_numpy(dtype='float64')[selected],
+        }
+    ).groupby(['code', 'pane'], sort=False)['risk']
+    partial = pd.DataFrame(
+        {'risk_sum': grouped.sum(), 'risk_count': grouped.count(), 'risk_max': grouped.max()}
+    ).reset_index()
+    partial.insert(0, 'location_region', np.asarray(categories, dtype=object)[partial['code']])
+    return partial[WINDOW_PARTIAL_COLUMNS]
+
+
+def merge_window_partials(partials):
+    """
+    Combina parciais de janela somando somas e contagens e mantendo o máximo.
+
+    Args:
+        partials (list[pd.DataFrame]): Parciais como os de `window_partial`,
+            com a mesma largura de painel.
+
+    Returns:
+        pd.DataFrame: Parcial combinado, no mesmo formato.
+    """
+    combined = pd.concat(partials, ignore_index=True)
+    return (
+        combined.groupby(['location_region', 'pane'], sort=False)
+        .agg(risk_sum=('risk_sum', 'sum'), risk_count=('risk_count', 'sum'),
+             risk_max=('risk_max', 'max'))
+        .reset_index()
+    )
+
+
+def windows_from_partial(partial, pane, width=None):
+    """
+    Gera a série de risco por região e janela a partir do parcial por painel.
+
+    Sem `width` (ou com `width == pane`), as janelas são fixas e disjuntas
+    (tumbling). Com `width` múltiplo de `pane`, as janelas são deslizantes:
+    começam a cada `pane` segundos e cobrem `width // pane` painéis
+    consecutivos. Cada linha do parcial é repetida uma vez por janela que a
+    contém e as janelas são agregadas de uma vez, sem laço por janela; o
+    custo depende apenas dos painéis com dados, não das linhas da entrada.
+
+    Args:
+        partial (pd.DataFrame): Parcial como o de `window_partial`.
+        pane (int): Largura do painel do parcial, em segundos.
+        width (int, optional): Largura da janela, em segundos. Igual a
+            `pane`, se omitido.
+
+    Returns:
+        pd.DataFrame: Colunas 'location_region', 'window_start', 'window_end'
+        (datas em UTC, sem fuso), 'risk_count', 'risk_mean' e 'risk_max', uma
+        linha por região e janela com registros, em ordem de início e região.
+
+    Raises:
+        ValueError: Se `width` não for múltiplo de `pane`.
+    """
+    width = pane if width is None else width
+    if width % pane:
+        raise ValueError(f"Largura da janela ({width}s) não é múltipla do painel ({pane}s)")
+    panes_per_window = width // pane
+
+    # Janela identificada pelo painel inicial: o painel p está nas janelas
+    # que começam em p - n + 1, ..., p
+    rows = np.repeat(np.arange(len(partial)), panes_per_window)
+    offsets = np.tile(np.arange(panes_per_window), len(partial))
+    expanded = partial.iloc[rows].reset_index(drop=True)
+    expanded['start'] = expanded['pane'].to_numpy() - offsets
+    grouped = (
+        expanded.groupby(['location_region', 'start'], sort=False)
+        .agg(risk_count=('risk_count', 'sum'), risk_sum=('risk_sum', 'sum'),
+             risk_max=('risk_max', 'max'))
+        .reset_index()
+    )
+    start = grouped['start'].to_numpy(dtype=np.int64) * pane
+    table = pd.DataFrame(
+        {
+            'location_region': grouped['location_region'].astype(object),
+            'window_start': pd.to_datetime(start, unit='s'),
+            'window_end': pd.to_datetime(start + width, unit='s'),
+            'risk_count': grouped['risk_count'].astype(np.int64),
+            'risk_mean': grouped['risk_sum'] / grouped['risk_count'],
+            'risk_max': grouped['risk_max'],
+        }
+    )
+    return table.sort_values(['window_start', 'location_region']).reset_index(drop=True)
+
+
+def compute_risk_windows(df, width, slide=None):
+    """
+    Calcula a série de risco por região e janela de um DataFrame limpo.
+
+    Example:
+        hourly = compute_risk_windows(df_cleaned, "1h")
+        daily_every_hour = compute_risk_windows(df_cleaned, "1D", slide="1h")
+
+    Args:
+        df (pd.DataFrame): DataFrame limpo.
+        width (int | str): Largura da janela (ver `parse_duration`).
+        slide (int | str, optional): Passo das janelas deslizantes. Janelas
+            fixas, se omitido.
+
+    Returns:
+        pd.DataFrame: Série como a de `windows_from_partial`.
+    """
+    windows = RegionWindows(width, slide)
+    windows.update(df)
+    return windows.table()
+
+
+class RegionWindows:
+    """
+    Série de 'risk_score' por região e janela de tempo, atualizada em blocos.
+
+    Mantém o parcial por região e painel de `window_partial`, com o painel
+    igual ao passo das janelas: a memória depende das regiões e do período
+    coberto, não da quantidade de linhas. É atualizado bloco a bloco (ver
+    `src.fused.aggregate_chunks`) e as instâncias de blocos, shards ou
+    execuções diferentes são combinadas com `merge`.
+
+    Example:
+        windows = RegionWindows("1D", slide="1h")
+        for chunk in chunks:
+            windows.update(chunk, valid)
+        series = windows.table()
+
+    Args:
+        width (int | str): Largura da janela (ver `parse_duration`).
+        slide (int | str, optional): Passo das janelas deslizantes; deve
+            dividir `width`. Janelas fixas (passo igual à largura), se omitido.
+
+    Raises:
+        ValueError: Se o passo não dividir a largura.
+    """
+
+    def __init__(self, width, slide=None):
+        self.width = parse_duration(width)
+        self.pane = self.width if slide is None else parse_duration(slide)
+        if self.width % self.pane:
+            raise ValueError(
+                f"Largura da janela ({self.width}s) não é múltipla do passo ({self.pane}s)"
+            )
+        self.partial = None
+
+    def _add(self, partial):
+        """Combina um parcial por painel ao estado."""
+        if self.partial is None:
+            self.partial = partial
+        else:
+            self.partial = merge_window_partials([self.partial, partial])
+
+    def update(self, chunk, rows=None):
+        """
+        Acrescenta as linhas de um bloco.
+
+        Args:
+            chunk (pd.DataFrame): Bloco com as colunas de `WINDOW_COLUMNS`.
+            rows (np.ndarray, optional): Máscara das linhas consideradas
+                (ex.: as válidas). Todas, se None.
+        """
+        self._add(window_partial(chunk, self.pane, rows))
+
+    def merge(self, other):
+        """
+        Combina as janelas de outra instância a estas (modificadas).
+
+        Args:
+            other (RegionWindows): Janelas com a mesma largura e o mesmo passo.
+
+        Raises:
+            ValueError: Se a largura ou o passo forem diferentes.
+        """
+        if (other.width, other.pane) != (self.width, self.pane):
+            raise ValueError("Janelas com largura ou passo diferentes não podem ser combinadas")
+        if other.partial is not None:
+            self._add(other.partial)
+
+    def table(self):
+        """
+        Gera a série de risco por região e janela.
+
+        Returns:
+            pd.DataFrame: Série como a de `windows_from_partial`.
+        """
+        partial = self.partial
+        if partial is None:
+            partial = pd.DataFrame(columns=WINDOW_PARTIAL_COLUMNS)
+        return windows_from_partial(partial, self.pane, self.width)
+
+    def save(self, path):
+        """
+        Grava o parcial por painel em um diretório (tabela colunar, sem pickle).
+
+        Args:
+            path (str): Diretório de destino (criado se necessário).
+        """
+        os.makedirs(path, exist_ok=True)
+        if self.partial is not None:
+            write_table(self.partial, os.path.join(path, _PARTIAL_DIR))
+        with open(os.path.join(path, _META_FILE), 'w') as f:
+            json.dump({'width': self.width, 'slide': self.pane}, f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carrega janelas gravadas por `save`.
+
+        Args:
+            path (str): Diretório das janelas.
+
+        Returns:
+            RegionWindows: Janelas carregadas.
+
+        Raises:
+            FileNotFoundError: Se as janelas não existirem.
+        """
+        with open(os.path.join(path, _META_FILE)) as f:
+            info = json.load(f)
+        windows = cls(info['width'], info['slide'])
+        partial_path = os.path.join(path, _PARTIAL_DIR)
+        if os.path.exists(partial_path):
+            windows.partial = read_table(partial_path, mmap=False)
+        return windows
@@ -0,0 +1,143 @@
+import os
+
+import pandas as pd
+from src import cache, main
+from src.cache import evict_lru, load_cached, run_cached, stage_key, store_cached
+from src.main import clean_data_streaming, cleaning_cache_params, run_batch
+from src.synthetic import write_transactions
+
+
+def test_run_cached_reaproveita_ate_a_entrada_mudar(tmpdir):
+    """
+    Testa que uma etapa só é reexecutada quando a entrada ou os parâmetros mudam.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e o cache.
+
+    Asserções:
+        Verifica a quantidade de execuções da etapa e as tabelas retornadas.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    cache_dir = str(tmpdir.join("cache"))
+    pd.DataFrame({"amount": [1.0, 2.0]}).to_csv(input_path, index=False)
+    calls = []
+
+    def stage():
+        calls.append(1)
+        df = pd.read_csv(input_path)
+        return {"table": df}, {"rows": len(df)}
+
+    first, meta = run_cached(cache_dir, "stage", [input_path], {"k": 3}, stage)
+    second, _ = run_cached(cache_dir, "stage", [input_path], {"k": 3}, stage)
+    assert len(calls) == 1
+    assert meta == {"rows": 2}
+    pd.testing.assert_frame_equal(second["table"], first["table"])
+
+    run_cached(cache_dir, "stage", [input_path], {"k": 4}, stage)
+    assert len(calls) == 2
+
+    pd.DataFrame({"amount": [1.0, 2.0, 3.0]}).to_csv(input_path, index=False)
+    third, meta = run_cached(cache_dir, "stage", [input_path], {"k": 3}, stage)
+    assert len(calls) == 3
+    assert meta == {"rows": 3}
+    assert third["table"]["amount"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_evict_lru_remove_entradas_menos_usadas(tmpdir):
+    """
+    Testa que a remoção por tamanho descarta primeiro as entradas acessadas há
+    mais tempo.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o cache.
+
+    Asserções:
+        Verifica quais entradas permanecem após a remoção.
+    """
+    cache_dir = str(tmpdir)
+    df = pd.DataFrame({"amount": range(1000)})
+    for i, key in enumerate(["a", "b", "c"]):
+        store_cached(cache_dir, key, {"table": df})
+        os.utime(os.path.join(cache_dir, key, "_entry.json"), (i, i))
+
+    # Acesso a "a" a torna a entrada mais recente
+    assert load_cached(cache_dir, "a") is not None
+    entry_size = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(os.path.join(cache_dir, "b"))
+        for name in files
+    )
+
+    assert evict_lru(cache_dir, max_bytes=2 * entry_size) == ["b"]
+    assert load_cached(cache_dir, "b") is None
+    assert load_cached(cache_dir, "c") is not None
+    assert stage_key("s", [], {}) != stage_key("t", [], {})
+
+
+def test_run_batch_em_blocos_restaura_a_saida_limpa(tmpdir, monkeypatch):
+    """
+    Testa o cache do pipeline em lote com limpeza em blocos: a tabela
+    particionada é restaurada do cache e as tabelas são calculadas parte a
+    parte.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada, as
+            saídas e o cache.
+        monkeypatch (pytest.MonkeyPatch): Conta as execuções da limpeza.
+
+    Asserções:
+        Verifica que a saída limpa é restaurada, sem nova limpeza, em uma
+        execução com outra janela e que as tabelas são as mesmas do lote sem
+        blocos.
+    """
+    input_file = str(tmpdir.join("input.csv"))
+    cache_dir = str(tmpdir.join("cache"))
+    write_transactions(input_file, 5_000, block_rows=2_000, addresses=200, seed=8)
+    window = (1_600_000_000, 1_650_000_000)
+    calls = []
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return clean_data_streaming(*args, **kwargs)
+
+    monkeypatch.setattr(main, "clean_data_streaming", counted)
+    run_batch(input_file, str(tmpdir.join("first")), 1_500, cache_dir=cache_dir)
+    output_dir = str(tmpdir.join("second"))
+    result = run_batch(input_file, output_dir, 1_500, cache_dir=cache_dir, window=window)
+    assert len(calls) == 1
+    assert os.listdir(os.path.join(output_dir, "cleaned_data"))
+
+    expected = run_batch(input_file, str(tmpdir.join("whole")), window=window)
+    pd.testing.assert_frame_equal(result[0], expected[0])
+    pd.testing.assert_frame_equal(result[1], expected[1])
+    assert result[2] == expected[2]
+
+
+def test_chave_considera_formato_e_tarefas_do_dag(tmpdir, monkeypatch):
+    """
+    Testa que a chave de cache da limpeza depende do formato da saída e que
+    a versão do código considera os fontes das tarefas do DAG.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário com fontes de exemplo.
+        monkeypatch (pytest.MonkeyPatch): Aponta a versão do código para os
+            fontes de exemplo.
+
+    Asserções:
+        Verifica que formatos diferentes geram chaves diferentes e que editar
+        uma tarefa muda a versão do código.
+    """
+    assert stage_key("cleaning", [], cleaning_cache_params("partitioned")) != stage_key(
+        "cleaning", [], cleaning_cache_params("table")
+    )
+
+    source_dir = tmpdir.mkdir("src")
+    tasks_dir = tmpdir.mkdir("dags").mkdir("tasks")
+    source_dir.join("main.py").write("x = 1\n")
+    task = tasks_dir.join("data_task.py")
+    task.write("y = 1\n")
+    monkeypatch.setattr(cache, "_SOURCE_DIR", str(source_dir))
+    monkeypatch.setattr(cache, "_VERSIONED_DIRS", (str(source_dir), str(tasks_dir)))
+    version = cache.code_version()
+    task.write("y = 2\n")
+    assert cache.code_version() != version
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from src.columnar import append_table, read_table, table_columns, write_table
+
+
+def test_columnar_preserva_tipos(tmpdir):
+    """
+    Testa a gravação e leitura de uma tabela colunar, verificando se os tipos
+    são preservados e se a projeção de colunas funciona.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário onde a tabela será armazenada.
+
+    Asserções:
+        Verifica os dtypes lidos, os valores e que apenas as colunas pedidas
+        são carregadas.
+    """
+    path = str(tmpdir.join("tabela"))
+    df = pd.DataFrame(
+        {
+            "location_region": ["Europe", "Asia", None],
+            "risk_score": np.array([10.5, 20.25, 30.0], dtype="float32"),
+            "timestamp": np.array([1000, 2000, 3000], dtype="int64"),
+        }
+    )
+    write_table(df, path)
+
+    projected = read_table(path, columns=["risk_score", "timestamp"])
+    full = read_table(path)
+
+    assert table_columns(path) == ["location_region", "risk_score", "timestamp"]
+    assert list(projected.columns) == ["risk_score", "timestamp"]
+    assert projected["risk_score"].dtype == np.float32
+    assert projected["timestamp"].dtype == np.int64
+    assert isinstance(full["location_region"].dtype, pd.CategoricalDtype)
+    assert full["location_region"].tolist()[:2] == ["Europe", "Asia"]
+    assert pd.isna(full["location_region"].iloc[2])
+
+
+def test_columnar_acrescenta_partes(tmpdir):
+    """
+    Testa a gravação em blocos de uma tabela colunar, com categorias
+    diferentes em cada parte.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário onde a tabela será armazenada.
+
+    Asserções:
+        Verifica se a leitura concatena as partes na ordem em que foram gravadas.
+    """
+    path = str(tmpdir.join("tabela"))
+    append_table(pd.DataFrame({"region": ["Asia"], "amount": [1.0]}), path)
+    append_table(pd.DataFrame({"region": ["Africa", "Asia"], "amount": [2.0, 3.0]}), path)
+
+    df = read_table(path)
+
+    assert df["region"].tolist() == ["Asia", "Africa", "Asia"]
+    assert df["amount"].tolist() == [1.0, 2.0, 3.0]
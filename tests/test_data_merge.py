@@ -0,0 +1,129 @@
+import pandas as pd
+from dags.tasks.data_merge import data_merge
+from dags.tasks.data_shard import data_shard
+from dags.tasks.data_split import data_split
+from src.engines import ENGINES
+from src.main import clean_data_streaming, run_batch
+from src.partitioned import read_partitioned
+from src.synthetic import write_transactions
+
+
+def _run_dag(input_path, tmpdir, n_shards=3, split_options=None, **options):
+    """Executa as tarefas do DAG principal em sequência, como o agendador."""
+    shards = data_split(
+        input_path, n_shards, str(tmpdir.join("shards")), 1_000, **(split_options or {})
+    )
+    shard_paths = [data_shard(**shard) for shard in shards]
+    data_merge(
+        shard_paths,
+        str(tmpdir.join("cleaned_data")),
+        str(tmpdir.join("table1")),
+        str(tmpdir.join("table2")),
+        **options,
+    )
+
+
+def test_dag_principal_grava_a_saida_limpa_e_as_tabelas(tmpdir):
+    """
+    Testa as tarefas do DAG principal (divisão, shards e redução) sobre uma
+    entrada sintética com linhas inválidas.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada, os
+            shards e as saídas.
+
+    Asserções:
+        Verifica, com cada motor de cálculo, que as tabelas (em CSV) são as do
+        pipeline em lote e que a tabela limpa gravada pelo DAG tem as mesmas
+        linhas da limpeza em blocos.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    write_transactions(input_path, 3_000, block_rows=1_500, addresses=200, seed=6)
+    table1, table2, _ = run_batch(input_path, str(tmpdir.join("batch")))
+    streaming_path = str(tmpdir.join("streaming"))
+    clean_data_streaming(input_path, streaming_path, 1_000, "partitioned")
+
+    for engine in ENGINES:
+        run_dir = tmpdir.mkdir(engine)
+        _run_dag(input_path, run_dir, split_options={"engine": engine})
+        assert run_dir.join("table1.csv").read() == table1.to_csv(index=False)
+        assert run_dir.join("table2.csv").read() == table2.to_csv(index=False)
+        pd.testing.assert_frame_equal(
+            read_partitioned(str(run_dir.join("cleaned_data"))),
+            read_partitioned(streaming_path),
+            check_categorical=False,
+        )
+
+
+def test_dag_principal_grava_a_quarentena(tmpdir):
+    """
+    Testa a quarentena das linhas rejeitadas gravada pelos shards e combinada
+    na redução.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada, os
+            shards e as saídas.
+
+    Asserções:
+        Verifica que a quarentena do DAG é a mesma da limpeza em blocos e que,
+        sem `quarantine`, ela não é gravada.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    write_transactions(input_path, 3_000, block_rows=1_500, addresses=200, seed=7)
+    expected = str(tmpdir.join("expected.csv"))
+    clean_data_streaming(
+        input_path, str(tmpdir.join("streaming")), 1_000, "partitioned", quarantine_path=expected
+    )
+
+    quarantine_path = tmpdir.join("quarantine.csv")
+    _run_dag(
+        input_path,
+        tmpdir.mkdir("with"),
+        split_options={"quarantine": True},
+        quarantine_path=str(quarantine_path),
+    )
+    assert quarantine_path.read() == tmpdir.join("expected.csv").read()
+    assert len(pd.read_csv(str(quarantine_path))) > 0
+
+    quarantine_path.remove()
+    _run_dag(input_path, tmpdir.mkdir("without"), quarantine_path=str(quarantine_path))
+    assert not quarantine_path.exists()
+
+
+def test_dag_principal_com_padrao_glob_e_arquivos_comprimidos(tmpdir):
+    """
+    Testa as tarefas do DAG principal sobre um padrão glob com arquivos
+    comprimidos e sem compressão, e sobre um único arquivo comprimido.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para as entradas, os
+            shards e as saídas.
+
+    Asserções:
+        Verifica que tabelas e tabela limpa são as do pipeline em lote sobre a
+        mesma entrada, com os arquivos comprimidos lidos inteiros em um shard
+        cada.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    write_transactions(input_path, 4_500, block_rows=1_500, addresses=150, seed=8)
+    df = pd.read_csv(input_path)
+    parts = tmpdir.mkdir("parts")
+    df.iloc[:2_000].to_csv(str(parts.join("part-0.csv")), index=False)
+    df.iloc[2_000:3_500].to_csv(str(parts.join("part-1.csv.gz")), index=False)
+    df.iloc[3_500:].to_csv(str(parts.join("part-2.csv")), index=False)
+    df.to_csv(str(tmpdir.join("input.csv.gz")), index=False)
+
+    for name, pattern in (("glob", str(parts.join("part-*.csv*"))),
+                          ("gz", str(tmpdir.join("input.csv.gz")))):
+        table1, table2, _ = run_batch(pattern, str(tmpdir.join(f"batch-{name}")), 1_000)
+        run_dir = tmpdir.mkdir(name)
+        _run_dag(pattern, run_dir, n_shards=4)
+        shards = data_split(pattern, 4, str(run_dir.join("plan")))
+        assert [shard["end"] for shard in shards if shard["input_path"].endswith(".gz")] == [None]
+        assert run_dir.join("table1.csv").read() == table1.to_csv(index=False)
+        assert run_dir.join("table2.csv").read() == table2.to_csv(index=False)
+        pd.testing.assert_frame_equal(
+            read_partitioned(str(run_dir.join("cleaned_data"))),
+            read_partitioned(str(tmpdir.join(f"batch-{name}", "cleaned_data"))),
+            check_categorical=False,
+        )
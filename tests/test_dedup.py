@@ -0,0 +1,259 @@
+import logging
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+from dags.tasks.data_merge import data_merge
+from dags.tasks.data_shard import data_shard
+from dags.tasks.data_split import data_split
+from src.dedup import DedupIndex
+from src.main import clean_data, compute_table1, compute_table2, run_batch
+from src.partitioned import read_partitioned
+from src.windows import compute_risk_windows
+
+
+def _transactions(n=2000, seed=9):
+    """Gera transações distintas, algumas com valores inválidos."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "timestamp": 1_700_000_000 + np.arange(n) * 60,
+            "sending_address": [f"s{i}" for i in rng.integers(0, 300, n)],
+            "receiving_address": [f"r{i}" for i in rng.integers(0, 300, n)],
+            "amount": rng.uniform(0, 1000, n).round(2),
+            "transaction_type": rng.choice(["sale", "purchase", "transfer"], n),
+            "location_region": rng.choice(["Europe", "Asia", "0"], n),
+            "risk_score": rng.uniform(0, 100, n).round(1),
+        }
+    )
+    df.loc[::50, "amount"] = None
+    return df
+
+
+def test_indice_com_falsos_positivos_e_persistencia(tmpdir):
+    """
+    Testa o índice com um filtro de Bloom pequeno, forçando falsos positivos
+    e o crescimento do filtro, e a releitura do índice gravado.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o índice.
+
+    Asserções:
+        Verifica que chaves novas não são descartadas por falsos positivos do
+        filtro, que repetições no mesmo bloco são descartadas e que o índice
+        reaberto reconhece todas as chaves.
+    """
+    rng = np.random.default_rng(1)
+    keys = rng.integers(0, 2**63, 50_000, dtype=np.uint64)
+    index = DedupIndex(capacity=1000, false_positive_rate=0.2)
+
+    first = index.add_new(np.concatenate([keys[:20_000], keys[:10]]))
+    assert first.sum() == 20_000 and not first[20_000:].any()
+    assert index.capacity >= 20_000
+    assert index.add_new(keys[10_000:50_000]).sum() == 30_000
+    assert not index.contains(rng.integers(0, 2**63, 10_000, dtype=np.uint64)).any()
+
+    path = str(tmpdir.join("dedup"))
+    index.save(path)
+    reopened = DedupIndex.open(path)
+    assert len(reopened) == 50_000
+    assert reopened.contains(keys).all()
+    assert not reopened.add_new(keys[::7]).any()
+    # Filtro empacotado: um bit por posição também na memória
+    assert reopened._bloom.nbytes * 8 == reopened._bloom_bits
+
+
+def test_series_pendentes_combinadas_por_tamanho(tmpdir):
+    """
+    Testa o acúmulo de muitos lotes pequenos de chaves novas antes da
+    gravação do índice.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o índice.
+
+    Asserções:
+        Verifica que as séries pendentes ficam ordenadas, em ordem decrescente
+        de tamanho e em quantidade logarítmica, e que o índice gravado tem
+        todas as chaves em ordem.
+    """
+    rng = np.random.default_rng(3)
+    keys = rng.integers(0, 2**63, 20_000, dtype=np.uint64)
+    index = DedupIndex(capacity=1000)
+    for batch in np.array_split(keys, 2000):
+        index.add_new(batch)
+        sizes = [len(run) for run in index._pending]
+        assert all(larger > 2 * smaller for larger, smaller in zip(sizes, sizes[1:]))
+        assert len(sizes) <= 16
+    assert all((run[1:] > run[:-1]).all() for run in index._pending)
+    assert index.contains(keys).all()
+
+    path = str(tmpdir.join("dedup"))
+    index.save(path)
+    np.testing.assert_array_equal(DedupIndex.open(path).keys, np.unique(keys))
+
+
+def test_gravacao_interrompida_mantem_o_indice(tmpdir, monkeypatch):
+    """
+    Testa que uma falha durante a gravação do índice não corrompe a versão
+    já gravada.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o índice.
+        monkeypatch (pytest.MonkeyPatch): Faz a gravação do filtro falhar.
+
+    Asserções:
+        Verifica que, após a falha, o índice reaberto é o da gravação
+        anterior e que uma nova gravação substitui a versão anterior.
+    """
+    rng = np.random.default_rng(2)
+    keys = rng.integers(0, 2**63, 3_000, dtype=np.uint64)
+    path = str(tmpdir.join("dedup"))
+    index = DedupIndex(path, capacity=1000)
+    index.add_new(keys[:1000])
+    index.save()
+
+    index.add_new(keys[1000:])
+    save = np.save
+
+    def failing_save(file, array, *args, **kwargs):
+        if str(file).endswith("bloom.npy"):
+            raise OSError("disco cheio")
+        return save(file, array, *args, **kwargs)
+
+    monkeypatch.setattr(np, "save", failing_save)
+    with pytest.raises(OSError):
+        index.save()
+    monkeypatch.undo()
+
+    reopened = DedupIndex.open(path)
+    assert len(reopened) == 1000
+    assert reopened.contains(keys[:1000]).all()
+
+    index.save()
+    assert len(DedupIndex.open(path)) == 3000
+    assert sorted(os.listdir(path)) == ["_dedup.json", "v1"]
+
+
+def test_reentregas_entre_execucoes(tmpdir):
+    """
+    Testa a ingestão de arquivos sobrepostos em duas execuções com o mesmo
+    índice, nos modos em memória e em blocos.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para as entradas e saídas.
+
+    Asserções:
+        Verifica que cada transação é contada uma única vez, que as tabelas
+        são as das transações distintas e que as reentregas aparecem como
+        'duplicate' nas rejeições.
+    """
+    df = _transactions()
+    first_path = str(tmpdir.join("first.csv"))
+    second_path = str(tmpdir.join("second.csv"))
+    df.iloc[:1200].to_csv(first_path, index=False)
+    # Segunda entrega: reenvia 700 transações da primeira, repete uma linha
+    # e traz 800 novas
+    pd.concat([df.iloc[500:1200], df.iloc[[1500]], df.iloc[1200:]]).to_csv(
+        second_path, index=False
+    )
+    new = clean_data(df.iloc[1200:])
+    duplicates = len(clean_data(pd.read_csv(second_path))) - len(new)
+
+    for chunksize in (None, 300):
+        dedup_dir = str(tmpdir.join(f"dedup-{chunksize}"))
+        output_dir = str(tmpdir.join(f"output-{chunksize}"))
+        run_batch(first_path, output_dir, chunksize, dedup_dir=dedup_dir)
+        table1, table2, metrics = run_batch(
+            second_path, output_dir, chunksize, dedup_dir=dedup_dir
+        )
+
+        assert metrics["rejections"]["duplicate"] == duplicates
+        assert metrics["valid_records"] == len(new)
+        assert len(DedupIndex.open(dedup_dir)) == len(clean_data(df))
+        expected1 = compute_table1(new)
+        assert table1["location_region"].tolist() == expected1["location_region"].tolist()
+        np.testing.assert_allclose(table1["risk_score"], expected1["risk_score"])
+        pd.testing.assert_frame_equal(
+            table2.reset_index(drop=True),
+            compute_table2(new).reset_index(drop=True),
+            check_dtype=False,
+            check_categorical=False,
+        )
+
+
+def test_dag_principal_descarta_reentregas(tmpdir, caplog):
+    """
+    Testa a deduplicação no DAG principal, com transações repetidas dentro de
+    um shard, entre shards e entre execuções.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada, os
+            shards, o índice e as saídas.
+        caplog (pytest.LogCaptureFixture): Captura o log de `data_merge`.
+
+    Asserções:
+        Verifica que tabelas, tabela limpa e série de risco por janela são as
+        da limpeza em blocos com o mesmo índice, que as repetições de shards
+        anteriores são descartadas sem reler a entrada e que a mesma entrada,
+        reentregue, não gera novas linhas.
+    """
+    df = _transactions()
+    input_path = str(tmpdir.join("input.csv"))
+    # Reentregas de linhas de shards anteriores e uma linha repetida
+    pd.concat([df.iloc[:1200], df.iloc[500:900], df.iloc[[1500, 1500]], df.iloc[1200:]]).to_csv(
+        input_path, index=False
+    )
+    table1, table2, _ = run_batch(
+        input_path, str(tmpdir.join("batch")), 300, dedup_dir=str(tmpdir.join("batch-dedup"))
+    )
+
+    dedup_dir = str(tmpdir.join("dedup"))
+
+    def run_dag(run_dir):
+        shards = data_split(
+            input_path,
+            4,
+            str(run_dir.join("shards")),
+            300,
+            sketches=True,
+            risk_window="1h",
+            dedup_dir=dedup_dir,
+        )
+        shard_paths = [data_shard(**shard) for shard in shards]
+        # A combinação não relê a entrada
+        os.rename(input_path, f"{input_path}.moved")
+        try:
+            data_merge(
+                shard_paths,
+                str(run_dir.join("cleaned_data")),
+                str(run_dir.join("table1")),
+                str(run_dir.join("table2")),
+                str(run_dir.join("region_stats")),
+                str(run_dir.join("risk_windows")),
+                dedup_dir=dedup_dir,
+            )
+        finally:
+            os.rename(f"{input_path}.moved", input_path)
+
+    run_dir = tmpdir.mkdir("dag")
+    with caplog.at_level(logging.INFO):
+        run_dag(run_dir)
+    assert run_dir.join("table1.csv").read() == table1.to_csv(index=False)
+    assert run_dir.join("table2.csv").read() == table2.to_csv(index=False)
+    cleaned = read_partitioned(str(run_dir.join("cleaned_data")))
+    expected = read_partitioned(str(tmpdir.join("batch", "cleaned_data")))
+    pd.testing.assert_frame_equal(cleaned, expected[cleaned.columns], check_categorical=False)
+    windows = pd.read_csv(str(run_dir.join("risk_windows.csv")))
+    expected_windows = compute_risk_windows(expected, "1h")
+    np.testing.assert_allclose(windows["risk_count"], expected_windows["risk_count"])
+    np.testing.assert_allclose(windows["risk_mean"], expected_windows["risk_mean"], rtol=1e-5)
+    assert len(DedupIndex.open(dedup_dir)) == len(cleaned)
+    # As reentregas do segundo shard em diante vêm de shards anteriores
+    assert re.search(r"repetidas entre shards: [1-9]", caplog.text)
+
+    # Reentrega da mesma entrada: nenhuma linha nova, e o índice não muda
+    with pytest.raises(ValueError):
+        run_dag(tmpdir.mkdir("again"))
+    assert len(DedupIndex.open(dedup_dir)) == len(cleaned)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.engines import ENGINES, get_engine
+from src.main import run_batch
+from src.synthetic import generate_transactions, write_transactions
+
+
+def _assert_same_tables(df):
+    """Compara as Tabelas 1 e 2 de todos os motores com as do Pandas."""
+    reference = get_engine("pandas")
+    for name in ENGINES:
+        engine = get_engine(name)
+        pd.testing.assert_frame_equal(engine.table1(df), reference.table1(df), check_exact=True)
+        for k in (1, 3, 50):
+            pd.testing.assert_frame_equal(
+                engine.table2(df, k), reference.table2(df, k), check_exact=True
+            )
+
+
+def test_motores_identicos_na_limpeza_e_nas_tabelas():
+    """
+    Testa a paridade dos motores sobre transações sintéticas com linhas
+    inválidas.
+
+    Asserções:
+        Verifica que a limpeza (valores, tipos e rótulos das linhas) e as
+        tabelas 1 e 2 são idênticas entre os motores.
+    """
+    raw = generate_transactions(20_000, regions=7, addresses=300, invalid_ratio=0.2, seed=5)
+    cleaned = {name: get_engine(name).clean(raw.copy()) for name in ENGINES}
+    for name in ENGINES:
+        pd.testing.assert_frame_equal(cleaned[name], cleaned["pandas"], check_exact=True)
+
+    _assert_same_tables(cleaned["pandas"])
+
+
+def test_motores_identicos_em_colunas_de_texto_e_empates():
+    """
+    Testa a paridade em casos de borda: colunas de texto (não categóricas),
+    médias empatadas, somas que a soma ingênua arredondaria diferente e
+    ausência de vendas.
+
+    Asserções:
+        Verifica que as tabelas 1 e 2 são idênticas entre os motores.
+    """
+    rng = np.random.default_rng(3)
+    n = 50_000
+    df = pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "Africa", "Oceania"], n),
+            "risk_score": (rng.random(n) * 100).astype("float32"),
+            "transaction_type": rng.choice(["sale", "purchase"], n),
+            "receiving_address": [f"r{i}" for i in rng.integers(0, 500, n)],
+            "amount": rng.uniform(0, 1000, n).round(0),
+            "timestamp": rng.integers(0, 1000, n),
+        }
+    ).astype({"location_region": object, "receiving_address": object})
+    _assert_same_tables(df)
+
+    ties = df.head(4).assign(risk_score=np.float32(10), amount=5.0)
+    _assert_same_tables(ties)
+    _assert_same_tables(df.assign(transaction_type="purchase"))
+
+
+def test_run_batch_com_cada_motor(tmpdir):
+    """
+    Testa o pipeline em lote com cada motor, com e sem limpeza em blocos.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e a saída.
+
+    Asserções:
+        Verifica que tabelas e métricas são as mesmas com todos os motores e
+        que um motor desconhecido é rejeitado.
+    """
+    input_file = str(tmpdir.join("input.csv"))
+    write_transactions(input_file, 8_000, block_rows=3_000, addresses=200, seed=2)
+
+    for chunksize in (None, 2_500):
+        results = {
+            name: run_batch(input_file, str(tmpdir.mkdir(f"{name}-{chunksize}")), chunksize,
+                            engine=name)
+            for name in ENGINES
+        }
+        table1, table2, metrics = results["pandas"]
+        for name in ENGINES:
+            pd.testing.assert_frame_equal(results[name][0], table1, check_exact=True)
+            pd.testing.assert_frame_equal(results[name][1], table2, check_exact=True)
+            assert results[name][2] == metrics
+
+    with pytest.raises(ValueError):
+        get_engine("spark")
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from src import fused
+from src.fused import run_fused
+from src.main import clean_data, compute_table1, compute_table2
+
+
+def test_fused_igual_as_etapas_separadas(tmpdir):
+    """
+    Testa o modo de passagem única, verificando que tabelas e métricas são as
+    mesmas da limpeza seguida do cálculo de cada tabela.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o arquivo CSV.
+
+    Asserções:
+        Verifica as métricas de limpeza e de qualidade e as tabelas 1 e 2.
+    """
+    rng = np.random.default_rng(7)
+    n = 3000
+    df = pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "North America", "??"], n),
+            "risk_score": rng.choice(["10.5", "80", "x", ""], n),
+            "transaction_type": rng.choice(["sale", "purchase", None], n),
+            "receiving_address": [f"addr{i}" for i in rng.integers(0, 300, n)],
+            "amount": rng.uniform(0, 1000, n).round(2),
+            "timestamp": rng.integers(0, 500, n),
+        }
+    )
+    input_path = str(tmpdir.join("input.csv"))
+    df.to_csv(input_path, index=False)
+
+    table1, table2, metrics, quality = run_fused(input_path, chunksize=700, k=5)
+
+    expected = clean_data(pd.read_csv(input_path))
+    assert metrics["total_records"] == n
+    assert metrics["valid_records"] == len(expected)
+    assert quality["total_records"] == len(expected)
+    assert quality["missing_values"] == int(expected.isnull().sum().sum())
+    pd.testing.assert_frame_equal(table1, compute_table1(expected), check_exact=False)
+    pd.testing.assert_frame_equal(table2, compute_table2(expected, k=5))
+
+
+def test_fused_combina_blocos_em_lotes(tmpdir, monkeypatch):
+    """
+    Testa a combinação dos agregados dos blocos em lotes, com lotes limitados
+    por quantidade de blocos e por quantidade de vendas pendentes.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o arquivo CSV.
+        monkeypatch (pytest.MonkeyPatch): Ajusta o tamanho dos lotes.
+
+    Asserções:
+        Verifica que as tabelas são as mesmas da limpeza seguida do cálculo
+        de cada tabela, com qualquer tamanho de lote.
+    """
+    rng = np.random.default_rng(11)
+    n = 4000
+    df = pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "Africa"], n),
+            "risk_score": rng.uniform(0, 100, n).round(1),
+            "transaction_type": rng.choice(["sale", "purchase"], n),
+            "receiving_address": [f"addr{i}" for i in rng.integers(0, 400, n)],
+            "amount": rng.integers(0, 50, n).astype(float),
+            "timestamp": rng.integers(0, 100, n),
+        }
+    )
+    input_path = str(tmpdir.join("input.csv"))
+    df.to_csv(input_path, index=False)
+    expected = clean_data(pd.read_csv(input_path))
+
+    for chunks, rows in ((1, 10**6), (3, 10**6), (16, 10**6), (16, 40)):
+        monkeypatch.setattr(fused, "MERGE_BATCH_CHUNKS", chunks)
+        monkeypatch.setattr(fused, "MERGE_BATCH_ROWS", rows)
+        table1, table2, _, _ = run_fused(input_path, chunksize=90, k=10)
+        pd.testing.assert_frame_equal(table1, compute_table1(expected), check_exact=False)
+        pd.testing.assert_frame_equal(table2, compute_table2(expected, k=10))
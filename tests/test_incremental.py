@@ -0,0 +1,109 @@
+import pandas as pd
+from src.incremental import update_incremental
+
+
+def _write_rows(path, rows, mode="w"):
+    """Grava (ou anexa) linhas de transações em um arquivo CSV."""
+    pd.DataFrame(rows).to_csv(path, mode=mode, header=(mode == "w"), index=False)
+
+
+ROWS = [
+    {"location_region": "Europe", "risk_score": 10, "transaction_type": "sale",
+     "receiving_address": "addr1", "amount": 100, "timestamp": 1000},
+    {"location_region": "Asia", "risk_score": 30, "transaction_type": "sale",
+     "receiving_address": "addr2", "amount": 300, "timestamp": 1000},
+    {"location_region": "Europe", "risk_score": "x", "transaction_type": "sale",
+     "receiving_address": "addr3", "amount": 900, "timestamp": 1000},
+    {"location_region": "Europe", "risk_score": 50, "transaction_type": "sale",
+     "receiving_address": "addr2", "amount": 50, "timestamp": 2000},
+    {"location_region": "Asia", "risk_score": 70, "transaction_type": "purchase",
+     "receiving_address": "addr1", "amount": 700, "timestamp": 3000},
+]
+
+
+def test_incremental_igual_ao_completo(tmpdir):
+    """
+    Testa o processamento incremental, verificando que processar a entrada em
+    duas execuções (com anexação entre elas) gera as mesmas tabelas que o
+    processamento completo.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e o estado.
+
+    Asserções:
+        Verifica as contagens de registros novos e as tabelas 1 e 2.
+    """
+    from src.main import clean_data, compute_table1
+
+    input_path = str(tmpdir.join("input.csv"))
+    state_dir = str(tmpdir.join("state"))
+
+    _write_rows(input_path, ROWS[:3])
+    _, _, first = update_incremental(input_path, state_dir, chunksize=2)
+    _write_rows(input_path, ROWS[3:], mode="a")
+    table1, table2, second = update_incremental(input_path, state_dir, chunksize=2)
+    _, _, third = update_incremental(input_path, state_dir, chunksize=2)
+
+    expected = clean_data(pd.read_csv(input_path))
+
+    assert (first["new_records"], second["new_records"]) == (3, 2)
+    assert third["new_records"] == 0
+    assert (third["total_records"], third["valid_records"]) == (5, 4)
+    pd.testing.assert_frame_equal(table1, compute_table1(expected))
+    assert table2["receiving_address"].tolist() == ["addr1", "addr2"]
+    assert table2["amount"].tolist() == [100.0, 50.0]
+
+
+def test_incremental_reprocessa_entrada_reescrita(tmpdir):
+    """
+    Testa que o estado é descartado quando a entrada é reescrita.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e o estado.
+
+    Asserções:
+        Verifica se, após a reescrita, apenas o conteúdo novo é considerado.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    state_dir = str(tmpdir.join("state"))
+
+    _write_rows(input_path, ROWS)
+    update_incremental(input_path, state_dir)
+    _write_rows(input_path, ROWS[:1])
+    table1, _, stats = update_incremental(input_path, state_dir)
+
+    assert stats["total_records"] == 1
+    assert table1["location_region"].tolist() == ["Europe"]
+
+
+def test_incremental_regrava_apenas_as_particoes_alteradas(tmpdir):
+    """
+    Testa que uma anexação carrega e regrava apenas as partições da última
+    venda com endereços do trecho novo, e que a Tabela 2 acompanha um `k`
+    maior que o dos candidatos guardados.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e o estado.
+
+    Asserções:
+        Verifica as versões das partições após a anexação de uma venda e a
+        Tabela 2 com `k` maior contra `compute_table2`.
+    """
+    from src.incremental import load_state
+    from src.main import clean_data, compute_table2
+
+    input_path = str(tmpdir.join("input.csv"))
+    state_dir = str(tmpdir.join("state"))
+
+    rows = [dict(ROWS[0], receiving_address=f"addr{i}", amount=i) for i in range(40)]
+    _write_rows(input_path, rows)
+    update_incremental(input_path, state_dir, k=2)
+    before = load_state(state_dir)["bucket_versions"]
+    _write_rows(input_path, [dict(ROWS[0], receiving_address="addr7", amount=1000)], mode="a")
+    _, table2, _ = update_incremental(input_path, state_dir, k=5)
+    after = load_state(state_dir)["bucket_versions"]
+
+    changed = [bucket for bucket, version in enumerate(after) if version != before[bucket]]
+    assert len(changed) == 1 and after[changed[0]] == 1
+    expected = compute_table2(clean_data(pd.read_csv(input_path)), k=5).reset_index(drop=True)
+    pd.testing.assert_frame_equal(table2, expected, check_dtype=False)
@@ -0,0 +1,153 @@
+import os
+import sys
+import types
+
+import pandas as pd
+import src.ingestion
+from src.ingestion import (
+    expand_inputs,
+    iter_csv_files,
+    iter_csv_parallel,
+    read_csv_parallel,
+    split_ranges,
+)
+from src.lazy import lazy_import
+from src.main import load_data
+from src.schema import apply_schema
+from src.synthetic import write_transactions
+
+
+def test_leitura_paralela_igual_a_sequencial(tmpdir, monkeypatch):
+    """
+    Testa a leitura paralela por intervalos de bytes, verificando que os
+    intervalos cobrem o arquivo e que os dados lidos são os mesmos da leitura
+    sequencial.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o arquivo CSV.
+        monkeypatch (pytest.MonkeyPatch): Troca o diretório dos arquivos
+            trocados com os processos.
+
+    Asserções:
+        Verifica a cobertura dos intervalos, o índice dos blocos, os valores
+        de cada coluna, que as colunas usam os arquivos mapeados sem cópia e
+        que nenhum arquivo de troca sobra, mesmo com a leitura interrompida.
+    """
+    shared_dir = tmpdir.mkdir("shared")
+    monkeypatch.setattr("src.ingestion._SHARED_DIR", str(shared_dir))
+    input_path = str(tmpdir.join("input.csv"))
+    write_transactions(input_path, 3000, addresses=200, invalid_ratio=0.2)
+    expected = apply_schema(pd.read_csv(input_path, dtype={"location_region": "category"}))
+
+    ranges = split_ranges(input_path, 4)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    assert ranges[-1][1] == tmpdir.join("input.csv").size()
+
+    df = read_csv_parallel(input_path, workers=3, columns=None)
+    assert df.columns.tolist() == expected.columns.tolist()
+    for name in expected.columns:
+        assert df[name].astype(object).equals(expected[name].astype(object)), name
+
+    chunks = list(iter_csv_parallel(input_path, workers=2, chunksize=700, columns=None))
+    assert len(chunks) > 1
+    assert pd.concat([chunk.index.to_series() for chunk in chunks]).tolist() == list(range(3000))
+    assert not chunks[0]["amount"].to_numpy().flags.owndata
+    assert not chunks[0]["receiving_address"].array.codes.flags.owndata
+
+    reader = iter_csv_parallel(input_path, workers=2, chunksize=300, columns=None)
+    next(reader)
+    reader.close()
+    assert shared_dir.listdir() == []
+
+
+def test_leitura_paralela_com_coluna_de_texto_fora_do_esquema(tmpdir):
+    """
+    Testa a leitura paralela de todas as colunas de um CSV com uma coluna de
+    texto fora do esquema, com valores ausentes e não ASCII.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o arquivo CSV.
+
+    Asserções:
+        Verifica que `load_data` com vários processos devolve a coluna extra
+        como texto, com os mesmos valores da leitura sequencial.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    write_transactions(input_path, 2000, addresses=50)
+    df = pd.read_csv(input_path)
+    df["note"] = ["a", "b", None, "ção"] * 500
+    df.to_csv(input_path, index=False)
+
+    parallel = load_data(input_path, columns=None, workers=2)
+    serial = load_data(input_path, columns=None)
+    assert parallel["note"].dtype == serial["note"].dtype
+    assert parallel["note"].astype(object).equals(serial["note"].astype(object))
+
+
+def test_leitura_de_varios_arquivos_comprimidos(tmpdir):
+    """
+    Testa a leitura de um padrão glob com arquivos comprimidos e sem
+    compressão, verificando que o fluxo resultante equivale ao arquivo único.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para os arquivos CSV.
+
+    Asserções:
+        Verifica a ordem dos arquivos, o índice contínuo dos blocos e os
+        valores de cada coluna.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    write_transactions(input_path, 3000, addresses=200, invalid_ratio=0.2)
+    expected = pd.read_csv(input_path, dtype={"location_region": "category"})
+
+    parts = tmpdir.mkdir("parts")
+    for i, compression in enumerate(["gzip", "xz", None]):
+        part = expected.iloc[i * 1000:(i + 1) * 1000]
+        suffix = {"gzip": ".gz", "xz": ".xz", None: ""}[compression]
+        part.to_csv(str(parts.join(f"part-{i}.csv{suffix}")), index=False, compression=compression)
+
+    pattern = str(parts.join("part-*.csv*"))
+    names = [os.path.basename(path) for path in expand_inputs(pattern)]
+    assert names == ["part-0.csv.gz", "part-1.csv.xz", "part-2.csv"]
+
+    chunks = list(iter_csv_files(expand_inputs(pattern), chunksize=300, columns=None, readers=2))
+    assert pd.concat([chunk.index.to_series() for chunk in chunks]).tolist() == list(range(3000))
+
+    df = load_data(pattern, columns=None)
+    for name in expected.columns:
+        assert df[name].astype(object).equals(expected[name].astype(object)), name
+
+
+def test_modulos_preguicosos_carregados_antes_das_threads_de_leitura(tmpdir, monkeypatch):
+    """
+    Testa que `iter_csv_files` carrega os módulos preguiçosos antes de
+    iniciar as threads de leitura, pois o `LazyLoader` não é seguro entre
+    threads antes do Python 3.12.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o arquivo CSV.
+        monkeypatch (pytest.MonkeyPatch): Substitui o NumPy do módulo por um
+            módulo preguiçoso ainda não carregado e observa as threads.
+
+    Asserções:
+        Verifica que, ao iniciar a leitura de cada arquivo, o módulo já está
+        carregado.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    write_transactions(input_path, 100, block_rows=100, seed=6)
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    module = lazy_import("colorsys")
+    monkeypatch.setattr(src.ingestion, "np", module)
+
+    loaded = []
+    read_file = src.ingestion._read_file
+
+    def spy(*args):
+        loaded.append(type(module) is types.ModuleType)
+        return read_file(*args)
+
+    monkeypatch.setattr(src.ingestion, "_read_file", spy)
+    chunks = list(iter_csv_files([input_path, input_path], chunksize=40, readers=2))
+
+    assert sum(len(chunk) for chunk in chunks) == 200
+    assert loaded == [True, True]
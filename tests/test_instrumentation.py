@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from src.instrumentation import XCOM_KEY, instrument_stage
+
+
+class _FakeTaskInstance:
+    """Instância de tarefa mínima que guarda os valores enviados ao XCom."""
+
+    def __init__(self):
+        self.xcom = {}
+
+    def xcom_push(self, key, value):
+        self.xcom[key] = value
+
+
+def test_instrument_stage_grava_metricas(tmpdir):
+    """
+    Testa que as métricas de uma etapa são anexadas ao arquivo JSON lines e
+    enviadas ao XCom, inclusive quando a etapa falha.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para as métricas.
+
+    Asserções:
+        Verifica os campos registrados, o status das etapas e o XCom.
+    """
+    metrics_path = str(tmpdir.join("metrics.jsonl"))
+    ti = _FakeTaskInstance()
+
+    with instrument_stage("etapa", metrics_path, ti=ti) as metrics:
+        sum(range(100_000))
+        metrics["rows_in"], metrics["rows_out"] = 10, 7
+
+    with pytest.raises(RuntimeError):
+        with instrument_stage("falha", metrics_path):
+            raise RuntimeError("erro")
+
+    with open(metrics_path) as f:
+        records = [json.loads(line) for line in f]
+
+    assert [r["stage"] for r in records] == ["etapa", "falha"]
+    assert [r["status"] for r in records] == ["success", "failed"]
+    assert (records[0]["rows_in"], records[0]["rows_out"]) == (10, 7)
+    for field in ("wall_s", "cpu_s", "peak_rss_mb"):
+        assert records[0][field] >= 0
+    assert ti.xcom[XCOM_KEY]["stage"] == "etapa"
+
+
+@pytest.mark.parametrize("profile, suffix", [("cprofile", ".prof"), ("tracemalloc", ".txt")])
+def test_instrument_stage_perfilamento(tmpdir, profile, suffix):
+    """
+    Testa o perfilamento opcional de uma etapa.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para os relatórios.
+        profile (str): Perfilador usado.
+        suffix (str): Extensão esperada do relatório.
+
+    Asserções:
+        Verifica que o relatório foi gravado no diretório indicado.
+    """
+    with instrument_stage("etapa", profile=profile, profile_dir=str(tmpdir)) as metrics:
+        [str(i) for i in range(1000)]
+
+    assert metrics["profile_path"].endswith(suffix)
+    assert tmpdir.join(metrics["profile_path"].split("/")[-1]).check()
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from src.main import compute_table1, compute_table2
+from src.parallel import compute_tables_parallel
+
+
+def test_parallel_igual_ao_sequencial():
+    """
+    Testa a agregação em vários processos, verificando que as tabelas são as
+    mesmas da execução sequencial.
+
+    Asserções:
+        Verifica se as tabelas 1 e 2 coincidem com `compute_table1` e
+        `compute_table2` para diferentes quantidades de processos, com
+        endereços em texto ou categóricos (com valores ausentes).
+    """
+    rng = np.random.default_rng(42)
+    n = 5000
+    df = pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "Africa"], n),
+            "risk_score": rng.uniform(0, 100, n),
+            "transaction_type": rng.choice(["sale", "purchase"], n),
+            "receiving_address": [f"addr{i}" for i in rng.integers(0, 800, n)],
+            "amount": rng.uniform(0, 1000, n),
+            "timestamp": rng.permutation(n),
+        }
+    )
+
+    categorical = df.astype({"receiving_address": "category"})
+    categorical.loc[::97, "receiving_address"] = None
+
+    for df, workers in [(df, 1), (df, 3), (categorical, 3)]:
+        table1, table2 = compute_tables_parallel(df, workers=workers, k=5)
+
+        pd.testing.assert_frame_equal(table1, compute_table1(df))
+        pd.testing.assert_frame_equal(
+            table2, compute_table2(df, k=5).reset_index(drop=True)
+        )
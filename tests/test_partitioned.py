@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pandas as pd
+from src.main import clean_data, clean_data_streaming
+from src.partitioned import filter_window, list_partitions, parse_time, read_partitioned
+
+
+def _transactions(n=3000, seed=5):
+    """Gera transações espalhadas por cerca de 15 meses."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "Africa"], n),
+            "risk_score": rng.uniform(0, 100, n).round(1),
+            "transaction_type": rng.choice(["sale", "purchase"], n),
+            "receiving_address": [f"addr{i}" for i in rng.integers(0, 400, n)],
+            "amount": rng.uniform(0, 1000, n).round(2),
+            "timestamp": rng.integers(parse_time("2023-01-01"), parse_time("2024-04-01"), n),
+        }
+    )
+
+
+def test_leitura_apenas_das_particoes_da_janela(tmpdir):
+    """
+    Testa a limpeza particionada por mês e a leitura com janela de tempo.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o CSV e a tabela.
+
+    Asserções:
+        Verifica as partições gravadas, as partições selecionadas pela janela
+        e se as linhas lidas são as da limpeza em memória dentro da janela.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    output_path = str(tmpdir.join("cleaned_data"))
+    _transactions().to_csv(input_path, index=False)
+
+    clean_data_streaming(input_path, output_path, chunksize=700, output_format="partitioned")
+
+    assert len(os.listdir(output_path)) == 15
+    start, end = parse_time("2023-11-15T12:00:00"), parse_time("2024-02-01")
+    selected = [os.path.basename(path) for path in list_partitions(output_path, start, end)]
+    assert selected == ["month=2023-11", "month=2023-12", "month=2024-01"]
+
+    expected = filter_window(clean_data(pd.read_csv(input_path)), start, end)
+    df = read_partitioned(output_path, ["receiving_address", "amount"], start, end)
+    assert list(df.columns) == ["receiving_address", "amount"]
+    assert sorted(df["amount"]) == sorted(expected["amount"])
@@ -0,0 +1,106 @@
+import sys
+import time
+import types
+
+import pandas as pd
+import pytest
+import src.pipelined
+from src.lazy import lazy_import
+from src.main import clean_data_streaming, run_batch
+from src.partitioned import read_partitioned
+from src.pipelined import iter_pipelined, run_pipelined
+from src.synthetic import write_transactions
+
+
+def test_run_pipelined_igual_ao_lote(tmpdir):
+    """
+    Testa o pipeline com etapas simultâneas contra a limpeza em blocos
+    seguida do cálculo das tabelas.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e as saídas.
+
+    Asserções:
+        Verifica que tabelas, métricas e a saída limpa particionada são as
+        mesmas, com e sem janela de tempo.
+    """
+    input_file = str(tmpdir.join("input.csv"))
+    write_transactions(input_file, 6_000, block_rows=3_000, addresses=300, seed=4)
+
+    for window in (None, (1_600_000_000, 1_650_000_000)):
+        expected = run_batch(input_file, str(tmpdir.join("batch")), 2_000, window=window)
+        result = run_pipelined(
+            input_file, str(tmpdir.join("pipelined")), 2_000, window=window, queue_size=1
+        )
+        pd.testing.assert_frame_equal(result[0], expected[0])
+        pd.testing.assert_frame_equal(result[1], expected[1])
+        assert result[2] == expected[2]
+
+    clean_data_streaming(input_file, str(tmpdir.join("streaming")), 2_000, "partitioned")
+    pd.testing.assert_frame_equal(
+        read_partitioned(str(tmpdir.join("pipelined"))),
+        read_partitioned(str(tmpdir.join("streaming"))),
+    )
+
+
+def test_iter_pipelined_ordem_erros_e_contrapressao():
+    """
+    Testa o encadeamento de etapas: ordem dos resultados, repasse de erros,
+    cancelamento e limite de itens em trânsito.
+
+    Asserções:
+        Verifica que os resultados saem na ordem da entrada, que um erro em
+        uma etapa chega ao consumidor, que parar o consumo não trava as
+        etapas e que a leitura não se adianta além das filas.
+    """
+    produced = []
+
+    def source(n):
+        for i in range(n):
+            produced.append(i)
+            yield i
+
+    results = list(iter_pipelined(source(50), [lambda x: x * 2, lambda x: x + 1]))
+    assert results == [2 * i + 1 for i in range(50)]
+
+    def fail(x):
+        if x == 7:
+            raise KeyError(x)
+        return x
+
+    with pytest.raises(KeyError):
+        list(iter_pipelined(range(20), [fail, str]))
+
+    # Consumidor lento: a leitura para quando as filas enchem
+    produced.clear()
+    ahead = []
+    for consumed, _ in enumerate(iter_pipelined(source(1_000), [str], queue_size=2)):
+        time.sleep(0.005)
+        ahead.append(len(produced) - consumed)
+        if consumed == 40:
+            break
+    assert max(ahead) <= 2 * 2 + 3
+    assert len(produced) < 100
+
+
+def test_iter_pipelined_carrega_modulos_preguicosos_antes_das_threads(monkeypatch):
+    """
+    Testa que `iter_pipelined` carrega os módulos preguiçosos antes de
+    iniciar as threads das etapas, pois o `LazyLoader` não é seguro entre
+    threads antes do Python 3.12.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): Substitui o Pandas do módulo por um
+            módulo preguiçoso ainda não carregado.
+
+    Asserções:
+        Verifica que o módulo já está carregado quando a etapa é executada.
+    """
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    module = lazy_import("colorsys")
+    monkeypatch.setattr(src.pipelined, "pd", module)
+
+    def stage(item):
+        return type(module) is types.ModuleType
+
+    assert list(iter_pipelined(range(3), [stage])) == [True, True, True]
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+from src.main import clean_data, clean_data_streaming
+from src.quality import (
+    REJECTED_BY_COLUMN,
+    RULES,
+    STRICT_RULES,
+    evaluate_rules,
+    quarantine_rows,
+)
+from src.schema import apply_schema
+
+
+def _sample():
+    """Monta um bloco com uma violação diferente em cada linha inválida."""
+    return pd.DataFrame(
+        {
+            "location_region": ["Europe", "Asia1", "Africa", "Europe", "Asia", "Europe", None],
+            "risk_score": ["10", "20", "n/a", "150", "30", "40", "50"],
+            "transaction_type": ["sale", "sale", "sale", "sale", "refund", "purchase", "sale"],
+            "amount": ["1.5", "2", "3", "4", "5", "-6", "7"],
+            "timestamp": [1, 2, 3, 4, 5, 6, 7],
+        }
+    )
+
+
+def test_regras_contadas_por_regra():
+    """
+    Testa a avaliação das regras declaradas, verificando a máscara das linhas
+    válidas, a contagem de rejeições por regra e a quarentena.
+
+    Asserções:
+        Verifica as linhas válidas, a contagem de cada regra e as regras
+        listadas em 'rejected_by' para cada linha rejeitada.
+    """
+    df = apply_schema(_sample())
+    valid, failures, counts = evaluate_rules(df)
+
+    np.testing.assert_array_equal(valid, [True, False, False, True, True, True, False])
+    assert counts == {
+        "risk_score_numeric": 1,
+        "amount_numeric": 0,
+        "timestamp_valid": 0,
+        "location_region_pattern": 2,
+    }
+    assert set(counts) == {rule["name"] for rule in RULES}
+
+    rejected = quarantine_rows(df, valid, failures)
+    assert rejected[REJECTED_BY_COLUMN].astype(str).tolist() == [
+        "location_region_pattern",
+        "risk_score_numeric",
+        "location_region_pattern",
+    ]
+
+
+def test_regras_de_faixa_opcionais():
+    """
+    Testa que as regras de faixa só rejeitam linhas quando passadas
+    explicitamente, e que nenhum tipo de transação é rejeitado.
+
+    Asserções:
+        Verifica que, com as regras padrão, 'risk_score' acima de 100,
+        'amount' negativo e um tipo de transação fora da lista de tipos
+        gerados continuam válidos, e que `STRICT_RULES` rejeita apenas as
+        linhas fora da faixa.
+    """
+    df = apply_schema(_sample())
+    default_valid, _, _ = evaluate_rules(df)
+    strict_valid, failures, counts = evaluate_rules(df, STRICT_RULES)
+
+    assert default_valid[[3, 4, 5]].all()
+    np.testing.assert_array_equal(strict_valid, [True, False, False, False, True, False, False])
+    assert counts["risk_score_range"] == 1
+    assert counts["amount_range"] == 1
+    assert "transaction_type" not in {rule["column"] for rule in STRICT_RULES}
+
+    rejected = quarantine_rows(df, strict_valid, failures, STRICT_RULES)
+    assert rejected[REJECTED_BY_COLUMN].astype(str).tolist() == [
+        "location_region_pattern",
+        "risk_score_numeric",
+        "risk_score_range",
+        "amount_range",
+        "location_region_pattern",
+    ]
+
+
+def test_quarentena_na_limpeza_em_blocos(tmpdir):
+    """
+    Testa a limpeza em blocos com quarentena, verificando que as linhas
+    limpas e as rejeitadas particionam a entrada.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para os arquivos CSV.
+
+    Asserções:
+        Verifica a saída limpa contra `clean_data`, o tamanho da quarentena e
+        as contagens por regra somadas ao longo dos blocos.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    output_path = str(tmpdir.join("cleaned.csv"))
+    quarantine_path = str(tmpdir.join("quarantine.csv"))
+    pd.concat([_sample()] * 3, ignore_index=True).to_csv(input_path, index=False)
+
+    rejections = {}
+    total, valid = clean_data_streaming(
+        input_path, output_path, chunksize=4, quarantine_path=quarantine_path, rejections=rejections
+    )
+
+    assert (total, valid) == (21, 12)
+    cleaned = pd.read_csv(output_path)
+    assert cleaned["risk_score"].tolist() == clean_data(pd.read_csv(input_path))["risk_score"].tolist()
+    quarantine = pd.read_csv(quarantine_path)
+    assert len(quarantine) == 9
+    assert rejections["location_region_pattern"] == 6
+    assert "risk_score_range" not in rejections
@@ -0,0 +1,81 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+from src.columnar import write_table
+from src.report_service import ReportService, make_server, publish_run
+
+
+def _publish(results_dir, regions, run_id):
+    """Grava as tabelas de uma execução e publica o marcador."""
+    table1 = pd.DataFrame({"location_region": regions, "risk_score": range(len(regions))})
+    table2 = pd.DataFrame({"receiving_address": ["a"], "amount": [1.0], "timestamp": [1]})
+    write_table(table1, str(results_dir.join("table1")))
+    table2.to_csv(str(results_dir.join("table2.csv")), index=False)
+    publish_run(str(results_dir), {"total_records": len(regions)}, run_id)
+
+
+def test_cache_invalidado_pelo_marcador(tmpdir):
+    """
+    Testa o cache em memória do serviço de consulta, verificando que
+    consultas repetidas não releem as tabelas e que uma nova execução
+    publicada invalida o cache.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para os resultados.
+
+    Asserções:
+        Verifica a quantidade de recargas, a paginação e os resultados antes
+        e depois da nova execução.
+    """
+    _publish(tmpdir, ["Asia", "Europe", "Africa"], "run-1")
+    service = ReportService(str(tmpdir))
+
+    for _ in range(3):
+        assert service.table("table1", limit=2)["location_region"].tolist() == ["Asia", "Europe"]
+    assert service.table("table1", limit=2, offset=2)["location_region"].tolist() == ["Africa"]
+    assert len(service.table("table2")) == 1
+    assert service.metrics() == {"total_records": 3}
+    assert service.loads == 1
+
+    _publish(tmpdir, ["Oceania"], "run-2")
+    assert service.run()["run_id"] == "run-2"
+    assert service.table("table1")["location_region"].tolist() == ["Oceania"]
+    assert service.loads == 2
+
+
+def test_endpoint_http(tmpdir):
+    """
+    Testa o endpoint HTTP local do serviço, consultando uma página da
+    Tabela 1 e as métricas.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para os resultados.
+
+    Asserções:
+        Verifica o total, as linhas da página e o código de erro para
+        parâmetros inválidos.
+    """
+    _publish(tmpdir, ["Asia", "Europe", "Africa"], "run-1")
+    server = make_server(ReportService(str(tmpdir)), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urllib.request.urlopen(f"{base}/table1?limit=1&offset=1") as response:
+            page = json.load(response)
+        assert page["total"] == 3
+        assert page["rows"] == [{"location_region": "Europe", "risk_score": 1}]
+
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert json.load(response) == {"total_records": 3}
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base}/table1?limit=-1")
+        assert error.value.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from src.main import clean_data, load_data
+
+
+def test_load_data_aplica_esquema(tmpdir):
+    """
+    Testa a leitura com o esquema central: apenas as colunas do pipeline são
+    lidas e os tipos são os declarados em `src.schema`.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário onde o CSV será armazenado.
+
+    Asserções:
+        Verifica as colunas lidas, as categóricas e os tipos após a limpeza,
+        incluindo o timestamp em texto convertido para segundos (int64).
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    data = {
+        "timestamp": ["1661204770", "2022-08-22 21:46:10", "invalid"],
+        "sending_address": ["s1", "s2", "s3"],
+        "receiving_address": ["r1", "r2", "r3"],
+        "amount": [10.5, 20, 30],
+        "transaction_type": ["sale", "sale", "purchase"],
+        "location_region": ["Europe", "Asia", "Asia"],
+        "risk_score": [15.75, 40, 50],
+        "ip_prefix": ["192.168", "10.0", "172.16"],
+    }
+    pd.DataFrame(data).to_csv(input_path, index=False)
+
+    df = load_data(input_path)
+
+    assert "sending_address" not in df.columns
+    assert "ip_prefix" not in df.columns
+    assert isinstance(df["location_region"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["receiving_address"].dtype, pd.CategoricalDtype)
+
+    cleaned = clean_data(df)
+
+    assert cleaned["timestamp"].dtype == np.int64
+    assert cleaned["risk_score"].dtype == np.float32
+    assert cleaned["amount"].dtype == np.float64
+    assert cleaned["timestamp"].tolist() == [1661204770, 1661204770]
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from src.fused import run_fused
+from src.main import clean_data_streaming
+from src.partitioned import list_partitions, read_partitioned
+from src.sharding import merge_cleaned, merge_shards, plan_shards, process_shard
+
+
+def test_shards_igual_ao_processamento_unico(tmpdir):
+    """
+    Testa o processamento em shards, verificando que mapear a limpeza sobre
+    intervalos de bytes e combinar os parciais gera as mesmas tabelas e
+    métricas que uma única leitura da entrada.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e os parciais.
+
+    Asserções:
+        Verifica a cobertura dos shards, as métricas, as tabelas 1 e 2 e que
+        as saídas limpas combinadas são as da limpeza em blocos da entrada
+        inteira, partição a partição.
+    """
+    rng = np.random.default_rng(11)
+    n = 2000
+    pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "0"], n),
+            "risk_score": rng.uniform(0, 100, n).round(1),
+            "transaction_type": rng.choice(["sale", "purchase"], n),
+            "receiving_address": [f"addr{i}" for i in rng.integers(0, 150, n)],
+            "amount": rng.integers(0, 50, n).astype(float),
+            "timestamp": rng.integers(0, 40, n),
+        }
+    ).to_csv(str(tmpdir.join("input.csv")), index=False)
+    input_path = str(tmpdir.join("input.csv"))
+
+    table1, table2, metrics, quality = run_fused(input_path, k=5)
+    streaming_path = str(tmpdir.join("streaming"))
+    clean_data_streaming(input_path, streaming_path, 150, "partitioned")
+    for n_shards in (1, 4, 7):
+        shards = plan_shards(input_path, n_shards)
+        assert len(shards) == n_shards
+        paths = []
+        for shard in shards:
+            path = str(tmpdir.join(f"shard-{n_shards}-{shard['shard']}"))
+            process_shard(input_path, shard["start"], shard["end"], path, chunksize=150)
+            paths.append(path)
+
+        result = merge_shards(paths, k=5)
+        pd.testing.assert_frame_equal(result[0], table1)
+        pd.testing.assert_frame_equal(result[1], table2)
+        assert result[2] == metrics
+        assert result[3] == quality
+
+        cleaned_path = str(tmpdir.join(f"cleaned-{n_shards}"))
+        merge_cleaned(paths, cleaned_path)
+        partitions = [path.rsplit("/", 1)[-1] for path in list_partitions(cleaned_path)]
+        assert partitions == [
+            path.rsplit("/", 1)[-1] for path in list_partitions(streaming_path)
+        ]
+        for name in partitions:
+            pd.testing.assert_frame_equal(
+                read_partitioned(f"{cleaned_path}/{name}"),
+                read_partitioned(f"{streaming_path}/{name}"),
+                check_categorical=False,
+            )
@@ -0,0 +1,63 @@
+import pandas as pd
+import sqlalchemy as sa
+from dags.tasks.data_sink import data_sink
+from src.columnar import append_table, write_table
+from src.sink import get_engine, sink_tables
+
+
+def test_sink_idempotente_por_execucao(tmpdir):
+    """
+    Testa a carga das tabelas em um banco SQLite, verificando a leitura da
+    tabela colunar em partes, os lotes e a substituição das linhas quando a
+    mesma execução é repetida.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o banco e as tabelas.
+
+    Asserções:
+        Verifica as linhas gravadas por tabela e por execução, os valores
+        ausentes gravados como NULL e a ausência de duplicatas.
+    """
+    url = f"sqlite:///{tmpdir.join('pipeline.db')}"
+    table1 = pd.DataFrame({"location_region": ["Asia", "Europe"], "risk_score": [60.5, 40.0]})
+    write_table(table1, str(tmpdir.join("table1")))
+    table2 = pd.DataFrame(
+        {"receiving_address": ["r1", "r2", "r3"], "amount": [9.0, 8.0, 7.0], "timestamp": [3, 2, 1]}
+    )
+    write_table(table2, str(tmpdir.join("table2")))
+    cleaned_path = str(tmpdir.join("cleaned_data"))
+    for start in (0, 5):
+        part = pd.DataFrame(
+            {
+                "location_region": pd.Categorical(["Asia", None, "Europe", "Asia", "Africa"]),
+                "amount": [float(start + i) for i in range(5)],
+                "timestamp": list(range(start, start + 5)),
+            }
+        )
+        append_table(part, cleaned_path)
+
+    assert sink_tables({"cleaned_data": cleaned_path}, "run-1", url, batch_rows=3) == {
+        "cleaned_data": 10
+    }
+    for _ in range(2):
+        data_sink(
+            str(tmpdir.join("table1")), str(tmpdir.join("table2")), cleaned_path, url, "run-2"
+        )
+
+    with get_engine(url).connect() as connection:
+        counts = dict(
+            connection.execute(
+                sa.text("SELECT run_id, COUNT(*) FROM cleaned_data GROUP BY run_id")
+            ).all()
+        )
+        nulls = connection.execute(
+            sa.text("SELECT COUNT(*) FROM cleaned_data WHERE location_region IS NULL")
+        ).scalar()
+        table1_rows = connection.execute(sa.text("SELECT COUNT(*) FROM table1")).scalar()
+        table2 = pd.read_sql(sa.text("SELECT * FROM table2"), connection)
+
+    assert counts == {"run-1": 10, "run-2": 10}
+    assert nulls == 4
+    assert table1_rows == 2
+    assert table2["receiving_address"].tolist() == ["r1", "r2", "r3"]
+    assert (table2["run_id"] == "run-2").all()
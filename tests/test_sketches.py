@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from src.fused import run_fused
+from src.sharding import merge_shards, merge_sketches, plan_shards, process_shard
+from src.sketches import HyperLogLog, QuantileSketch, RegionSketches
+
+
+def test_precisao_dos_sketches():
+    """
+    Testa os sketches de quantis e de distintos contra os valores exatos,
+    combinando sketches de metades diferentes dos dados.
+
+    Asserções:
+        Verifica o erro relativo dos quantis, o erro da contagem de distintos
+        e que a combinação é igual ao sketch dos dados inteiros.
+    """
+    rng = np.random.default_rng(3)
+    values = np.concatenate([np.zeros(100), rng.lognormal(4, 2, 50_000)])
+    keys = rng.integers(0, 20_000, len(values))
+
+    whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    whole.update(values)
+    first.update(values[:25_000])
+    second.update(np.append(values[25_000:], np.nan))
+    first.merge(second)
+    assert np.array_equal(first.counts, whole.counts) and first.count == len(values)
+    for q in (0.001, 0.25, 0.5, 0.9, 0.99):
+        exact = np.quantile(values, q, method="lower")
+        assert abs(whole.quantile(q) - exact) <= 0.011 * exact
+
+    hll, part = HyperLogLog(), HyperLogLog()
+    hll.update(pd.Categorical(keys[:30_000].astype(str)))
+    part.update(keys[30_000:].astype(str).tolist() + [None])
+    hll.merge(part)
+    exact = len(np.unique(keys))
+    assert abs(hll.estimate() - exact) <= 0.05 * exact
+    small = HyperLogLog()
+    small.update(["a", "b", "c", "a"])
+    assert small.estimate() == 3
+
+
+def test_sketches_combinados_entre_shards(tmpdir):
+    """
+    Testa os sketches por região no modo de passagem única e nos shards.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e os parciais.
+
+    Asserções:
+        Verifica que as tabelas 1 e 2 não mudam com os sketches, que os shards
+        combinados geram a mesma tabela por região e que a gravação preserva
+        os sketches.
+    """
+    rng = np.random.default_rng(4)
+    n = 3000
+    df = pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "0"], n),
+            "risk_score": rng.uniform(0, 100, n).round(1),
+            "transaction_type": rng.choice(["sale", "purchase"], n),
+            "sending_address": [f"s{i}" for i in rng.integers(0, 500, n)],
+            "receiving_address": [f"r{i}" for i in rng.integers(0, 200, n)],
+            "amount": rng.uniform(0, 1000, n).round(2),
+            "timestamp": rng.integers(0, 100, n),
+        }
+    )
+    input_path = str(tmpdir.join("input.csv"))
+    df.to_csv(input_path, index=False)
+
+    expected = run_fused(input_path, chunksize=400)
+    sketches = RegionSketches()
+    result = run_fused(input_path, chunksize=400, sketches=sketches)
+    pd.testing.assert_frame_equal(result[0], expected[0])
+    pd.testing.assert_frame_equal(result[1], expected[1])
+    assert result[2:] == expected[2:]
+
+    stats = sketches.table()
+    assert set(stats["location_region"]) == {"Europe", "Asia"}
+    valid = df[df["location_region"] != "0"]
+    assert stats["records"].sum() == len(valid)
+    exact_senders = valid.groupby("location_region")["sending_address"].nunique()
+    for row in stats.itertuples():
+        assert abs(row.distinct_senders - exact_senders[row.location_region]) <= 10
+
+    paths = []
+    for shard in plan_shards(input_path, 3):
+        path = str(tmpdir.join(f"shard-{shard['shard']}"))
+        process_shard(input_path, shard["start"], shard["end"], path, 250, sketches=True)
+        paths.append(path)
+    assert merge_shards(paths)[2] == expected[2]
+    pd.testing.assert_frame_equal(merge_sketches(paths).table(), stats)
+
+    sketches.save(str(tmpdir.join("saved")))
+    pd.testing.assert_frame_equal(RegionSketches.load(str(tmpdir.join("saved"))).table(), stats)
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pandas as pd
+from src.aggregates import latest_sales_partial, table2_from_latest
+from src.fused import run_fused
+from src.main import clean_data, compute_table2
+from src.spill import ExternalLatestSales
+
+
+def _sales(n, seed=11):
+    """Gera transações com endereços repetidos e desempates de timestamp."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "Africa"], n),
+            "risk_score": rng.uniform(0, 100, n).round(1),
+            "transaction_type": rng.choice(["sale", "purchase"], n),
+            "receiving_address": [f"addr{i}" for i in rng.integers(0, 800, n)],
+            "amount": rng.uniform(0, 1000, n).round(2),
+            "timestamp": rng.integers(0, 300, n),
+        }
+    )
+
+
+def test_agregacao_externa_igual_a_memoria(tmpdir):
+    """
+    Testa a agregação com orçamento de memória, forçando gravações em disco
+    com um orçamento mínimo.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para os arquivos de spill.
+
+    Asserções:
+        Verifica que o diretório de spill só é criado na primeira gravação
+        em disco, que houve gravações, que a Tabela 2 é a mesma da agregação
+        em memória e que os arquivos temporários são apagados.
+    """
+    df = clean_data(_sales(5000))
+    spill_dir = str(tmpdir.join("spill"))
+
+    with ExternalLatestSales(1 << 30, spill_dir) as latest:
+        latest.add(latest_sales_partial(df))
+        assert len(latest.candidates(k=5)) > 0
+    assert not os.path.exists(spill_dir)
+
+    with ExternalLatestSales(1, spill_dir, partitions=8) as latest:
+        for start in range(0, len(df), 500):
+            block = df.iloc[start:start + 500]
+            latest.add(latest_sales_partial(block, np.arange(start, start + len(block))))
+        table2 = table2_from_latest(latest.candidates(k=5), k=5)
+        assert latest.spills > 1
+
+    pd.testing.assert_frame_equal(table2, compute_table2(df, k=5))
+    pd.testing.assert_frame_equal(
+        compute_table2(df, k=5, memory_budget=1, spill_dir=spill_dir), table2
+    )
+    assert os.listdir(spill_dir) == []
+
+
+def test_fused_com_orcamento(tmpdir):
+    """
+    Testa o modo de passagem única com orçamento de memória.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para o CSV e os spills.
+
+    Asserções:
+        Verifica se a Tabela 2 é a mesma da execução sem orçamento.
+    """
+    input_path = str(tmpdir.join("input.csv"))
+    _sales(3000, seed=3).to_csv(input_path, index=False)
+
+    _, expected, _, _ = run_fused(input_path, chunksize=400, k=3)
+    _, table2, _, _ = run_fused(
+        input_path, chunksize=400, k=3, memory_budget=1, spill_dir=str(tmpdir.join("spill"))
+    )
+
+    pd.testing.assert_frame_equal(table2, expected)
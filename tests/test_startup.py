@@ -0,0 +1,13 @@
+from benchmarks.bench_startup import TARGETS, measure_target
+
+
+def test_inicializacao_sem_dependencias_pesadas():
+    """
+    Testa que o CLI (`python -m src.main --help`) e a análise do DAG não
+    carregam Pandas, NumPy nem SQLAlchemy, cada um em um processo novo.
+
+    Asserções:
+        Verifica que nenhuma dependência pesada é carregada por alvo.
+    """
+    for target in TARGETS:
+        assert measure_target(target, repeat=1)['heavy_modules'] == [], target
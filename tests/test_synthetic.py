@@ -0,0 +1,44 @@
+import pandas as pd
+from src.main import clean_data
+from src.synthetic import generate_transactions, write_transactions
+
+
+def test_generate_transactions_deterministico():
+    """
+    Testa o gerador sintético, verificando determinismo, cardinalidades e a
+    fração de linhas descartadas pela limpeza.
+
+    Asserções:
+        Verifica que a mesma semente gera os mesmos dados, que as
+        cardinalidades são respeitadas e que a fração de linhas inválidas é
+        próxima da pedida.
+    """
+    first = generate_transactions(20_000, regions=12, addresses=500, invalid_ratio=0.25, seed=3)
+    second = generate_transactions(20_000, regions=12, addresses=500, invalid_ratio=0.25, seed=3)
+    pd.testing.assert_frame_equal(first, second)
+
+    assert first["receiving_address"].nunique() <= 500
+    cleaned = clean_data(first.copy())
+    assert cleaned["location_region"].nunique() == 12
+    assert abs(1 - len(cleaned) / len(first) - 0.25) < 0.02
+
+
+def test_write_transactions_em_blocos(tmpdir):
+    """
+    Testa que o CSV gravado em blocos tem o total de linhas pedido e é
+    reproduzível.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para os arquivos CSV.
+
+    Asserções:
+        Verifica o total de linhas e a igualdade de dois arquivos gerados com
+        a mesma semente.
+    """
+    first, second = str(tmpdir.join("a.csv")), str(tmpdir.join("b.csv"))
+    write_transactions(first, 2_500, block_rows=1_000, seed=1)
+    write_transactions(second, 2_500, block_rows=1_000, seed=1)
+
+    df = pd.read_csv(first)
+    assert len(df) == 2_500
+    pd.testing.assert_frame_equal(df, pd.read_csv(second))
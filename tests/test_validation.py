@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from src.validation import is_valid_region, per_value_rule, validate_by_value
+
+
+def test_validacao_por_valor_igual_ao_regex():
+    """
+    Testa a validação de região por valor distinto, comparando-a com o
+    `str.match` aplicado linha a linha.
+
+    Asserções:
+        Verifica se as máscaras coincidem para colunas de texto e categóricas,
+        incluindo valores ausentes e não textuais.
+    """
+    values = ["Europe", "North America", "Asia1", None, "", "Africa", "Asia1", 3]
+    series = pd.Series(values * 50, dtype=object)
+    expected = series.str.match(r'^[a-zA-Z\s]+$', na=False).to_numpy(dtype=bool)
+
+    mask = validate_by_value(series, is_valid_region)
+    categorical_mask = validate_by_value(series.astype("category"), is_valid_region)
+
+    np.testing.assert_array_equal(mask, expected)
+    np.testing.assert_array_equal(categorical_mask, expected)
+
+
+def test_regra_avaliada_uma_vez_por_valor():
+    """
+    Testa que uma regra decorada com `per_value_rule` é avaliada apenas uma
+    vez por valor distinto, mesmo em várias chamadas.
+
+    Asserções:
+        Verifica o número de chamadas da regra.
+    """
+    calls = []
+
+    @per_value_rule
+    def rule(value):
+        calls.append(value)
+        return value.startswith("a")
+
+    first = validate_by_value(pd.Series(["a", "b", "a"] * 100), rule)
+    second = validate_by_value(pd.Series(["b", "c"] * 100), rule)
+
+    assert first[:3].tolist() == [True, False, True]
+    assert not second.any()
+    assert sorted(calls) == ["a", "b", "c"]
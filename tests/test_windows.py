@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.fused import run_fused
+from src.main import clean_data
+from src.sharding import merge_risk_windows, plan_shards, process_shard
+from src.windows import RegionWindows, compute_risk_windows
+
+
+def _transactions(n=3000, seed=11):
+    """Gera transações espalhadas por três dias, algumas inválidas."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "location_region": rng.choice(["Europe", "Asia", "0"], n),
+            "risk_score": rng.uniform(0, 100, n).round(1),
+            "transaction_type": rng.choice(["sale", "purchase"], n),
+            "receiving_address": [f"r{i}" for i in rng.integers(0, 200, n)],
+            "amount": rng.uniform(0, 1000, n).round(2),
+            "timestamp": 1_700_006_400 + rng.integers(0, 3 * 86_400, n),
+        }
+    )
+
+
+def _expected(df, width, slide):
+    """Calcula a série janela a janela, com um laço, para comparação."""
+    rows = []
+    first = df["timestamp"].min() // slide * slide - width + slide
+    for start in range(first, df["timestamp"].max() + 1, slide):
+        inside = df[(df["timestamp"] >= start) & (df["timestamp"] < start + width)]
+        for region, group in inside.groupby("location_region"):
+            rows.append((region, start, len(group), group["risk_score"].astype("float64").max()))
+    return pd.DataFrame(rows, columns=["location_region", "start", "risk_count", "risk_max"])
+
+
+def test_janelas_fixas_e_deslizantes():
+    """
+    Testa as janelas fixas e deslizantes contra um cálculo janela a janela.
+
+    Asserções:
+        Verifica contagem e máximo de cada região e janela, a média das
+        janelas fixas e a rejeição de um passo que não divide a largura.
+    """
+    df = clean_data(_transactions())
+
+    hourly = compute_risk_windows(df, "1h")
+    expected = _expected(df, 3600, 3600)
+    assert len(hourly) == len(expected)
+    assert hourly["risk_count"].sum() == len(df)
+    assert (hourly["window_end"] - hourly["window_start"] == pd.Timedelta("1h")).all()
+    means = df.groupby(["location_region", df["timestamp"] // 3600])["risk_score"].mean()
+    np.testing.assert_allclose(
+        np.sort(hourly["risk_mean"]), np.sort(means.to_numpy(dtype="float64")), rtol=1e-6
+    )
+
+    sliding = compute_risk_windows(df, "6h", slide="1h")
+    expected = _expected(df, 6 * 3600, 3600).sort_values(["start", "location_region"])
+    starts = (sliding["window_start"] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    assert starts.tolist() == expected["start"].tolist()
+    assert sliding["risk_count"].tolist() == expected["risk_count"].tolist()
+    np.testing.assert_allclose(sliding["risk_max"], expected["risk_max"])
+
+    with pytest.raises(ValueError):
+        RegionWindows("1h", slide="25min")
+
+
+def test_janelas_em_blocos_e_entre_shards(tmpdir):
+    """
+    Testa a série calculada na passagem única em blocos e combinada entre
+    shards, e a gravação do parcial.
+
+    Args:
+        tmpdir (py.path.local): Um diretório temporário para a entrada e os parciais.
+
+    Asserções:
+        Verifica que os blocos e os shards geram a mesma série do DataFrame
+        limpo inteiro e que a gravação preserva a série.
+    """
+    df = _transactions(seed=12)
+    input_path = str(tmpdir.join("input.csv"))
+    df.to_csv(input_path, index=False)
+    expected = compute_risk_windows(clean_data(df), "1D", slide="6h")
+
+    windows = RegionWindows("1D", slide="6h")
+    run_fused(input_path, chunksize=350, risk_windows=windows)
+    pd.testing.assert_frame_equal(windows.table(), expected)
+
+    paths = []
+    for shard in plan_shards(input_path, 3):
+        path = str(tmpdir.join(f"shard-{shard['shard']}"))
+        process_shard(
+            input_path, shard["start"], shard["end"], path, 400,
+            risk_window="1D", risk_slide="6h",
+        )
+        paths.append(path)
+    pd.testing.assert_frame_equal(merge_risk_windows(paths).table(), expected)
+
+    windows.save(str(tmpdir.join("saved")))
+    pd.testing.assert_frame_equal(RegionWindows.load(str(tmpdir.join("saved"))).table(), expected)